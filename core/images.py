@@ -0,0 +1,289 @@
+"""core/images.py
+
+Batched image files for ThumbnailedModel rows.
+
+`process` handles every row of a model at once, ie: all item images of a
+new patch:
+
+1. the source images are downloaded concurrently over one pooled
+   `requests.Session`
+2. each image is hashed, and rows whose bytes were already stored, ie: the
+   same icon in an earlier version, reuse those files
+3. only new images are resized into every `ThumbnailedModel.SIZES`, on a
+   thread pool, and written once under a name derived from their hash
+4. optionally, one sprite atlas per version is written with a json map of
+   each row's offset in it
+
+    images.process(ItemImage, ids, atlas=True)
+
+Nothing here runs in a request; `ThumbnailedModel.thumbs` only enqueues,
+and at most once per row while a task is pending or after its download
+failed, see `claim`.
+
+"""
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import hashlib
+import json
+import logging
+import math
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+THREADS = 8
+TIMEOUT = 30
+JPEG_QUALITY = 80
+# thumbnail size used in sprite atlases
+ATLAS_SIZE = 40
+
+LOCATION = "IMAGECACHE"
+
+# how long a row with a queued task is not queued again
+PENDING_TTL = 60 * 10
+# how long a row whose image could not be downloaded is not retried
+FAILED_TTL = 60 * 60 * 6
+
+
+def get_claim_key(model, _id):
+    return f"images/{model._meta.label_lower}/{_id}"
+
+
+def claim(model, _id):
+    """Claim a row for a background task.
+
+    Returns
+    -------
+    bool
+        False if a task is already pending or the last download failed
+
+    """
+    return cache.add(get_claim_key(model, _id), "pending", PENDING_TTL)
+
+
+def get_session(threads=THREADS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=threads, pool_maxsize=threads)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def download_many(urls: list[str], threads=THREADS):
+    """Download urls concurrently, reusing connections.
+
+    Returns
+    -------
+    dict
+        {url: bytes}, urls which failed are left out
+
+    """
+    session = get_session(threads=threads)
+
+    def download(url):
+        try:
+            r = session.get(url, timeout=TIMEOUT)
+        except Exception:
+            logger.exception(f"Could not download {url}.")
+            return url, None
+        if 200 <= r.status_code < 300:
+            return url, r.content
+        logger.warning(f"Downloading {url} returned {r.status_code}.")
+        return url, None
+
+    out = {}
+    if not urls:
+        return out
+    with ThreadPoolExecutor(max_workers=min(threads, len(urls))) as executor:
+        for url, content in executor.map(download, urls):
+            if content is not None:
+                out[url] = content
+    session.close()
+    return out
+
+
+def get_hash(content: bytes):
+    return hashlib.sha1(content).hexdigest()
+
+
+def thumbnail(content: bytes, size: int):
+    return Image.open(BytesIO(content)).convert("RGB").resize((size, size))
+
+
+def resize(content: bytes, size: int):
+    """Make a square jpeg thumbnail."""
+    output = BytesIO()
+    thumbnail(content, size).save(output, format="JPEG", quality=JPEG_QUALITY)
+    return output.getvalue()
+
+
+def save(name: str, content: bytes):
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, ContentFile(content))
+
+
+def store(file_hash: str, content: bytes, sizes: list[int]):
+    """Write an image and its thumbnails under names derived from its hash.
+
+    Returns
+    -------
+    dict
+        {field name: storage name}
+
+    """
+    names = {"file": save(f"{LOCATION}/{file_hash}.png", content)}
+    for size in sizes:
+        names[f"file_{size}"] = save(f"{LOCATION}/{file_hash}.{size}.jpg", resize(content, size))
+    return names
+
+
+def get_parent_field(model):
+    """The one to one field of a ThumbnailedModel, ie: ItemImage.item."""
+    return next(x.name for x in model._meta.fields if x.one_to_one)
+
+
+def get_file_fields(model):
+    return ["file"] + [f"file_{size}" for size in model.SIZES]
+
+
+def is_complete(obj):
+    return bool(obj.file_hash) and all(getattr(obj, x) for x in get_file_fields(type(obj)))
+
+
+def process(model, ids: list[int], force=False, atlas=False, threads=THREADS):
+    """Download, deduplicate and thumbnail the images of `ids`.
+
+    Parameters
+    ----------
+    model : type[ThumbnailedModel]
+    ids : list[int]
+    force : bool
+        redo rows which already have their files
+    atlas : bool
+        also write a sprite atlas for each version in `ids`
+
+    Returns
+    -------
+    int
+        the number of rows updated
+
+    """
+    parent = get_parent_field(model)
+    objs = list(model.objects.filter(id__in=ids).select_related(parent))
+    todo = [x for x in objs if force or not is_complete(x)]
+    todo_ids = {x.id for x in todo}
+    urls = {x.id: x.image_url() for x in objs if atlas or x.id in todo_ids}
+    contents = download_many(sorted(set(urls.values())), threads=threads)
+    hashes = {url: get_hash(content) for url, content in contents.items()}
+
+    fields = get_file_fields(model)
+    # files already written for the same bytes, by any row
+    known = {}
+    if not force:
+        query = model.objects.filter(file_hash__in=set(hashes.values()))
+        for file_hash, *names in query.values_list("file_hash", *fields):
+            if all(names):
+                known.setdefault(file_hash, dict(zip(fields, names)))
+    new = {}
+    for url, file_hash in hashes.items():
+        if file_hash not in known:
+            new.setdefault(file_hash, contents[url])
+
+    def store_one(item):
+        file_hash, content = item
+        try:
+            return file_hash, store(file_hash, content, model.SIZES)
+        except Exception:
+            logger.exception(f"Could not store {model.__name__} image {file_hash}.")
+            return file_hash, None
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for file_hash, names in executor.map(store_one, new.items()):
+            if names is not None:
+                known[file_hash] = names
+    logger.info(
+        f"{model.__name__}: {len(todo)} rows, {len(contents)} downloads, "
+        f"{len(new)} new images."
+    )
+
+    updated = []
+    failed = []
+    for obj in todo:
+        file_hash = hashes.get(urls[obj.id])
+        # not downloaded, or not a readable image
+        if file_hash not in known:
+            failed.append(obj.id)
+            continue
+        for name, value in known[file_hash].items():
+            setattr(obj, name, value)
+        obj.file_hash = file_hash
+        updated.append(obj)
+    model.objects.bulk_update(updated, fields + ["file_hash"])
+    cache.delete_many([get_claim_key(model, x.id) for x in updated])
+    # keep failed rows claimed so that reads don't queue them again right away
+    cache.set_many({get_claim_key(model, x): "failed" for x in failed}, FAILED_TTL)
+
+    if atlas:
+        versions = {}
+        for obj in objs:
+            url = urls[obj.id]
+            if hashes.get(url) in known:
+                versions.setdefault(getattr(obj, parent).version, []).append(
+                    (getattr(obj, parent)._id, contents[url])
+                )
+        for version, images in versions.items():
+            save_atlas(model, version, images, threads=threads)
+    return len(updated)
+
+
+def get_atlas_name(model, version: str, size=ATLAS_SIZE):
+    return f"{LOCATION}/atlas/{model._meta.model_name}.{version}.{size}"
+
+
+def save_atlas(model, version: str, images: list[tuple], size=ATLAS_SIZE, threads=THREADS):
+    """Write a sprite atlas for one version.
+
+    Parameters
+    ----------
+    images : list[tuple]
+        (_id, image bytes) of each row
+
+    Returns
+    -------
+    dict
+        the offsets map, {"image": url, "size": int, "offsets": {_id: [x, y]}}
+
+    """
+    images = sorted(images, key=lambda x: str(x[0]))
+    columns = max(math.ceil(math.sqrt(len(images))), 1)
+    rows = max(math.ceil(len(images) / columns), 1)
+    sheet = Image.new("RGB", (columns * size, rows * size))
+    offsets = {}
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        thumbs = executor.map(lambda x: thumbnail(x[1], size), images)
+        for i, ((_id, _), thumb) in enumerate(zip(images, thumbs)):
+            x, y = (i % columns) * size, (i // columns) * size
+            sheet.paste(thumb, (x, y))
+            offsets[_id] = [x, y]
+
+    name = get_atlas_name(model, version, size=size)
+    output = BytesIO()
+    sheet.save(output, format="JPEG", quality=JPEG_QUALITY)
+    for path in [f"{name}.jpg", f"{name}.json"]:
+        if default_storage.exists(path):
+            default_storage.delete(path)
+    image = default_storage.save(f"{name}.jpg", ContentFile(output.getvalue()))
+    data = {"image": default_storage.url(image), "size": size, "offsets": offsets}
+    default_storage.save(f"{name}.json", ContentFile(json.dumps(data).encode()))
+    logger.info(f"Wrote {model.__name__} atlas for {version} with {len(images)} images.")
+    return data
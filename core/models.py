@@ -1,11 +1,10 @@
 from django.apps import apps
 from django.db import models
-from django.core.files import File
 
 from lolsite.celery import app
-from PIL import Image
-from io import BytesIO
-import urllib
+from lolsite import queues
+
+from . import images
 
 
 class VersionedModel(models.Model):
@@ -18,11 +17,14 @@ class VersionedModel(models.Model):
     class Meta:
         abstract = True
 
+    def set_version_parts(self):
+        parts = [int(x) for x in self.version.split(".")]
+        for val, attr in zip(parts, ["major", "minor", "patch"]):
+            setattr(self, attr, val)
+
     def save(self, *args, **kwargs):
         if self.major is None:
-            parts = [int(x) for x in self.version.split(".")]
-            for val, attr in zip(parts, ["major", "minor", "patch"]):
-                setattr(self, attr, val)
+            self.set_version_parts()
         return super().save(*args, **kwargs)
 
 
@@ -40,23 +42,15 @@ def save_location(instance, name):
 
 @app.task(name='core.models.save_files')
 def save_files(model_id, app, model_name, force=False):
+    save_many_files(app, model_name, [model_id], force=force)
+
+
+@app.task(name='core.models.save_many_files')
+def save_many_files(app, model_name, ids, force=False, atlas=False):
+    """Write the files of many rows at once, see core.images.
+    """
     model = apps.get_model(app, model_name=model_name)
-    obj: 'ThumbnailedModel' = model.objects.get(id=model_id)
-    if not obj.file or force:
-        r = urllib.request.urlretrieve(obj.image_url())
-        obj.file.save(obj.full, File(open(r[0], 'rb')))
-    obj.refresh_from_db()
-    image = Image.open(obj.file)
-    for size in obj.SIZES:
-        attr = f'file_{size}'
-        if not getattr(obj, attr) or force:
-            output = BytesIO()
-            temp = image.resize((size, size))
-            temp.save(output, format='JPEG', quality=80)
-            name = f'{size}-{obj.full.lower().strip(".png")}.jpg'
-            new_image = File(output, name=name)
-            field = getattr(obj, attr)
-            field.save(name, new_image)
+    images.process(model, ids, force=force, atlas=atlas)
 
 
 class ThumbnailedModel(models.Model):
@@ -66,6 +60,8 @@ class ThumbnailedModel(models.Model):
     file_15 = models.ImageField(upload_to=save_location, default=None, null=True, blank=True)
     file_30 = models.ImageField(upload_to=save_location, default=None, null=True, blank=True)
     file_40 = models.ImageField(upload_to=save_location, default=None, null=True, blank=True)
+    # sha1 of the source image, files are shared by rows with the same bytes
+    file_hash = models.CharField(max_length=40, default="", blank=True, db_index=True)
 
     class Meta:
         abstract = True
@@ -82,18 +78,22 @@ class ThumbnailedModel(models.Model):
             if sync:
                 save_files(*args, **kwargs)
             else:
-                save_files.delay(*args, **kwargs)
+                save_files.apply_async(args, kwargs, priority=queues.PRIORITY_BACKGROUND)
 
     def image_url(self):
         raise NotImplementedError()
 
     def thumbs(self):
+        """Get the url of each thumbnail.
+
+        Missing sizes are None and get generated in the background, a
+        request never waits on them.  A row is only queued again once its
+        task finished or a failed download expired, see `images.claim`.
+        """
         thumbs = {}
         for attr in [f'file_{size}' for size in self.SIZES]:
             field = getattr(self, attr)
-            if not field:
-                self.save_files(sync=True)
-                self.refresh_from_db()
-                field = getattr(self, attr)
-            thumbs[attr] = field.url
+            thumbs[attr] = field.url if field else None
+        if not all(thumbs.values()) and images.claim(type(self), self.id):
+            self.save_files()
         return thumbs
@@ -2,18 +2,33 @@ from typing import Any
 from pydantic import BaseModel, root_validator, Extra
 import logging
 
+import orjson
+
 
 logger = logging.getLogger(__name__)
 
+# alias names of each model's fields, built once per class
+_aliases: dict[type, frozenset[str]] = {}
+
+
+def get_aliases(cls) -> frozenset[str]:
+    aliases = _aliases.get(cls)
+    if aliases is None:
+        aliases = frozenset(field.alias for field in cls.__fields__.values())
+        _aliases[cls] = aliases
+    return aliases
+
 
-class BaseModelWithLogger(BaseModel, extra=Extra.allow):
+class BaseModelWithLogger(BaseModel, extra=Extra.allow, json_loads=orjson.loads):
     @root_validator(pre=True)
     def log_extra(cls, values: dict[str, Any]) -> dict[str, Any]:
-        all_required_field_names = {field.alias for field in cls.__fields__.values()}
+        all_required_field_names = get_aliases(cls)
+        if values.keys() <= all_required_field_names:
+            return values
         extra: dict[str, Any] = {}
         for field_name in list(values):
             if field_name not in all_required_field_names:
                 extra[field_name] = values.pop(field_name)
         if extra:
-            logger.info(f'Extra fields detected on {cls.__class__.__name__}: {extra}')
+            logger.info(f'Extra fields detected on {cls.__name__}: {extra}')
         return values
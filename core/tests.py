@@ -1,3 +1,113 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.core.files.storage import default_storage
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+from io import BytesIO
+import json
+import shutil
+import tempfile
+
+from core import images
+from data.models import Item, ItemImage
+
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def get_png(color):
+    output = BytesIO()
+    Image.new("RGBA", (64, 64), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+class ProcessImagesTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+        self.pngs = {"1001.png": get_png("red"), "1028.png": get_png("blue")}
+        self.session = mock.Mock()
+        self.session.get.side_effect = lambda url, **kwargs: mock.Mock(
+            status_code=200, content=self.pngs[url.rsplit("/", 1)[-1]],
+        )
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media)
+
+    def create_images(self, version):
+        out = []
+        for _id in [1001, 1028]:
+            item = Item.objects.create(_id=_id, version=version, language="en_US")
+            out.extend(ItemImage.objects.bulk_create([
+                ItemImage(item=item, full=f"{_id}.png", group="item", h=64, sprite="", w=64, x=0, y=0)
+            ]))
+        return [x.id for x in out]
+
+    def test_process(self):
+        old = self.create_images("13.3.1")
+        new = self.create_images("13.4.1")
+        with mock.patch.object(images, "get_session", return_value=self.session):
+            self.assertEqual(images.process(ItemImage, old), 2)
+            with mock.patch.object(images, "store", wraps=images.store) as store:
+                self.assertEqual(images.process(ItemImage, new, atlas=True), 2)
+        # the same bytes in a new version are neither resized nor written again
+        store.assert_not_called()
+        self.assertEqual(self.session.get.call_count, 4)
+
+        files = {x.item.version: x for x in ItemImage.objects.filter(item___id=1001).select_related("item")}
+        self.assertEqual(files["13.3.1"].file_40.name, files["13.4.1"].file_40.name)
+        self.assertTrue(files["13.4.1"].file_hash)
+        with default_storage.open(files["13.4.1"].file_40.name) as f:
+            self.assertEqual(Image.open(f).size, (40, 40))
+
+        with default_storage.open(f"{images.get_atlas_name(ItemImage, '13.4.1')}.json") as f:
+            atlas = json.load(f)
+        self.assertEqual(atlas["offsets"], {"1001": [0, 0], "1028": [40, 0]})
+
+    @override_settings(CACHES=LOCMEM)
+    def test_thumbs_never_block(self):
+        cache.clear()
+        image_id = self.create_images("13.4.1")[0]
+        image = ItemImage.objects.get(id=image_id)
+        with mock.patch("core.models.save_files") as save_files, \
+                mock.patch.object(images, "thumbnail") as thumbnail:
+            thumbs = image.thumbs()
+            # already queued
+            image.thumbs()
+        self.assertEqual(thumbs, {"file_15": None, "file_30": None, "file_40": None})
+        save_files.apply_async.assert_called_once()
+        save_files.assert_not_called()
+        thumbnail.assert_not_called()
+
+    @override_settings(CACHES=LOCMEM)
+    def test_failed_download_is_not_retried(self):
+        cache.clear()
+        ids = self.create_images("13.4.1")
+        del self.pngs["1028.png"]
+        self.session.get.side_effect = lambda url, **kwargs: mock.Mock(
+            status_code=200 if url.endswith("1001.png") else 404,
+            content=self.pngs.get(url.rsplit("/", 1)[-1]),
+        )
+        with mock.patch.object(images, "get_session", return_value=self.session):
+            self.assertEqual(images.process(ItemImage, ids), 1)
+        with mock.patch("core.models.save_files") as save_files:
+            for image in ItemImage.objects.filter(id__in=ids):
+                image.thumbs()
+        save_files.apply_async.assert_not_called()
+
+    @override_settings(CACHES=LOCMEM)
+    def test_unreadable_image_fails_alone(self):
+        cache.clear()
+        ids = self.create_images("13.4.1")
+        self.pngs["1028.png"] = b"not an image"
+        with mock.patch.object(images, "get_session", return_value=self.session):
+            self.assertEqual(images.process(ItemImage, ids, atlas=True), 1)
+        rows = {x.item._id: x for x in ItemImage.objects.filter(id__in=ids).select_related("item")}
+        self.assertTrue(rows[1001].file_40)
+        self.assertFalse(rows[1028].file_hash)
+        self.assertEqual(cache.get(images.get_claim_key(ItemImage, rows[1028].id)), "failed")
+        with default_storage.open(f"{images.get_atlas_name(ItemImage, '13.4.1')}.json") as f:
+            self.assertEqual(json.load(f)["offsets"], {"1001": [0, 0]})
@@ -0,0 +1,211 @@
+"""data/changes.py
+
+When did an item or champion last change?
+
+Every Item and Champion version stores a `content_hash` of the data that
+matters for balance:
+
+    Item
+        stats, gold and effects
+    Champion
+        stats, and each spell's numbers, text and effect burns
+
+The importer sets it when a version is built.  `last_changed` is then
+derived in one pass over (_id, version) ordered rows per language: a version
+whose hash differs from the previous version of the same _id is a change,
+otherwise it inherits the previous version's `last_changed`.
+
+    changes.update_last_changed(Item)
+
+Following `last_changed` back from any version gives an _id's change chain,
+see `get_change_chain`.
+
+"""
+from django.db.models import F
+
+from .models import Item, Champion, ChampionStats
+
+from itertools import islice
+import hashlib
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+ITEM_GOLD_FIELDS = ["base", "purchasable", "sell", "total"]
+CHAMPION_STAT_FIELDS = [
+    x.name for x in ChampionStats._meta.concrete_fields if x.name not in ("id", "champion")
+]
+CHAMPION_SPELL_FIELDS = [
+    "_id",
+    "cooldown_burn",
+    "cost_burn",
+    "cost_type",
+    "description",
+    "max_ammo",
+    "max_rank",
+    "range_burn",
+    "resource",
+    "tooltip",
+]
+
+
+def get_value(instance, name: str):
+    """Get a field's value the way it reads back from the db.
+
+    ie: "0.5" from the api is 0.5 once it went through a FloatField, so an
+    unsaved row and the same row loaded later hash the same.
+    """
+    value = instance._meta.get_field(name).to_python(getattr(instance, name))
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def get_hash(content):
+    data = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def get_item_hash(stats, gold, effects):
+    """Hash an item's content.
+
+    Parameters
+    ----------
+    stats : list[ItemStat]
+    gold : ItemGold | None
+    effects : list[ItemEffect]
+
+    Returns
+    -------
+    str
+
+    """
+    return get_hash({
+        "stats": sorted([x.key, get_value(x, "value")] for x in stats),
+        "gold": [get_value(gold, x) for x in ITEM_GOLD_FIELDS] if gold else None,
+        "effects": sorted([x.key, get_value(x, "value")] for x in effects),
+    })
+
+
+def get_champion_hash(stats, spells):
+    """Hash a champion's content.
+
+    Parameters
+    ----------
+    stats : ChampionStats | None
+    spells : list[tuple[ChampionSpell, list[ChampionEffectBurn]]]
+
+    Returns
+    -------
+    str
+
+    """
+    return get_hash({
+        "stats": [get_value(stats, x) for x in CHAMPION_STAT_FIELDS] if stats else None,
+        "spells": sorted(
+            [
+                [get_value(spell, x) for x in CHAMPION_SPELL_FIELDS],
+                [get_value(x, "value") for x in sorted(effect_burns, key=lambda x: x.sort_int)],
+            ]
+            for spell, effect_burns in spells
+        ),
+    })
+
+
+def hash_items(query):
+    """Set content_hash on every item in `query`, a few queries per batch."""
+    count = 0
+    ids = iter(list(query.order_by("id").values_list("id", flat=True)))
+    while batch := list(islice(ids, BATCH_SIZE)):
+        items = list(
+            Item.objects.filter(id__in=batch)
+            .select_related("gold")
+            .prefetch_related("stats", "effects")
+        )
+        for item in items:
+            gold = item.gold if hasattr(item, "gold") else None
+            item.content_hash = get_item_hash(item.stats.all(), gold, item.effects.all())
+        Item.objects.bulk_update(items, ["content_hash"])
+        count += len(items)
+    return count
+
+
+def hash_champions(query):
+    """Set content_hash on every champion in `query`, a few queries per batch."""
+    count = 0
+    ids = iter(list(query.order_by("id").values_list("id", flat=True)))
+    while batch := list(islice(ids, BATCH_SIZE)):
+        champions = list(
+            Champion.objects.filter(id__in=batch)
+            .select_related("stats")
+            .prefetch_related("spells__effect_burn")
+        )
+        for champion in champions:
+            stats = champion.stats if hasattr(champion, "stats") else None
+            spells = [(x, x.effect_burn.all()) for x in champion.spells.all()]
+            champion.content_hash = get_champion_hash(stats, spells)
+        Champion.objects.bulk_update(champions, ["content_hash"])
+        count += len(champions)
+    return count
+
+
+HASHERS = {
+    Item: hash_items,
+    Champion: hash_champions,
+}
+
+
+def update_last_changed(model, language="en_US"):
+    """Derive last_changed for every version of `model` in one ordered pass.
+
+    Rows without a content_hash, ie: imported before it existed, are hashed
+    first.
+
+    Parameters
+    ----------
+    model : Item | Champion
+    language : str
+
+    Returns
+    -------
+    int
+        the number of rows updated
+
+    """
+    query = model.objects.filter(language=language)
+    missing = HASHERS[model](query.filter(content_hash=""))
+    if missing:
+        logger.info(f"Hashed {missing} {model.__name__} rows.")
+
+    rows = query.order_by("_id", "major", "minor", "patch").values_list(
+        "id", "_id", "version", "content_hash", "last_changed",
+    )
+    updates = []
+    previous = None
+    for id, _id, version, content_hash, last_changed in rows.iterator():
+        if previous is not None and previous[0] == _id and previous[1] == content_hash:
+            new = previous[2]
+        else:
+            new = version
+        if new != last_changed:
+            updates.append(model(id=id, last_changed=new))
+        previous = (_id, content_hash, new)
+    model.objects.bulk_update(updates, ["last_changed"], batch_size=BATCH_SIZE)
+    logger.info(f"Updated last_changed of {len(updates)} {model.__name__} rows.")
+    return len(updates)
+
+
+def get_change_chain(model, _id, language="en_US"):
+    """Get every version of an _id which introduced a change, newest first.
+
+    Returns
+    -------
+    QuerySet
+    """
+    return model.objects.filter(_id=_id, language=language, last_changed=F("version")).order_by(
+        "-major", "-minor", "-patch",
+    )
@@ -0,0 +1,548 @@
+"""data/importer.py
+
+Bulk import of one static data version.
+
+A version is imported in two steps:
+
+1. fetch
+    every ddragon file for the version is downloaded up front, the per
+    champion files concurrently.
+2. save
+    every row is built in memory and written with one `bulk_create` per
+    model, parents before children, in a single transaction which ends by
+    bumping `Rito.data_version`.
+
+Readers either see none of a version or all of it; a half imported patch is
+never visible, and a failed fetch never touches the database.
+
+    importer.import_version("13.4.1")
+    importer.import_versions(["13.4.1", "13.3.1"])
+
+Versions are independent, so `import_versions` imports several at once,
+each on its own thread, connection and transaction.
+
+"""
+from django.db import connection, transaction
+
+from .models import ReforgedTree, ReforgedRune
+from .models import Item, ItemEffect, FromItem, IntoItem
+from .models import ItemGold, ItemImage, ItemMap, ItemStat
+from .models import ItemTag, ItemRune
+from .models import ProfileIcon
+from .models import Champion, ChampionImage, ChampionInfo
+from .models import ChampionStats, ChampionTag
+from .models import ChampionPassive, ChampionPassiveImage
+from .models import ChampionSkin, ChampionSpell, ChampionSpellImage
+from .models import ChampionEffectBurn, ChampionSpellVar
+from .models import SummonerSpell, SummonerSpellImage
+from .models import SummonerSpellMode, SummonerSpellEffectBurn
+from .models import SummonerSpellVar
+from . import changes, registry
+
+from core.models import save_many_files
+from lolsite import queues
+from lolsite.tasks import get_riot_api
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# concurrent ddragon requests per version
+FETCH_THREADS = 10
+# versions imported at once by import_versions
+VERSION_THREADS = 4
+BATCH_SIZE = 1000
+
+# top level model -> every model written for it, in insert order
+GROUPS = {
+    Item: [
+        Item, FromItem, IntoItem, ItemGold, ItemEffect,
+        ItemImage, ItemMap, ItemStat, ItemRune,
+    ],
+    ProfileIcon: [ProfileIcon],
+    Champion: [
+        Champion, ChampionInfo, ChampionImage, ChampionStats,
+        ChampionPassive, ChampionPassiveImage, ChampionSkin,
+        ChampionSpell, ChampionSpellImage, ChampionEffectBurn, ChampionSpellVar,
+    ],
+    SummonerSpell: [
+        SummonerSpell, SummonerSpellEffectBurn, SummonerSpellImage,
+        SummonerSpellMode, SummonerSpellVar,
+    ],
+    ReforgedTree: [ReforgedTree, ReforgedRune],
+}
+
+# tag model -> (top level model, name of the m2m field)
+TAGS = {
+    ItemTag: (Item, "items"),
+    ChampionTag: (Champion, "champions"),
+}
+
+
+def get_json(r, description: str):
+    if 200 <= r.status_code < 300:
+        return r.json()
+    raise Exception(f"Fetching {description} returned {r.status_code}.")
+
+
+def join_coeff(coeff):
+    if isinstance(coeff, list):
+        return "/".join([str(x) for x in coeff])
+    return str(coeff)
+
+
+def build_image(model, data: dict, **kwargs):
+    return model(
+        full=data.get("full", ""),
+        group=data.get("group", ""),
+        h=data.get("h", 0),
+        sprite=data.get("sprite", ""),
+        w=data.get("w", 0),
+        x=data.get("x", 0),
+        y=data.get("y", 0),
+        **kwargs,
+    )
+
+
+class VersionImport:
+    """The static data of one version and language.
+
+    Parameters
+    ----------
+    version : str
+        ex - 13.4.1
+    language : str
+    threads : int
+        concurrent requests while fetching
+
+    """
+
+    def __init__(self, version: str, language="en_US", threads=FETCH_THREADS):
+        self.version = version
+        self.language = language
+        self.threads = threads
+        self.data: dict = {}
+        # model -> unsaved instances
+        self.rows: dict = {model: [] for models in GROUPS.values() for model in models}
+        # tag model -> [(name, unsaved instance)]
+        self.tags: dict = {model: [] for model in TAGS}
+
+    def fetch(self):
+        """Download every file of the version."""
+        api = get_riot_api().lolstaticdata
+        version, language = self.version, self.language
+        self.data["items"] = get_json(api.items(version=version, language=language), f"items {version}")["data"]
+        self.data["profile_icons"] = get_json(
+            api.profile_icons(version=version, language=language), f"profile icons {version}"
+        )["data"]
+        self.data["summoner_spells"] = get_json(
+            api.summoner_spells(version=version, language=language), f"summoner spells {version}"
+        )["data"]
+        self.data["runes"] = get_json(
+            api.runes_reforged(version=version, language=language), f"runes {version}"
+        )
+        champions = get_json(
+            api.champions(version=version, language=language), f"champions {version}"
+        )["data"]
+
+        def fetch_champion(name):
+            r = api.champions(name=name, version=version, language=language)
+            return get_json(r, f"champion {name} {version}")["data"][name]
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            details = executor.map(fetch_champion, list(champions))
+            # the champion file has everything in champion.json and more
+            self.data["champions"] = {
+                name: {**champions[name], **detail} for name, detail in zip(champions, details)
+            }
+        return self
+
+    def add(self, instance):
+        self.rows[type(instance)].append(instance)
+        return instance
+
+    def add_versioned(self, instance):
+        # bulk_create skips VersionedModel.save
+        instance.set_version_parts()
+        return self.add(instance)
+
+    def build(self):
+        """Build every row from the fetched data."""
+        self.build_items()
+        self.build_profile_icons()
+        self.build_champions()
+        self.build_summoner_spells()
+        self.build_runes()
+        self.set_hashes()
+        return self
+
+    def set_hashes(self):
+        """Set content_hash on every Item and Champion, see data.changes."""
+        # unsaved instances are unhashable, so children are keyed by id()
+        children = defaultdict(lambda: defaultdict(list))
+        for model, parent in [
+            (ItemStat, "item"), (ItemGold, "item"), (ItemEffect, "item"),
+            (ChampionStats, "champion"), (ChampionSpell, "champion"), (ChampionEffectBurn, "spell"),
+        ]:
+            for row in self.rows[model]:
+                children[id(getattr(row, parent))][model].append(row)
+        for item in self.rows[Item]:
+            rows = children[id(item)]
+            gold = rows[ItemGold][0] if rows[ItemGold] else None
+            item.content_hash = changes.get_item_hash(rows[ItemStat], gold, rows[ItemEffect])
+        for champion in self.rows[Champion]:
+            rows = children[id(champion)]
+            stats = rows[ChampionStats][0] if rows[ChampionStats] else None
+            spells = [(x, children[id(x)][ChampionEffectBurn]) for x in rows[ChampionSpell]]
+            champion.content_hash = changes.get_champion_hash(stats, spells)
+
+    def build_items(self):
+        for item_id, _item in self.data["items"].items():
+            try:
+                int(item_id)
+            except ValueError:
+                logger.exception('Unexpected item id.')
+                continue
+            item = self.add_versioned(Item(
+                _id=int(item_id),
+                version=self.version,
+                language=self.language,
+                colloq=_item["colloq"],
+                depth=_item.get("depth", None),
+                group=_item.get("group", ""),
+                description=_item["description"],
+                name=_item["name"],
+                plaintext=_item["plaintext"],
+                required_ally=_item.get("requiredAlly", ""),
+                required_champion=_item.get("requiredChampion", ""),
+                in_store=_item.get("inStore", True),
+                consumed=_item.get("consumed", False),
+                consume_on_full=_item.get("consumeOnFull", False),
+                special_recipe=_item.get("specialRecipe", None),
+                stacks=_item.get("stacks", None),
+            ))
+            for from_item_id in _item.get("from", []):
+                self.add(FromItem(item=item, _id=from_item_id))
+            for into_item_id in _item.get("into", []):
+                self.add(IntoItem(item=item, _id=into_item_id))
+            gold = _item.get("gold", {})
+            if gold:
+                self.add(ItemGold(
+                    item=item,
+                    base=gold["base"],
+                    purchasable=gold["purchasable"],
+                    sell=gold["sell"],
+                    total=gold["total"],
+                ))
+            for key, value in _item.get("effect", {}).items():
+                self.add(ItemEffect(item=item, key=key, value=value))
+            image = _item.get("image", {})
+            if image:
+                self.add(build_image(ItemImage, image, item=item))
+            for key, value in _item.get("maps", {}).items():
+                self.add(ItemMap(item=item, key=int(key), value=value))
+            for key, value in _item.get("stats", {}).items():
+                self.add(ItemStat(item=item, key=key, value=round(float(value), 4)))
+            for tag in _item.get("tags", []):
+                self.tags[ItemTag].append((tag, item))
+            rune = _item.get("rune", {})
+            if rune:
+                self.add(ItemRune(
+                    item=item,
+                    is_rune=rune.get("isrune", False),
+                    tier=rune["tier"],
+                    _type=rune["type"],
+                ))
+
+    def build_profile_icons(self):
+        for profile_data in self.data["profile_icons"].values():
+            self.add_versioned(build_image(
+                ProfileIcon,
+                profile_data["image"],
+                _id=profile_data["id"],
+                version=self.version,
+                language=self.language,
+            ))
+
+    def build_champions(self):
+        for champion_data in self.data["champions"].values():
+            champion = self.add_versioned(Champion(
+                _id=champion_data["id"],
+                version=self.version,
+                language=self.language,
+                key=champion_data["key"],
+                name=champion_data["name"],
+                partype=champion_data["partype"],
+                title=champion_data["title"],
+                lore=champion_data.get("lore", ""),
+            ))
+            info = champion_data["info"]
+            self.add(ChampionInfo(
+                champion=champion,
+                attack=info["attack"],
+                defense=info["defense"],
+                difficulty=info["difficulty"],
+                magic=info["magic"],
+            ))
+            self.add(build_image(ChampionImage, champion_data["image"], champion=champion))
+            stats = champion_data["stats"]
+            self.add(ChampionStats(
+                champion=champion,
+                armor=stats["armor"],
+                armor_per_level=stats["armorperlevel"],
+                attack_damage=stats["attackdamage"],
+                attack_damage_per_level=stats["attackdamageperlevel"],
+                attack_range=stats["attackrange"],
+                attack_speed=stats.get("attackspeed", None),
+                attack_speed_per_level=stats["attackspeedperlevel"],
+                crit=stats["crit"],
+                crit_per_level=stats["critperlevel"],
+                hp=stats["hp"],
+                hp_per_level=stats["hpperlevel"],
+                hp_regen=stats["hpregen"],
+                hp_regen_per_level=stats["hpregenperlevel"],
+                move_speed=stats["movespeed"],
+                mp=stats["mp"],
+                mp_per_level=stats["mpperlevel"],
+                mp_regen=stats["mpregenperlevel"],
+                mp_regen_per_level=stats["mpregenperlevel"],
+                spell_block=stats["spellblock"],
+                spell_block_per_level=stats["spellblockperlevel"],
+            ))
+            for tag in champion_data["tags"]:
+                self.tags[ChampionTag].append((tag, champion))
+            self.build_champion_advanced(champion, champion_data)
+
+    def build_champion_advanced(self, champion: Champion, data: dict):
+        passive_data = data.get("passive")
+        if passive_data:
+            passive = self.add(ChampionPassive(
+                champion=champion,
+                description=passive_data["description"],
+                name=passive_data["name"],
+            ))
+            self.add(build_image(ChampionPassiveImage, passive_data["image"], passive=passive))
+
+        # one row per id, the last one wins like an overwrite
+        skins = {x["id"]: x for x in data.get("skins", [])}
+        for skin_data in skins.values():
+            self.add(ChampionSkin(
+                champion=champion,
+                _id=skin_data["id"],
+                chromas=skin_data["chromas"],
+                name=skin_data["name"],
+                num=skin_data["num"],
+            ))
+
+        spells = {x["id"]: x for x in data.get("spells", [])}
+        for spell_data in spells.values():
+            spell = self.add(ChampionSpell(
+                champion=champion,
+                _id=spell_data["id"],
+                cooldown_burn=spell_data["cooldownBurn"],
+                cost_burn=spell_data["costBurn"],
+                cost_type=spell_data["costType"],
+                description=spell_data["description"],
+                max_ammo=spell_data["maxammo"],
+                max_rank=spell_data["maxrank"],
+                name=spell_data["name"],
+                range_burn=spell_data["rangeBurn"],
+                resource=spell_data.get("resource", ""),
+                tooltip=spell_data["tooltip"],
+            ))
+            self.add(build_image(ChampionSpellImage, spell_data["image"], spell=spell))
+            for i, value in enumerate(spell_data["effectBurn"]):
+                self.add(ChampionEffectBurn(spell=spell, sort_int=i, value=value))
+            for i, var_data in enumerate(spell_data["vars"]):
+                self.add(ChampionSpellVar(
+                    spell=spell,
+                    coeff=join_coeff(var_data["coeff"]),
+                    key=var_data["key"],
+                    link=var_data["link"],
+                    sort_int=i,
+                ))
+
+    def build_summoner_spells(self):
+        for _spell in self.data["summoner_spells"].values():
+            spell = self.add_versioned(SummonerSpell(
+                _id=_spell["id"],
+                key=_spell["key"],
+                version=self.version,
+                language=self.language,
+                cooldown_burn=_spell["cooldownBurn"],
+                cost_burn=_spell["costBurn"],
+                cost_type=_spell["costType"],
+                description=_spell["description"],
+                max_ammo=_spell["maxammo"],
+                max_rank=_spell["maxrank"],
+                name=_spell["name"],
+                resource=_spell.get("resource", None),
+                summoner_level=_spell["summonerLevel"],
+                tooltip=_spell["tooltip"],
+            ))
+            for i, value in enumerate(_spell["effectBurn"]):
+                self.add(SummonerSpellEffectBurn(spell=spell, value=value, sort_int=i))
+            self.add(build_image(SummonerSpellImage, _spell["image"], spell=spell))
+            for i, mode in enumerate(_spell["modes"]):
+                self.add(SummonerSpellMode(spell=spell, name=mode, sort_int=i))
+            for i, var in enumerate(_spell["vars"]):
+                self.add(SummonerSpellVar(
+                    spell=spell,
+                    coeff=join_coeff(var["coeff"]),
+                    link=var["link"],
+                    key=var["key"],
+                    sort_int=i,
+                ))
+
+    def build_runes(self):
+        for tree_data in self.data["runes"]:
+            tree = ReforgedTree(
+                _id=tree_data["id"],
+                key=tree_data["key"],
+                name=tree_data["name"],
+                language=self.language,
+                version=self.version,
+                icon=tree_data["icon"],
+            )
+            tree.clean_icon()
+            self.add_versioned(tree)
+            for row, slot in enumerate(tree_data["slots"]):
+                for sort_int, _rune in enumerate(slot["runes"]):
+                    self.add(ReforgedRune(
+                        reforgedtree=tree,
+                        icon=_rune["icon"],
+                        _id=_rune["id"],
+                        key=_rune["key"],
+                        long_description=_rune["longDesc"],
+                        short_description=_rune["shortDesc"],
+                        name=_rune["name"],
+                        row=row,
+                        sort_int=sort_int,
+                    ))
+
+    def save(self, overwrite=False):
+        """Write every row in one transaction.
+
+        Parameters
+        ----------
+        overwrite : bool
+            replace data already imported for the version and language,
+            otherwise it is kept and only missing data is written
+
+        Returns
+        -------
+        dict
+            {model name: rows written}
+
+        """
+        counts = {}
+        with transaction.atomic():
+            skipped = set()
+            for model in GROUPS:
+                existing = model.objects.filter(version=self.version, language=self.language)
+                if not existing.exists():
+                    continue
+                if overwrite:
+                    existing.delete()
+                else:
+                    skipped.add(model)
+            for model, models in GROUPS.items():
+                if model in skipped:
+                    continue
+                for child in models:
+                    # parents are written first, so their ids are set by now
+                    child.objects.bulk_create(self.rows[child], batch_size=BATCH_SIZE)
+                    counts[child.__name__] = len(self.rows[child])
+            for tag_model, (model, field) in TAGS.items():
+                if model not in skipped:
+                    counts[tag_model.__name__] = self.save_tags(tag_model, field)
+            registry.bump_data_version()
+
+            for model in [ItemImage, ChampionImage]:
+                if model not in skipped:
+                    transaction.on_commit(partial(save_images, model, [x.id for x in self.rows[model]]))
+        return counts
+
+    def save_tags(self, tag_model, field: str):
+        tags = self.tags[tag_model]
+        # sorted, so parallel imports lock new tag names in the same order
+        names = sorted({name for name, _ in tags})
+        tag_model.objects.bulk_create([tag_model(name=x) for x in names], ignore_conflicts=True)
+        ids = dict(tag_model.objects.filter(name__in=names).values_list("name", "id"))
+        through = getattr(tag_model, field).through
+        tag_column = f"{tag_model._meta.model_name}_id"
+        object_column = f"{getattr(tag_model, field).field.related_model._meta.model_name}_id"
+        through.objects.bulk_create(
+            [through(**{tag_column: ids[name], object_column: instance.id}) for name, instance in tags],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        return len(tags)
+
+
+def save_images(model, ids: list[int]):
+    """Thumbnail a version's images and write its sprite atlas, see core.images."""
+    save_many_files.apply_async(
+        (model._meta.app_label, model._meta.model_name, ids),
+        {"atlas": True},
+        priority=queues.PRIORITY_BACKGROUND,
+    )
+
+
+def import_version(version: str, language="en_US", overwrite=False, threads=FETCH_THREADS):
+    """Fetch, build and save one version.
+
+    Returns
+    -------
+    dict
+        {model name: rows written}
+
+    """
+    start = time.perf_counter()
+    counts = VersionImport(version, language=language, threads=threads).fetch().build().save(overwrite=overwrite)
+    logger.info(
+        f"Imported {sum(counts.values())} rows for version {version} ({language}) "
+        f"in {time.perf_counter() - start:.1f}s."
+    )
+    return counts
+
+
+def import_versions(versions: list[str], language="en_US", overwrite=False, threads=VERSION_THREADS):
+    """Import several versions at once.
+
+    A version which fails is logged and left out, the others are still
+    imported.
+
+    Returns
+    -------
+    list[str]
+        the imported versions
+
+    """
+
+    def run(version):
+        try:
+            import_version(version, language=language, overwrite=overwrite)
+            return version
+        except Exception:
+            logger.exception(f"Could not import version {version}.")
+            return None
+
+    def run_in_thread(version):
+        try:
+            return run(version)
+        finally:
+            # every thread opened its own connection
+            connection.close()
+
+    if len(versions) <= 1 or threads <= 1:
+        out = [run(x) for x in versions]
+    else:
+        with ThreadPoolExecutor(max_workers=min(threads, len(versions))) as executor:
+            out = list(executor.map(run_in_thread, versions))
+    return [x for x in out if x is not None]
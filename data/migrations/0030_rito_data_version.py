@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0029_auto_20210326_2016'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rito',
+            name='data_version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.6 on 2026-10-18 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0031_champion_content_hash_item_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='championimage',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='itemimage',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=40),
+        ),
+    ]
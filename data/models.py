@@ -9,6 +9,8 @@ class Rito(models.Model):
     token = models.CharField(max_length=256, default="", blank=True)
     versions = models.CharField(max_length=10000, default="[]", blank=True)
     last_data_import = models.DateTimeField(null=True)
+    # bumped after each static data import, see data.registry
+    data_version = models.IntegerField(default=0)
 
     def __str__(self):
         return f'Rito(token="{self.token}")'
@@ -101,11 +103,14 @@ class ReforgedTree(VersionedModel):
     class Meta:
         unique_together = ("_id", "language", "version")
 
-    def save(self, *args, **kwargs):
+    def clean_icon(self):
         # I don't know how it happens, but sometimes we get the wrong url?
         if '.dds' in self.icon:
             self.icon = self.icon.replace('.dds', '.png')
             self.icon = self.icon.replace('ASSETS/Perks', 'perk-images')
+
+    def save(self, *args, **kwargs):
+        self.clean_icon()
         return super().save(*args, **kwargs)
 
     def __str__(self):
@@ -159,6 +164,8 @@ class Item(VersionedModel):
     special_recipe = models.IntegerField(null=True, blank=True)
     stacks = models.IntegerField(null=True, blank=True)
     last_changed = models.CharField(max_length=16, default=None, null=True, blank=True)
+    # see data.changes
+    content_hash = models.CharField(max_length=40, default="", blank=True)
 
     image: Union['ItemImage', None]
     gold: Union['ItemGold', None]
@@ -320,6 +327,8 @@ class Champion(VersionedModel):
     title = models.CharField(max_length=128, default="", blank=True)
     lore = models.CharField(max_length=2048, default="", blank=True)
     last_changed = models.CharField(max_length=16, default=None, null=True, blank=True)
+    # see data.changes
+    content_hash = models.CharField(max_length=40, default="", blank=True)
 
     created_date = models.DateTimeField(default=timezone.now)
 
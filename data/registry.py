@@ -0,0 +1,258 @@
+"""data/registry.py
+
+Process wide, in memory static data.
+
+Champions, items, runes, rune trees, summoner spells and profile icons only
+change when `data.importer` imports a new patch, so instead of a
+query per lookup every process loads them once, indexed by
+(entity, id, major, minor):
+
+    champion = registry.get("champion", 266)
+    url = registry.get_image_url("item", 3078, major=13, minor=4)
+
+Each version of an id is valid from its own patch until the next imported
+version, so "item 3078 as of 13.4" is a binary search over that id's
+versions and resolves to the newest version released on or before 13.4.
+
+Each entry only keeps what the hot paths need (name, image url, ...),
+not the model instance.
+
+Every import bumps `Rito.data_version` in its transaction.  Processes compare
+their loaded stamp with it at most once every `CHECK_SECONDS` and reload
+when it changed, so a lookup costs no queries.
+
+"""
+from django.core.files.storage import default_storage
+from django.db.models import F
+
+from .models import Rito, Champion, Item, ProfileIcon
+from .models import ReforgedRune, ReforgedTree, SummonerSpell
+
+import bisect
+import logging
+import sys
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# seconds between checks of Rito.data_version
+CHECK_SECONDS = 60
+
+DDRAGON = "https://ddragon.leagueoflegends.com/cdn"
+
+
+class Entry:
+    """One version of a piece of static data."""
+
+    __slots__ = ["id", "major", "minor", "patch", "version", "name", "url", "extra"]
+
+    def __init__(self, id, major, minor, patch, version, name="", url="", extra=None):
+        self.id = id
+        self.major = major or 0
+        self.minor = minor or 0
+        self.patch = patch or 0
+        self.version = version
+        self.name = name
+        self.url = url
+        self.extra = extra
+
+    def __repr__(self):
+        return f'Entry(id={self.id!r}, version="{self.version}", name="{self.name}")'
+
+    def image_url(self):
+        return self.url
+
+
+def load_champions():
+    query = Champion.objects.values_list(
+        "key", "major", "minor", "patch", "version", "name", "_id", "image__full",
+        "image__file", "image__file_15", "image__file_30", "image__file_40",
+    )
+    for key, major, minor, patch, version, name, _id, full, *files in query:
+        url = f"{DDRAGON}/{version}/img/champion/{full}" if full else ""
+        extra = {"_id": _id, "image": files if full else None}
+        yield Entry(key, major, minor, patch, version, name, url, extra)
+
+
+def load_items():
+    query = Item.objects.values_list(
+        "_id", "major", "minor", "patch", "version", "name", "image__full",
+        "image__file", "image__file_15", "image__file_30", "image__file_40",
+    )
+    for _id, major, minor, patch, version, name, full, *files in query:
+        url = f"{DDRAGON}/{version}/img/item/{full}" if full else ""
+        yield Entry(_id, major, minor, patch, version, name, url, {"image": files if full else None})
+
+
+def load_spells():
+    query = SummonerSpell.objects.values_list(
+        "key", "major", "minor", "patch", "version", "name", "image__full",
+    )
+    for key, major, minor, patch, version, name, full in query:
+        url = f"{DDRAGON}/{version}/img/spell/{full}" if full else ""
+        yield Entry(key, major, minor, patch, version, name, url)
+
+
+def load_runes():
+    query = ReforgedRune.objects.values_list(
+        "_id", "reforgedtree__major", "reforgedtree__minor", "reforgedtree__patch",
+        "reforgedtree__version", "name", "icon",
+    )
+    for _id, major, minor, patch, version, name, icon in query:
+        yield Entry(_id, major, minor, patch, version, name, f"{DDRAGON}/img/{icon}")
+
+
+def load_rune_trees():
+    query = ReforgedTree.objects.values_list("_id", "major", "minor", "patch", "version", "name", "icon")
+    for _id, major, minor, patch, version, name, icon in query:
+        yield Entry(_id, major, minor, patch, version, name, f"{DDRAGON}/img/{icon}")
+
+
+def load_profile_icons():
+    query = ProfileIcon.objects.values_list("_id", "major", "minor", "patch", "version", "full")
+    for _id, major, minor, patch, version, full in query:
+        yield Entry(_id, major, minor, patch, version, "", f"{DDRAGON}/{version}/img/profileicon/{full}")
+
+
+LOADERS = {
+    "champion": load_champions,
+    "item": load_items,
+    "spell": load_spells,
+    "rune": load_runes,
+    "rune_tree": load_rune_trees,
+    "profile_icon": load_profile_icons,
+}
+
+
+class Index:
+    """Every version of one entity, as intervals of patches.
+
+    Parameters
+    ----------
+    entries : iterable[Entry]
+
+    """
+
+    def __init__(self, entries):
+        versions: dict[object, dict[tuple, Entry]] = {}
+        for entry in entries:
+            # keep one entry per version, ie: when several languages were imported
+            versions.setdefault(entry.id, {}).setdefault((entry.major, entry.minor, entry.patch), entry)
+        # {id: sorted version keys}, {id: entries in the same order}
+        self.starts: dict[object, list[tuple]] = {}
+        self.entries: dict[object, list[Entry]] = {}
+        for id, by_version in versions.items():
+            starts = sorted(by_version)
+            self.starts[id] = starts
+            self.entries[id] = [by_version[x] for x in starts]
+
+    def get(self, id, major=None, minor=None):
+        """Get the entry as of a patch, or the newest one.
+
+        A patch older than every imported version resolves to the oldest.
+        """
+        entries = self.entries.get(id)
+        if not entries:
+            return None
+        if major is None or minor is None:
+            return entries[-1]
+        i = bisect.bisect_right(self.starts[id], (major, minor, sys.maxsize))
+        return entries[max(i - 1, 0)]
+
+
+class Registry:
+    """Every static data Index, reloaded when Rito.data_version changes.
+    """
+
+    def __init__(self, check_seconds=CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self.lock = threading.Lock()
+        self.indexes: dict[str, Index] | None = None
+        self.version = None
+        self.checked = 0.0
+
+    def get_indexes(self):
+        indexes = self.indexes
+        if indexes is not None and time.monotonic() - self.checked < self.check_seconds:
+            return indexes
+        with self.lock:
+            if self.indexes is not None and time.monotonic() - self.checked < self.check_seconds:
+                return self.indexes
+            version = get_data_version()
+            if self.indexes is None or version != self.version:
+                start = time.perf_counter()
+                self.indexes = {name: Index(loader()) for name, loader in LOADERS.items()}
+                self.version = version
+                logger.info(f"Loaded static data version {version} in {time.perf_counter() - start:.2f}s.")
+            self.checked = time.monotonic()
+            return self.indexes
+
+    def get(self, entity: str, id, major=None, minor=None):
+        return self.get_indexes()[entity].get(id, major=major, minor=minor)
+
+    def clear(self):
+        with self.lock:
+            self.indexes = None
+            self.version = None
+
+
+def get_data_version():
+    return Rito.objects.values_list("data_version", flat=True).first() or 0
+
+
+def bump_data_version():
+    """Tell every process to reload, ie: at the end of a static data import.
+    """
+    if not Rito.objects.update(data_version=F("data_version") + 1):
+        Rito.objects.create(data_version=1)
+    _registry.clear()
+
+
+_registry = Registry()
+
+
+def get(entity: str, id, major=None, minor=None):
+    """Get an Entry of `entity` in LOADERS.
+
+    Parameters
+    ----------
+    entity : str
+    id : int | str
+        the key of a champion or spell, the _id of anything else
+    major : int
+    minor : int
+        the patch to resolve the entry as of, leave out for the newest
+
+    Returns
+    -------
+    Entry | None
+
+    """
+    return _registry.get(entity, id, major=major, minor=minor)
+
+
+def get_image_url(entity: str, id, major=None, minor=None):
+    entry = get(entity, id, major=major, minor=minor)
+    return entry.url if entry else ""
+
+
+def serialize_image(entry: Entry):
+    """Same as ChampionImageSerializer and ItemImageSerializer."""
+    image = entry.extra["image"]
+    if image is None:
+        return None
+    return {
+        name: default_storage.url(value) if value else None
+        for name, value in zip(["file", "file_15", "file_30", "file_40"], image)
+    }
+
+
+def serialize_champion(entry: Entry):
+    """Same as BasicChampionWithImageSerializer."""
+    return {"_id": entry.extra["_id"], "name": entry.name, "image": serialize_image(entry), "key": entry.id}
+
+
+def clear():
+    _registry.clear()
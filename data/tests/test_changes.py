@@ -0,0 +1,60 @@
+"""data/tests/test_changes.py
+"""
+from django.test import TestCase
+from unittest import mock
+
+from data.models import Item, ItemGold, ItemStat, Champion, Rito
+from data import changes, importer, registry
+from data.tests.test_importer import get_api
+
+
+class LastChangedTest(TestCase):
+    def create_item(self, version, total, armor=None):
+        item = Item.objects.create(_id=3075, version=version, language="en_US")
+        ItemGold.objects.create(item=item, base=100, sell=70, total=total)
+        if armor is not None:
+            ItemStat.objects.create(item=item, key="FlatArmorMod", value=armor)
+        return item
+
+    def test_update_last_changed(self):
+        self.create_item("13.1.1", 2700)
+        self.create_item("13.2.1", 2700)
+        self.create_item("13.3.1", 2800)
+        self.create_item("13.10.1", 2800)
+        self.create_item("13.11.1", 2800, armor=70)
+        self.create_item("13.12.1", 2800, armor=70)
+
+        self.assertEqual(changes.update_last_changed(Item), 6)
+        last_changed = dict(Item.objects.values_list("version", "last_changed"))
+        self.assertEqual(last_changed, {
+            "13.1.1": "13.1.1",
+            "13.2.1": "13.1.1",
+            "13.3.1": "13.3.1",
+            "13.10.1": "13.3.1",
+            "13.11.1": "13.11.1",
+            "13.12.1": "13.11.1",
+        })
+        chain = changes.get_change_chain(Item, 3075)
+        self.assertEqual([x.version for x in chain], ["13.11.1", "13.3.1", "13.1.1"])
+        # nothing to do the second time
+        self.assertEqual(changes.update_last_changed(Item), 0)
+
+
+class ImportHashTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        Rito.objects.create()
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_hash_matches_db(self):
+        """A hash set at import equals the hash of the same rows read back."""
+        with mock.patch.object(importer, "get_riot_api", return_value=get_api()):
+            importer.import_version("13.4.1")
+        for model in [Item, Champion]:
+            imported = dict(model.objects.values_list("id", "content_hash"))
+            self.assertTrue(all(imported.values()))
+            model.objects.update(content_hash="")
+            changes.HASHERS[model](model.objects.all())
+            self.assertEqual(dict(model.objects.values_list("id", "content_hash")), imported)
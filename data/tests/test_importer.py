@@ -0,0 +1,134 @@
+"""data/tests/test_importer.py
+"""
+from django.test import TestCase
+from unittest import mock
+
+from data.models import Item, ItemTag, Champion, ChampionSpell
+from data.models import ProfileIcon, ReforgedTree, SummonerSpell, Rito
+from data import importer, registry
+
+
+IMAGE = {"full": "x.png", "group": "g", "h": 48, "sprite": "s.png", "w": 48, "x": 0, "y": 0}
+
+
+def get_item(name, tags):
+    return {
+        "name": name, "colloq": "", "description": "", "plaintext": "",
+        "gold": {"base": 100, "purchasable": True, "sell": 70, "total": 300},
+        "image": IMAGE, "maps": {"11": True}, "stats": {"FlatHPPoolMod": 150},
+        "tags": tags, "from": [1001], "effect": {"Effect1Amount": "0.5"},
+    }
+
+
+def get_champion(name, key):
+    return {
+        "id": name, "key": str(key), "name": name, "partype": "Mana", "title": "",
+        "lore": f"{name} lore",
+        "info": {"attack": 1, "defense": 2, "difficulty": 3, "magic": 4},
+        "image": IMAGE,
+        "stats": {
+            "armor": 1, "armorperlevel": 1, "attackdamage": 1, "attackdamageperlevel": 1,
+            "attackrange": 1, "attackspeed": 1, "attackspeedperlevel": 1, "crit": 0,
+            "critperlevel": 0, "hp": 1, "hpperlevel": 1, "hpregen": 1, "hpregenperlevel": 1,
+            "movespeed": 1, "mp": 1, "mpperlevel": 1, "mpregen": 1, "mpregenperlevel": 1,
+            "spellblock": 1, "spellblockperlevel": 1,
+        },
+        "tags": ["Mage"],
+        "passive": {"name": "p", "description": "", "image": IMAGE},
+        "skins": [{"id": key * 1000, "num": 0, "name": "default", "chromas": False}],
+        "spells": [{
+            "id": f"{name}Q", "cooldownBurn": "1", "costBurn": "1", "costType": "",
+            "description": "", "maxammo": "-1", "maxrank": 5, "name": "Q", "rangeBurn": "1",
+            "tooltip": "", "image": IMAGE, "effectBurn": [None, "1"],
+            "vars": [{"coeff": [0.1, 0.2], "key": "a1", "link": "spelldamage"}],
+        }],
+    }
+
+
+def get_api(item_name="Ruby Crystal"):
+    champions = {"Ahri": get_champion("Ahri", 103), "Annie": get_champion("Annie", 1)}
+
+    def respond(data):
+        return mock.Mock(status_code=200, json=mock.Mock(return_value=data))
+
+    def get_champions(name=None, **kwargs):
+        if name is None:
+            return respond({"data": champions})
+        return respond({"data": {name: champions[name]}})
+
+    api = mock.Mock()
+    api.lolstaticdata.items.return_value = respond({"data": {
+        "1028": get_item(item_name, ["Health"]),
+        "3067": get_item("Kindlegem", ["Health", "CooldownReduction"]),
+    }})
+    api.lolstaticdata.profile_icons.return_value = respond({"data": {"1": {"id": 1, "image": IMAGE}}})
+    api.lolstaticdata.champions.side_effect = get_champions
+    api.lolstaticdata.summoner_spells.return_value = respond({"data": {"SummonerFlash": {
+        "id": "SummonerFlash", "key": "4", "cooldownBurn": "300", "costBurn": "0",
+        "costType": "", "description": "", "maxammo": "-1", "maxrank": 1, "name": "Flash",
+        "summonerLevel": 7, "tooltip": "", "effectBurn": [None], "image": IMAGE,
+        "modes": ["CLASSIC"], "vars": [],
+    }}})
+    api.lolstaticdata.runes_reforged.return_value = respond([{
+        "id": 8100, "key": "Domination", "name": "Domination", "icon": "ASSETS/Perks/7200.dds",
+        "slots": [{"runes": [{
+            "id": 8112, "key": "Electrocute", "name": "Electrocute", "icon": "e.png",
+            "longDesc": "", "shortDesc": "",
+        }]}],
+    }])
+    return api
+
+
+class ImportVersionTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        Rito.objects.create()
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_import(self):
+        with mock.patch.object(importer, "get_riot_api", return_value=get_api()):
+            counts = importer.import_version("13.4.1")
+        self.assertEqual(counts["Item"], 2)
+        self.assertEqual(counts["ChampionTag"], 2)
+
+        item = Item.objects.get(_id=1028)
+        self.assertEqual((item.major, item.minor, item.patch), (13, 4, 1))
+        self.assertEqual(item.gold.total, 300)
+        self.assertEqual(item.image.full, "x.png")
+        self.assertEqual(ItemTag.objects.get(name="Health").items.count(), 2)
+        champion = Champion.objects.get(_id="Ahri")
+        self.assertEqual(champion.lore, "Ahri lore")
+        self.assertEqual(champion.tags.get().name, "Mage")
+        self.assertEqual(champion.passive.image.full, "x.png")
+        spell = ChampionSpell.objects.get(champion=champion)
+        self.assertEqual(spell.vars.get().coeff, "0.1/0.2")
+        self.assertEqual(spell.effect_burn.count(), 2)
+        self.assertEqual(SummonerSpell.objects.get().modes.get().name, "CLASSIC")
+        self.assertEqual(ProfileIcon.objects.count(), 1)
+        tree = ReforgedTree.objects.get()
+        self.assertEqual(tree.icon, "perk-images/7200.png")
+        self.assertEqual(tree.reforgedrunes.get()._id, 8112)
+        self.assertEqual(Rito.objects.get().data_version, 1)
+
+    def test_overwrite(self):
+        with mock.patch.object(importer, "get_riot_api", return_value=get_api()):
+            importer.import_version("13.4.1")
+        with mock.patch.object(importer, "get_riot_api", return_value=get_api("Ruby")):
+            importer.import_version("13.4.1")
+        self.assertEqual(Item.objects.get(_id=1028).name, "Ruby Crystal")
+
+        with mock.patch.object(importer, "get_riot_api", return_value=get_api("Ruby")):
+            importer.import_version("13.4.1", overwrite=True)
+        self.assertEqual(Item.objects.get(_id=1028).name, "Ruby")
+        self.assertEqual(Champion.objects.count(), 2)
+        self.assertEqual(ItemTag.objects.get(name="Health").items.count(), 2)
+
+    def test_failed_fetch(self):
+        api = get_api()
+        api.lolstaticdata.runes_reforged.return_value = mock.Mock(status_code=503)
+        with mock.patch.object(importer, "get_riot_api", return_value=api):
+            self.assertEqual(importer.import_versions(["13.4.1"]), [])
+        self.assertFalse(Item.objects.exists())
+        self.assertEqual(Rito.objects.get().data_version, 0)
@@ -0,0 +1,41 @@
+"""data/tests/test_registry.py
+"""
+from django.test import TestCase
+
+from data import registry
+from data.models import Item, Rito, SummonerSpell, SummonerSpellImage
+
+
+class RegistryTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        for version in ['13.1.1', '13.2.1']:
+            Item.objects.create(_id=3078, version=version, name=f'Trinity Force {version}')
+            spell = SummonerSpell.objects.create(
+                key=4, _id='SummonerFlash', version=version, language='en_US', max_rank=1, summoner_level=7,
+            )
+            SummonerSpellImage.objects.create(spell=spell, full='SummonerFlash.png', h=48, w=48, x=0, y=0)
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_get(self):
+        self.assertEqual(registry.get('item', 3078).version, '13.2.1')
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get('item', 3078, major=13, minor=1).version, '13.1.1')
+            # a version is used until the next one is released
+            self.assertEqual(registry.get('item', 3078, major=13, minor=4).version, '13.2.1')
+            self.assertEqual(registry.get('item', 3078, major=12, minor=1).version, '13.1.1')
+            self.assertIsNone(registry.get('item', 1))
+            self.assertEqual(
+                registry.get_image_url('spell', 4),
+                'https://ddragon.leagueoflegends.com/cdn/13.2.1/img/spell/SummonerFlash.png',
+            )
+
+    def test_bump_data_version(self):
+        registry.get('item', 3078)
+        Item.objects.create(_id=3078, version='13.3.1')
+        self.assertEqual(registry.get('item', 3078).version, '13.2.1')
+        registry.bump_data_version()
+        self.assertEqual(Rito.objects.get().data_version, 1)
+        self.assertEqual(registry.get('item', 3078).version, '13.3.1')
@@ -5,6 +5,7 @@ from rest_framework import exceptions
 from rest_framework.generics import ListAPIView
 
 from data import constants
+from data import changes
 
 from .models import ReforgedRune, ReforgedTree
 from .models import Champion, Item
@@ -82,24 +83,18 @@ def get_item(request, format=None):
 @api_view(['GET'])
 def get_item_history(request, _id, format=None):
     """Get the stat history of an item.
+
+    Every version which changed the item, newest first, see data.changes.
+
+    GET Parameters
+    --------------
+    language : str
+
     """
-    item = Item.objects.filter(_id=_id).order_by('_id', '-major', '-minor').distinct('_id').first()
-    if item is None:
+    language = request.GET.get('language', 'en_US')
+    if not Item.objects.filter(_id=_id).exists():
         raise exceptions.NotFound(f'Could not find item with id {_id}')
-    item_history = []
-    while item:
-        version = item.last_changed
-        if version and version != item.version:
-            item = Item.objects.get(_id=_id, version=version)
-            item_history.append(item)
-        else:
-            break
-    qs = Item.objects.filter(_id=_id, major__lte=item.major, minor__lte=item.minor).order_by(
-        '-major', '-minor',
-    )
-    if qs.count() > 1:
-        item = qs[1]
-        item_history.append(item)
+    item_history = changes.get_change_chain(Item, _id, language=language)
     data = ItemSerializer(item_history, many=True).data
     return Response(data)
 
@@ -5,7 +5,10 @@ https://gist.github.com/goutomroy/d61fc8a8445954c71b5585af042e5cf4
 from django.db import connection, reset_queries
 import time
 import functools
+from django.db.models import Q
 from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 def query_debugger(func):
@@ -78,3 +81,88 @@ class CustomLimitOffsetPagination(LimitOffsetPagination):
         if self.count == 0 or self.offset > self.count:
             return []
         return queryset[self.offset:self.offset + self.limit]
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """Page through a queryset in descending `keyset` order.
+
+    The `next` link carries a cursor of the last row's keyset values, so
+    every page is an index range scan of `limit` rows no matter how deep it
+    is, and there is no count().  `start` is still accepted for the first
+    request of a listing.
+
+    The queryset must be ordered by `keyset` descending.
+
+    """
+    offset_query_param = 'start'
+    limit_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    default_limit = 10
+    max_limit = 100
+    keyset = ('game_creation', 'match_id')
+
+    def get_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = [int(x) for x in cursor.split('_')]
+        except ValueError:
+            return None
+        if len(values) != len(self.keyset):
+            return None
+        return values
+
+    def encode_cursor(self, row):
+        return '_'.join(str(getattr(row, field)) for field in self.keyset)
+
+    def filter_after(self, queryset, cursor):
+        # (a, b) < (x, y)  ==  a < x OR (a = x AND b < y)
+        q = Q()
+        for i, field in enumerate(self.keyset):
+            term = Q(**{f'{field}__lt': cursor[i]})
+            for prev_field, value in zip(self.keyset[:i], cursor[:i]):
+                term &= Q(**{prev_field: value})
+            q |= term
+        return queryset.filter(q)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            self.limit = self.default_limit
+        self.request = request
+        self.offset = 0
+        cursor = self.get_cursor(request)
+        if cursor is not None:
+            queryset = self.filter_after(queryset, cursor)
+        else:
+            self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        rows = rows[:self.limit]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from match.models import Match, Participant, Stats
+from player import analytics, filters, rollups
+
+import time
+
+import numpy as np
+
+
+class Command(BaseCommand):
+    help = (
+        "Time player.analytics against get_summoner_champions_overview on a generated "
+        "match history.  Everything is written in a transaction which is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def timeit(self, name, func, repeat):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        self.stdout.write(f"{name:<40} best {min(times) * 1000:8.1f}ms  mean {np.mean(times) * 1000:8.1f}ms")
+
+    def generate(self, puuid: str, games: int):
+        rng = np.random.default_rng(0)
+        start = 1_600_000_000_000
+        matches = Match.objects.bulk_create([
+            Match(
+                _id=f"BENCH_{i}",
+                game_creation=start + i * 3_600_000,
+                game_duration=int(rng.integers(15, 45)) * 60 * 1000,
+                map_id=11,
+                queue_id=int(rng.choice([400, 420, 440, 450])),
+                build=1,
+                major=int(rng.integers(11, 14)),
+                minor=int(rng.integers(1, 25)),
+                patch=1,
+            )
+            for i in range(games)
+        ], batch_size=1000)
+        participants = Participant.objects.bulk_create([
+            Participant(
+                match=match,
+                _id=1,
+                puuid=puuid,
+                champion_id=int(rng.integers(1, 160)),
+                summoner_1_id=4,
+                summoner_2_id=14,
+                team_id=100,
+                team_position=str(rng.choice(["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"])),
+            )
+            for match in matches
+        ], batch_size=1000)
+        Stats.objects.bulk_create([
+            Stats(
+                participant=participant,
+                win=bool(rng.integers(0, 2)),
+                kills=int(rng.integers(0, 20)),
+                deaths=int(rng.integers(0, 15)),
+                assists=int(rng.integers(0, 25)),
+                total_damage_dealt_to_champions=int(rng.integers(5000, 60000)),
+                total_damage_taken=int(rng.integers(5000, 60000)),
+                gold_earned=int(rng.integers(5000, 20000)),
+                vision_score=int(rng.integers(0, 100)),
+                total_minions_killed=int(rng.integers(0, 300)),
+            )
+            for participant in participants
+        ], batch_size=1000)
+        rollups.add_matches([x.id for x in matches])
+        # so the planner sees the generated rows
+        with connection.cursor() as cursor:
+            for model in [Match, Participant, Stats]:
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def handle(self, *args, **options):
+        puuid = "benchmark-analytics"
+        repeat = options["repeat"]
+        with transaction.atomic():
+            self.generate(puuid, options["games"])
+            self.stdout.write(f"Generated {options['games']} games.")
+
+            def overview(**kwargs):
+                return list(filters.get_summoner_champions_overview(puuid=puuid, **kwargs))
+
+            self.timeit("overview (Stats)", lambda: overview(start_datetime="2000-01-01T00:00:00Z"), repeat)
+            self.timeit("overview (ChampionRollup)", overview, repeat)
+            self.timeit(
+                "analytics cold, by champion",
+                lambda: analytics.load_columns(puuid).group(["champion_id"]),
+                repeat,
+            )
+            columns = analytics.load_columns(puuid)
+            self.timeit("analytics warm, by champion", lambda: columns.group(["champion_id"]), repeat)
+            self.timeit(
+                "analytics warm, by role and weekday",
+                lambda: columns.group(["team_position", "weekday"], queue_in=[420]),
+                repeat,
+            )
+            transaction.set_rollback(True)
@@ -8,6 +8,8 @@ import sys
 from django.core.management.base import BaseCommand
 from django.utils import autoreload
 
+from lolsite.queues import QUEUES
+
 
 def restart_celery():
     # cmd = 'pkill -f "celery worker"'
@@ -15,12 +17,12 @@ def restart_celery():
     if platform in ["win32"]:
         win_cmd = "taskkill /IM celery.exe /F"
         subprocess.call(win_cmd)
-        win_cmd = "celery -A lolsite worker -l info -P gevent"
+        win_cmd = f"celery -A lolsite worker -l info -P gevent -Q {','.join(QUEUES)}"
         subprocess.call(win_cmd, shell=True)
     elif platform in ["darwin", "linux"]:
         cmd = "pkill -f celery worker"
         subprocess.call(shlex.split(cmd))
-        cmd = "celery -A lolsite worker -l info"
+        cmd = f"celery -A lolsite worker -l info -Q {','.join(QUEUES)}"
         subprocess.call(shlex.split(cmd))
     else:
         print(f"Autoreloading celery for platform {platform} not yet configured.")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from player import rollups
+from player.models import Summoner
+
+
+class Command(BaseCommand):
+    help = "Rebuild the champion, played with and rank rollups from imported data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--puuid", default=None, help="Only rebuild one summoner.")
+
+    def handle(self, *args, **options):
+        puuid = options["puuid"]
+        count = rollups.rebuild(puuid=puuid)
+        self.stdout.write(f"Rebuilt {count} champion rollups.")
+
+        summoner_id = None
+        if puuid is not None:
+            summoner_id = Summoner.objects.get(puuid=puuid).id
+        count = rollups.rebuild_rank_rollups(summoner_id=summoner_id)
+        self.stdout.write(f"Rebuilt {count} rank rollups.")
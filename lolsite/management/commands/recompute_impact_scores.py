@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from match import impact
+
+
+class Command(BaseCommand):
+    help = "Recompute every participant's impact score, ie: after changing match.impact.WEIGHTS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=impact.BATCH_SIZE, help="Matches per batch.")
+
+    def handle(self, *args, **options):
+        count = impact.recompute(batch_size=options["batch_size"])
+        self.stdout.write(f"Recomputed {count} impact scores.")
@@ -1,18 +1,22 @@
 from celery.schedules import crontab
 from .celery import app
+from . import queues
 
 app.conf.beat_schedule = {
     "pt-handle-name-changes": {
         "task": "match.tasks.handle_name_changes",
         "schedule": crontab(minute="0"),
+        "options": {"priority": queues.PRIORITY_CRON},
     },
     "pt-handle-old-notifications": {
         "task": "notification.tasks.delete_old_notifications",
         "schedule": crontab(minute="1", hour="1"),
+        "options": {"priority": queues.PRIORITY_CRON},
     },
     "pt-import-patch-data": {
         "task": "data.tasks.import_missing",
         "schedule": crontab(minute="10"),
+        "options": {"priority": queues.PRIORITY_CRON},
     },
 }
 app.conf.timezone = "America/Denver"  # type: ignore
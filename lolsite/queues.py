@@ -0,0 +1,52 @@
+"""lolsite/queues.py
+
+Celery queue topology.
+
+    interactive   work a user is waiting on (page view imports)
+    bulk_import   summoner backfills and rank refreshes after imports
+    static_data   patch data imports and image thumbnails
+    maintenance   periodic cleanup and reconciliation
+
+Run separate workers for `interactive` and for the background queues so a
+large backfill can never delay an interactive import, ie:
+
+    celery -A lolsite worker -Q interactive
+    celery -A lolsite worker -Q bulk_import,static_data,maintenance
+
+Within a queue, callers pick a priority (0 is the highest).
+
+"""
+INTERACTIVE = "interactive"
+BULK_IMPORT = "bulk_import"
+STATIC_DATA = "static_data"
+MAINTENANCE = "maintenance"
+
+QUEUES = [INTERACTIVE, BULK_IMPORT, STATIC_DATA, MAINTENANCE]
+
+# a user is waiting on the result
+PRIORITY_USER = 0
+# triggered by a user but nobody is waiting on it
+PRIORITY_BACKGROUND = 5
+# scheduled by celery beat
+PRIORITY_CRON = 9
+
+ROUTES = {
+    "match.tasks.import_match": INTERACTIVE,
+    "match.tasks.import_recent_matches": INTERACTIVE,
+    "match.tasks.refresh_recent_matches": INTERACTIVE,
+    "match.tasks.import_advanced_timeline": INTERACTIVE,
+    "player.tasks.import_summoner": INTERACTIVE,
+    "player.tasks.import_positions": INTERACTIVE,
+
+    "match.tasks.bulk_import": BULK_IMPORT,
+    "match.tasks.backfill_matches": BULK_IMPORT,
+    # fanned out after imports, nobody is waiting on it
+    "player.tasks.import_many_positions": BULK_IMPORT,
+
+    "data.tasks.*": STATIC_DATA,
+    "core.models.save_files": STATIC_DATA,
+    "core.models.save_many_files": STATIC_DATA,
+
+    "match.tasks.handle_name_changes": MAINTENANCE,
+    "notification.tasks.*": MAINTENANCE,
+}
@@ -0,0 +1,301 @@
+"""lolsite/ratelimit.py
+
+Shared scheduler for Riot API requests.
+
+Riot enforces an application rate limit per routing value (na1, euw1,
+americas, ...) as well as a method rate limit per endpoint.  Every celery
+worker and gunicorn process draws from the same budget, so the token buckets
+live in redis.  When no redis url is configured, the buckets are kept
+in-process instead.
+
+"""
+from urllib.parse import urlparse
+from django.conf import settings
+
+import inspect
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# resources which are routed by region cluster (americas, europe, asia)
+V5_RESOURCES = {"match", "tftmatch"}
+
+# KEYS: the bucket keys, then the block keys
+# ARGV: now, the number of buckets, then capacity and window of each bucket
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local n = tonumber(ARGV[2])
+local wait = 0
+for i = n + 1, #KEYS do
+    local block = redis.call('PTTL', KEYS[i])
+    if block > wait then
+        wait = block
+    end
+end
+local state = {}
+for i = 1, n do
+    local capacity = tonumber(ARGV[2 * i + 1])
+    local window = tonumber(ARGV[2 * i + 2])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1])
+    local ts = tonumber(bucket[2])
+    if tokens == nil then
+        tokens = capacity
+        ts = now
+    end
+    tokens = math.min(capacity, tokens + (now - ts) * capacity / window)
+    if tokens < 1 then
+        wait = math.max(wait, math.ceil((1 - tokens) * window / capacity))
+    end
+    state[i] = tokens
+end
+if wait > 0 then
+    return wait
+end
+for i = 1, n do
+    local window = tonumber(ARGV[2 * i + 2])
+    redis.call('HSET', KEYS[i], 'tokens', state[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], window * 2)
+end
+return 0
+"""
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+def parse_limits(value: str | None):
+    """Parse a riot limit header like "20:1,100:120" into [(count, seconds)].
+    """
+    limits = []
+    for part in (value or "").split(","):
+        if ":" in part:
+            count, seconds = part.strip().split(":")
+            limits.append((int(count), int(seconds)))
+    return limits
+
+
+class LocalBucketStore:
+    """In-process token buckets.  Only correct for a single process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: dict[str, tuple[float, int]] = {}
+        self.blocks: dict[str, int] = {}
+        self.limits: dict[str, str] = {}
+
+    def try_acquire(self, keys: list[tuple[str, int, int]], block_keys: list[str], now: int):
+        """Try to take a token from every bucket.
+
+        Nothing is taken while any of `block_keys` is blocked.
+
+        Returns
+        -------
+        int
+            0 if the tokens were taken, else the number of ms to wait.
+
+        """
+        with self.lock:
+            wait = max([0] + [self.blocks.get(x, 0) - now for x in block_keys])
+            state = []
+            for key, capacity, window in keys:
+                tokens, ts = self.buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - ts) * capacity / window)
+                if tokens < 1:
+                    wait = max(wait, int((1 - tokens) * window / capacity) + 1)
+                state.append((key, tokens))
+            if wait > 0:
+                return wait
+            for key, tokens in state:
+                self.buckets[key] = (tokens - 1, now)
+            return 0
+
+    def block(self, block_key: str, until: int):
+        with self.lock:
+            self.blocks[block_key] = max(self.blocks.get(block_key, 0), until)
+
+    def get_limits(self, key: str):
+        return self.limits.get(key)
+
+    def set_limits(self, key: str, value: str):
+        self.limits[key] = value
+
+
+class RedisBucketStore:
+    """Token buckets shared by every process through redis."""
+
+    def __init__(self, url: str):
+        import redis
+        self.redis = redis.Redis.from_url(url)
+        self.script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def try_acquire(self, keys: list[tuple[str, int, int]], block_keys: list[str], now: int):
+        args: list[int] = [now, len(keys)]
+        for _, capacity, window in keys:
+            args += [capacity, window]
+        return int(self.script(keys=[x[0] for x in keys] + block_keys, args=args))
+
+    def block(self, block_key: str, until: int):
+        ttl = until - int(time.time() * 1000)
+        if ttl > 0:
+            self.redis.set(block_key, 1, px=ttl)
+
+    def get_limits(self, key: str):
+        value = self.redis.get(key)
+        return value.decode() if value else None
+
+    def set_limits(self, key: str, value: str):
+        self.redis.set(key, value, ex=60 * 60 * 24)
+
+
+class RateLimiter:
+    """Schedule requests against riot's app and method rate limits.
+
+    Parameters
+    ----------
+    store : LocalBucketStore | RedisBucketStore
+    app_limits : str
+        riot style limits, ie: "20:1,100:120".  Replaced by the
+        X-App-Rate-Limit header once riot has responded.
+    prefix : str
+        key prefix used for the buckets
+
+    """
+
+    def __init__(self, store, app_limits="20:1,100:120", prefix="riot-rl"):
+        self.store = store
+        self.app_limits = app_limits
+        self.prefix = prefix
+
+    def _key(self, route: str, scope: str):
+        return f"{self.prefix}:{route}:{scope}"
+
+    def get_limits(self, route: str, scope: str):
+        value = self.store.get_limits(self._key(route, scope) + ":limits")
+        if value is None and scope == "app":
+            value = self.app_limits
+        return parse_limits(value)
+
+    def acquire(self, route: str, method: str, timeout=120):
+        """Block until a request to `method` on `route` is allowed.
+        """
+        start = time.time()
+        keys = []
+        for scope in ["app", method]:
+            for count, seconds in self.get_limits(route, scope):
+                keys.append((self._key(route, f"{scope}:{seconds}"), count, seconds * 1000))
+        # an app or method 429 block stops every token from being taken
+        block_keys = [self._key(route, "block"), self._key(route, f"{method}:block")]
+        while True:
+            now = int(time.time() * 1000)
+            wait = self.store.try_acquire(keys, block_keys, now)
+            if wait <= 0:
+                return
+            if time.time() - start + wait / 1000 > timeout:
+                raise RateLimitTimeout(f"Waited too long for {route}:{method}.")
+            time.sleep(wait / 1000)
+
+    def update(self, route: str, method: str, response):
+        """Learn the current limits from riot's response headers.
+
+        On a 429, block the offending scope for `Retry-After` seconds so that
+        every worker backs off, not just this one.
+
+        """
+        headers = getattr(response, "headers", None) or {}
+        for scope, header in [("app", "X-App-Rate-Limit"), (method, "X-Method-Rate-Limit")]:
+            value = headers.get(header)
+            if value and value != self.store.get_limits(self._key(route, scope) + ":limits"):
+                self.store.set_limits(self._key(route, scope) + ":limits", value)
+        if response.status_code == 429:
+            retry_after = float(headers.get("Retry-After", 1))
+            until = int((time.time() + retry_after) * 1000)
+            limit_type = headers.get("X-Rate-Limit-Type", "application")
+            if limit_type == "method":
+                self.store.block(self._key(route, f"{method}:block"), until)
+            else:
+                self.store.block(self._key(route, "block"), until)
+            logger.warning(
+                f"Riot {limit_type} rate limit hit for {route}:{method}, "
+                f"retrying after {retry_after}s."
+            )
+
+
+class RateLimitedResource:
+    """Proxy a lolwrapper resource, scheduling every call through a RateLimiter.
+    """
+
+    def __init__(self, resource, name: str, limiter: RateLimiter, max_retries=3):
+        self._resource = resource
+        self._name = name
+        self._limiter = limiter
+        self._max_retries = max_retries
+
+    def __getattr__(self, attr):
+        value = getattr(self._resource, attr)
+        if attr.startswith("_") or not inspect.ismethod(value):
+            return value
+        return self._wrap(value, f"{self._name}.{attr}")
+
+    def _route(self, region: str):
+        base = self._resource.base
+        try:
+            url = base.get_base_url(region, use_v5_region=self._name in V5_RESOURCES)
+        except KeyError:
+            return region
+        return urlparse(url).netloc.split(".")[0]
+
+    def _wrap(self, func, method: str):
+        signature = inspect.signature(func)
+
+        def call(*args, **kwargs):
+            region = signature.bind_partial(*args, **kwargs).arguments.get("region")
+            if not region:
+                # not a riot api endpoint (ie: ddragon), nothing to schedule
+                return func(*args, **kwargs)
+            route = self._route(region)
+            for _ in range(self._max_retries + 1):
+                self._limiter.acquire(route, method)
+                r = func(*args, **kwargs)
+                self._limiter.update(route, method, r)
+                if r.status_code != 429:
+                    break
+            return r
+        return call
+
+
+class RateLimitedRiot:
+    """Wrap a `lol.riot.Riot` instance so every resource is rate limited."""
+
+    def __init__(self, api, limiter: RateLimiter):
+        self._api = api
+        self._limiter = limiter
+
+    def __getattr__(self, attr):
+        value = getattr(self._api, attr)
+        if hasattr(value, "base"):
+            return RateLimitedResource(value, attr, self._limiter)
+        return value
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Get the process wide RateLimiter, configured from settings.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            url = getattr(settings, "RIOT_RATE_LIMIT_REDIS_URL", None)
+            store = RedisBucketStore(url) if url else LocalBucketStore()
+            _limiter = RateLimiter(
+                store,
+                app_limits=getattr(settings, "RIOT_APP_RATE_LIMITS", "20:1,100:120"),
+            )
+    return _limiter
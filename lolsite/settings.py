@@ -14,6 +14,7 @@ from decouple import config
 import logging
 # must be imported for app to know about periodic task schedule
 from lolsite import periodic_tasks  # noqa: F401
+from lolsite import queues
 
 import django_stubs_ext
 django_stubs_ext.monkeypatch()
@@ -140,6 +141,18 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 
+# see lolsite/queues.py
+CELERY_TASK_DEFAULT_QUEUE = queues.INTERACTIVE
+CELERY_TASK_ROUTES = {name: {"queue": queue} for name, queue in queues.ROUTES.items()}
+CELERY_TASK_DEFAULT_PRIORITY = queues.PRIORITY_BACKGROUND
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+# only reserve one task at a time so priorities are respected
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
 
 # SENDGRID CONNECTION
 EMAIL_HOST = "smtp.sendgrid.net"
@@ -153,3 +166,14 @@ DEFAULT_FROM_EMAIL = "brianjp93@gmail.com"
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
 RIOT_API_TOKEN = config('RIOT_API_TOKEN')
+# riot style "count:seconds" limits used until riot's headers are seen
+RIOT_APP_RATE_LIMITS = config('RIOT_APP_RATE_LIMITS', '20:1,100:120')
+# share rate limit buckets between processes, in-process if None
+RIOT_RATE_LIMIT_REDIS_URL = None
+# coalesce duplicate imports across processes, in-process if None
+SINGLEFLIGHT_REDIS_URL = None
+# storage for raw riot match/timeline payloads, disabled if None
+RAW_ARCHIVE_STORAGE = None
+# pack timeline participant frames into AdvancedTimeline.participant_frames
+# instead of writing ParticipantFrame rows
+COLUMNAR_PARTICIPANT_FRAMES = True
@@ -32,10 +32,21 @@ STATICFILES_STORAGE = "custom_storages.StaticStorage"
 MEDIAFILES_LOCATION = "media"
 MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/{MEDIAFILES_LOCATION}/"
 DEFAULT_FILE_STORAGE = "custom_storages.MediaStorage"
+RAW_ARCHIVE_STORAGE = {
+    "BACKEND": "custom_storages.MediaStorage",
+    # refs are rewritten in place, see match.archive
+    "OPTIONS": {
+        "location": f"{MEDIAFILES_LOCATION}/archive",
+        "default_acl": "private",
+        "file_overwrite": True,
+    },
+}
 
 REDIS_URL = config('REDIS_URL', 'localhost')
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
+RIOT_RATE_LIMIT_REDIS_URL = REDIS_URL
+SINGLEFLIGHT_REDIS_URL = REDIS_URL
 
 CACHES = {
     "default": {
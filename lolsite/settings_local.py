@@ -28,10 +28,16 @@ STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+RAW_ARCHIVE_STORAGE = {
+    "BACKEND": "django.core.files.storage.FileSystemStorage",
+    "OPTIONS": {"location": os.path.join(BASE_DIR, "archive")},
+}
 
 REDIS_URL = config('REDIS_URL', 'localhost')
 CELERY_BROKER_URL = f"redis://{REDIS_URL}"
 CELERY_RESULT_BACKEND = f"redis://{REDIS_URL}"
+RIOT_RATE_LIMIT_REDIS_URL = f"redis://{REDIS_URL}"
+SINGLEFLIGHT_REDIS_URL = f"redis://{REDIS_URL}"
 
 CACHES = {
     "default": {
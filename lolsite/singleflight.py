@@ -0,0 +1,219 @@
+"""lolsite/singleflight.py
+
+Coalesce concurrent calls which do the same work.
+
+The first caller for a key takes a lease and does the work; everyone else
+waits for the lease to be released and shares the leader's result instead
+of repeating the riot requests and racing on the same inserts.  Leases live
+in redis so that web and celery processes coalesce with each other, with an
+in-process fallback when no redis url is configured.
+
+Results are shared as json.  A result which can't be serialized is not
+shared and waiting callers run the function themselves.
+
+"""
+from django.conf import settings
+
+from functools import wraps
+import json
+import logging
+import threading
+import time
+import uuid
+
+
+logger = logging.getLogger(__name__)
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[2], ARGV[2], 'PX', ARGV[3])
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LocalStore:
+    """In-process leases.  Only coalesces callers within one process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.leases: dict[str, tuple[str, float]] = {}
+        self.results: dict[str, tuple[str, float]] = {}
+
+    def _get(self, d, key):
+        value = d.get(key)
+        if value and value[1] < time.time():
+            del d[key]
+            return None
+        return value and value[0]
+
+    def acquire(self, key: str, token: str, lease: float):
+        with self.lock:
+            if self._get(self.leases, key):
+                return False
+            self.leases[key] = (token, time.time() + lease)
+            self.results.pop(key, None)
+            return True
+
+    def locked(self, key: str):
+        with self.lock:
+            return self._get(self.leases, key) is not None
+
+    def release(self, key: str, token: str, result: str, result_ttl: float):
+        with self.lock:
+            if self._get(self.leases, key) == token:
+                del self.leases[key]
+                self.results[key] = (result, time.time() + result_ttl)
+
+    def get_result(self, key: str):
+        with self.lock:
+            return self._get(self.results, key)
+
+    def claim(self, key: str, ttl: float):
+        with self.lock:
+            if self._get(self.results, f"claim:{key}"):
+                return False
+            self.results[f"claim:{key}"] = ("1", time.time() + ttl)
+            return True
+
+
+class RedisStore:
+    """Leases shared by every process through redis."""
+
+    def __init__(self, url: str, prefix="sf"):
+        import redis
+        self.redis = redis.Redis.from_url(url)
+        self.release_script = self.redis.register_script(RELEASE_SCRIPT)
+        self.prefix = prefix
+
+    def _key(self, key: str, kind: str):
+        return f"{self.prefix}:{kind}:{key}"
+
+    def acquire(self, key: str, token: str, lease: float):
+        acquired = self.redis.set(self._key(key, "lease"), token, nx=True, px=int(lease * 1000))
+        if acquired:
+            self.redis.delete(self._key(key, "result"))
+        return bool(acquired)
+
+    def locked(self, key: str):
+        return bool(self.redis.exists(self._key(key, "lease")))
+
+    def release(self, key: str, token: str, result: str, result_ttl: float):
+        self.release_script(
+            keys=[self._key(key, "lease"), self._key(key, "result")],
+            args=[token, result, int(result_ttl * 1000)],
+        )
+
+    def get_result(self, key: str):
+        value = self.redis.get(self._key(key, "result"))
+        return value.decode() if value is not None else None
+
+    def claim(self, key: str, ttl: float):
+        return bool(self.redis.set(self._key(key, "claim"), 1, nx=True, px=int(ttl * 1000)))
+
+
+class SingleFlight:
+    """Run a function at most once at a time per key.
+
+    Parameters
+    ----------
+    store : LocalStore | RedisStore
+    lease : float
+        seconds before an unreleased lease expires, in case the leader dies
+    timeout : float
+        seconds a caller waits on the leader before doing the work itself
+    result_ttl : float
+        seconds the leader's result is kept for waiting callers
+
+    """
+
+    NOT_SHARED = json.dumps({"shared": False})
+
+    def __init__(self, store, lease=120, timeout=120, result_ttl=30):
+        self.store = store
+        self.lease = lease
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+
+    def do(self, key: str, func, *args, **kwargs):
+        """Call `func(*args, **kwargs)`, or wait for and share the result of
+        the caller which is already doing so for `key`.
+        """
+        token = uuid.uuid4().hex
+        deadline = time.time() + self.timeout
+        while True:
+            if self.store.acquire(key, token, self.lease):
+                result = self.NOT_SHARED
+                try:
+                    value = func(*args, **kwargs)
+                    try:
+                        result = json.dumps({"shared": True, "value": value})
+                    except (TypeError, ValueError):
+                        pass
+                    return value
+                finally:
+                    self.store.release(key, token, result, self.result_ttl)
+
+            logger.info(f"Waiting on in-flight {key}.")
+            delay = 0.05
+            while self.store.locked(key) and time.time() < deadline:
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
+
+            if time.time() >= deadline:
+                logger.warning(f"Timed out waiting on {key}, running it anyway.")
+                return func(*args, **kwargs)
+            if (result := self.store.get_result(key)) is not None:
+                result = json.loads(result)
+                if result["shared"]:
+                    return result["value"]
+                return func(*args, **kwargs)
+            # the leader died without a result, try to take over
+
+    def in_flight(self, key: str):
+        return self.store.locked(key)
+
+    def claim(self, key: str, ttl: float):
+        """Claim `key` for `ttl` seconds.  Returns False if it is already claimed.
+
+        Used to avoid enqueueing the same background task over and over.
+        """
+        return self.store.claim(key, ttl)
+
+
+_singleflight = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight():
+    """Get the process wide SingleFlight, configured from settings.
+    """
+    global _singleflight
+    with _singleflight_lock:
+        if _singleflight is None:
+            url = getattr(settings, "SINGLEFLIGHT_REDIS_URL", None)
+            _singleflight = SingleFlight(RedisStore(url) if url else LocalStore())
+    return _singleflight
+
+
+def coalesce(key_func):
+    """Decorate a function so that concurrent calls with the same key share
+    one execution.
+
+    Parameters
+    ----------
+    key_func : callable
+        receives the same arguments as the decorated function and returns
+        the key, or None to skip coalescing for that call
+
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs)
+            if key is None:
+                return func(*args, **kwargs)
+            return get_singleflight().do(key, func, *args, **kwargs)
+        return wrapper
+    return decorator
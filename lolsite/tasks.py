@@ -1,6 +1,10 @@
 from lol.riot import Riot as RiotAPI
 from django.conf import settings
 
+from lolsite.ratelimit import RateLimitedRiot, get_rate_limiter
+
 
 def get_riot_api():
-    return RiotAPI(settings.RIOT_API_TOKEN)
+    """Get a riot api client which shares the app wide rate limit.
+    """
+    return RateLimitedRiot(RiotAPI(settings.RIOT_API_TOKEN), get_rate_limiter())
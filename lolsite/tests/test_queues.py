@@ -0,0 +1,22 @@
+"""lolsite/tests/test_queues.py
+"""
+from django.test import SimpleTestCase
+
+from lolsite import queues
+from lolsite.celery import app
+
+
+class QueueRoutingTest(SimpleTestCase):
+    def get_queue(self, name):
+        return app.amqp.router.route({}, name)['queue'].name
+
+    def test_routes(self):
+        self.assertEqual(self.get_queue('player.tasks.import_summoner'), queues.INTERACTIVE)
+        self.assertEqual(self.get_queue('match.tasks.backfill_matches'), queues.BULK_IMPORT)
+        self.assertEqual(self.get_queue('player.tasks.import_many_positions'), queues.BULK_IMPORT)
+        self.assertEqual(self.get_queue('data.tasks.import_missing'), queues.STATIC_DATA)
+        self.assertEqual(self.get_queue('core.models.save_files'), queues.STATIC_DATA)
+        self.assertEqual(self.get_queue('core.models.save_many_files'), queues.STATIC_DATA)
+        self.assertEqual(self.get_queue('match.tasks.handle_name_changes'), queues.MAINTENANCE)
+        # anything unrouted is treated as interactive
+        self.assertEqual(self.get_queue('lolsite.celery.debug_task'), queues.INTERACTIVE)
@@ -0,0 +1,62 @@
+"""lolsite/tests/test_ratelimit.py
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+from lol.riot import Riot
+
+from lolsite import ratelimit
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class RateLimiterTest(SimpleTestCase):
+    def test_local_bucket_waits_when_empty(self):
+        store = ratelimit.LocalBucketStore()
+        keys = [("k:1", 2, 1000)]
+        self.assertEqual(store.try_acquire(keys, ["block"], 0), 0)
+        self.assertEqual(store.try_acquire(keys, ["block"], 0), 0)
+        self.assertGreater(store.try_acquire(keys, ["block"], 0), 0)
+        # half the window refills one token
+        self.assertEqual(store.try_acquire(keys, ["block"], 500), 0)
+
+    def test_method_block_takes_no_app_tokens(self):
+        store = ratelimit.LocalBucketStore()
+        limiter = ratelimit.RateLimiter(store, app_limits="2:1")
+        store.block(limiter._key("na1", "match.get:block"), 10_000)
+        now = 0
+        keys = [(limiter._key("na1", "app:1"), 2, 1000)]
+        block_keys = [limiter._key("na1", "block"), limiter._key("na1", "match.get:block")]
+        for _ in range(5):
+            self.assertGreater(store.try_acquire(keys, block_keys, now), 0)
+        # another method still has the whole app budget
+        other = [limiter._key("na1", "block"), limiter._key("na1", "summoner.get:block")]
+        self.assertEqual(store.try_acquire(keys, other, now), 0)
+        self.assertEqual(store.try_acquire(keys, other, now), 0)
+
+    def test_learns_limits_from_headers(self):
+        limiter = ratelimit.RateLimiter(ratelimit.LocalBucketStore())
+        limiter.update("na1", "match.get", FakeResponse(200, {
+            "X-App-Rate-Limit": "500:10",
+            "X-Method-Rate-Limit": "2000:10",
+        }))
+        self.assertEqual(limiter.get_limits("na1", "app"), [(500, 10)])
+        self.assertEqual(limiter.get_limits("na1", "match.get"), [(2000, 10)])
+
+    def test_retries_429_after_retry_after(self):
+        api = ratelimit.RateLimitedRiot(
+            Riot("key"), ratelimit.RateLimiter(ratelimit.LocalBucketStore()),
+        )
+        responses = [
+            FakeResponse(429, {"Retry-After": "0.01", "X-Rate-Limit-Type": "method"}),
+            FakeResponse(200),
+        ]
+        with mock.patch("lol.resource.match.requests.get", side_effect=responses) as get:
+            r = api.match.get("NA1_1", region="na")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(get.call_count, 2)
+        self.assertIn("americas", get.call_args[0][0])
@@ -0,0 +1,51 @@
+"""lolsite/tests/test_singleflight.py
+"""
+from multiprocessing.pool import ThreadPool
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from lolsite.singleflight import LocalStore, SingleFlight
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        self.sf = SingleFlight(LocalStore(), lease=5, timeout=5)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def work(self, value):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return value
+
+    def test_concurrent_calls_share_result(self):
+        with ThreadPool(8) as pool:
+            results = pool.map(lambda _: self.sf.do('match:1', self.work, 42), range(8))
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_unshareable_result(self):
+        with ThreadPool(3) as pool:
+            results = pool.map(lambda _: self.sf.do('match:1', self.work, {1, 2}), range(3))
+        self.assertEqual(results, [{1, 2}] * 3)
+        self.assertLess(self.calls, 4)
+
+    def test_leader_failure(self):
+        def fail():
+            time.sleep(0.1)
+            raise ValueError
+
+        leader = threading.Thread(target=lambda: self.assertRaises(
+            ValueError, self.sf.do, 'match:1', fail,
+        ))
+        leader.start()
+        time.sleep(0.02)
+        self.assertEqual(self.sf.do('match:1', self.work, 1), 1)
+        leader.join()
+
+    def test_claim(self):
+        self.assertTrue(self.sf.claim('summoner:na:name:x', 60))
+        self.assertFalse(self.sf.claim('summoner:na:name:x', 60))
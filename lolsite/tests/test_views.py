@@ -0,0 +1,48 @@
+"""lolsite/tests/test_views.py
+"""
+from django.test import RequestFactory, TestCase
+
+import json
+from unittest import mock
+
+from lolsite import views
+from match import tasks as mt
+from match.tests.factories import match_payload
+from player.models import Summoner
+
+
+class SummonerMetaTest(TestCase):
+    def setUp(self):
+        mt.import_matches_from_data([json.dumps(match_payload(f'NA1_{i}')) for i in range(1, 4)], 'na')
+        self.request = RequestFactory().get('/na/summoner1/')
+
+    def test_meta_is_stored_until_import(self):
+        meta = views.get_summoner_meta_data(self.request, views.META.copy())
+        self.assertEqual(meta['title'], 'Summoner 1 is 3 and 0 in the past 3 games. 100% WR.')
+        self.assertIsNotNone(Summoner.objects.get(puuid='puuid-1').meta)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(views.get_summoner_meta_data(self.request, views.META.copy()), meta)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mt.import_matches_from_data([json.dumps(match_payload('NA1_4'))], 'na')
+            # not until the new games are committed
+            self.assertIsNotNone(Summoner.objects.get(puuid='puuid-1').meta)
+        self.assertIsNone(Summoner.objects.get(puuid='puuid-1').meta)
+        meta = views.get_summoner_meta_data(self.request, views.META.copy())
+        self.assertIn('past 4 games', meta['title'])
+
+    def test_stale_meta_is_not_stored(self):
+        """An import commits while a page builds meta from the old games."""
+        build = views.build_summoner_meta
+
+        def build_during_import(summoner):
+            out = build(summoner)
+            with self.captureOnCommitCallbacks(execute=True):
+                mt.import_matches_from_data([json.dumps(match_payload('NA1_4'))], 'na')
+            return out
+
+        with mock.patch.object(views, 'build_summoner_meta', build_during_import):
+            meta = views.get_summoner_meta_data(self.request, views.META.copy())
+        self.assertIn('past 3 games', meta['title'])
+        self.assertIsNone(Summoner.objects.get(puuid='puuid-1').meta)
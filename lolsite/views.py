@@ -1,5 +1,6 @@
 """lolsite/views.py
 """
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.template.response import TemplateResponse
 from django.templatetags.static import static
@@ -8,7 +9,8 @@ from player.serializers import FavoriteSerializer, SummonerSerializer
 from player.models import Summoner, simplify
 
 from lolsite.context_processors import react_data_processor
-from match.models import Match
+from match.models import Participant, Stats
+from data import registry
 from data import constants
 
 import re
@@ -25,6 +27,7 @@ META = {
     'description': 'Accept your hardstuck-ness.',
 }
 QUEUE_DICT = {x['_id']: x for x in constants.QUEUES}
+MATCH_META_CACHE_SECONDS = 60 * 60 * 24
 
 
 def home(request, path=""):
@@ -49,132 +52,185 @@ def get_meta_data(request):
 
 
 def get_summoner_meta_data(request, meta):
+    """Get the meta tags for a summoner page.
+
+    The summary is stored on the Summoner and only rebuilt after new
+    matches are imported, so this is usually a single query.
+    """
     r = re.match(r'/([a-z]+)/([^/]+)/$', request.path)
     if r:
         region, name = r.groups()
         name = simplify(name)
-        qs = Summoner.objects.filter(region=region, simple_name=name)
-        wins = 0
-        kills = 0
-        deaths = 0
-        assists = 0
-        damage = 0
-        seconds = 0
-        losses = 0
-        vision_score = 0
-        champions = {}
-        if qs:
-            summoner = qs[0]
-            matches = Match.objects.filter(
-                participants__puuid=summoner.puuid,
-                game_duration__gt=600,
-            ).order_by('-game_creation')[:20]
-            for match in matches:
-                part = match.participants.get(puuid=summoner.puuid)
-                is_win = part.stats.win
-                kills += part.stats.kills
-                deaths += part.stats.deaths
-                assists += part.stats.assists
-                damage += part.stats.total_damage_dealt_to_champions
-                seconds += match.game_duration
-                vision_score += part.stats.vision_score
-
-                # overall stats
-                if is_win:
-                    wins += 1
-                else:
-                    losses += 1
-
-                # per champ stats
-                champ = part.get_champion()
-                if champ:
-                    newstat = champions[champ.name] = champions.get(champ.name, {'wins': 0, 'count': 0})
-                    newstat['count'] += 1
-                    if is_win:
-                        newstat['wins'] += 1
-
-            total = wins + losses
-            total = total or 1
-            wr = int(wins / total * 100)
-            meta['title'] = f'{summoner.name} is {wins} and {losses} in the past {wins + losses} games. {wr}% WR.'
-            champions = list(champions.items())
-            champions.sort(key=lambda x: -x[1]['count'])
-            champions = champions[:3]
-            top_played = [f'{x[0]} - {x[1]["count"]} ({int(x[1]["wins"] / x[1]["count"] * 100)}% WR)' for x in champions]
-            top_played = ', '.join(top_played)
-            deaths = deaths or 1
-            kda = (kills + assists) / deaths
-            dpm = 0
-            vspm = 0
-            if seconds:
-                dpm = damage / (seconds / 60)
-                vspm = vision_score / (seconds / 60)
-            description = [
-                f'TOP: {top_played}',
-                f'AVG KDA: {kda:.2f}',
-                f'DPM: {int(dpm)}',
-                f'VISION SCORE/M: {vspm:.2f}',
-            ]
-            meta['description'] = ' || '.join(description)
-            icon = summoner.get_profile_icon()
-            if icon:
-                meta['image'] = icon.image_url()
+        summoner = Summoner.objects.filter(region=region, simple_name=name).first()
+        if summoner:
+            if summoner.meta is None:
+                summoner.meta = build_summoner_meta(summoner)
+                # not if an import committed since we read the games, their
+                # reset would be overwritten with the old summary
+                Summoner.objects.filter(
+                    id=summoner.id, games_version=summoner.games_version, meta__isnull=True,
+                ).update(meta=summoner.meta)
+            meta.update(summoner.meta)
         return meta
 
 
+def build_summoner_meta(summoner: Summoner):
+    """Summarize a summoner's last 20 games for the page meta tags.
+    """
+    wins = 0
+    kills = 0
+    deaths = 0
+    assists = 0
+    damage = 0
+    seconds = 0
+    losses = 0
+    vision_score = 0
+    champions = {}
+    games = (
+        Stats.objects.filter(
+            participant__puuid=summoner.puuid,
+            participant__match__game_duration__gt=600,
+        )
+        .order_by('-participant__match__game_creation')
+        .values(
+            'win', 'kills', 'deaths', 'assists', 'total_damage_dealt_to_champions',
+            'vision_score', 'participant__champion_id', 'participant__match__game_duration',
+        )[:20]
+    )
+    games = list(games)
+    champion_names = get_champion_names([x['participant__champion_id'] for x in games])
+    for game in games:
+        is_win = game['win']
+        kills += game['kills']
+        deaths += game['deaths']
+        assists += game['assists']
+        damage += game['total_damage_dealt_to_champions']
+        seconds += game['participant__match__game_duration']
+        vision_score += game['vision_score']
+
+        # overall stats
+        if is_win:
+            wins += 1
+        else:
+            losses += 1
+
+        # per champ stats
+        champ_name = champion_names.get(game['participant__champion_id'])
+        if champ_name:
+            newstat = champions[champ_name] = champions.get(champ_name, {'wins': 0, 'count': 0})
+            newstat['count'] += 1
+            if is_win:
+                newstat['wins'] += 1
+
+    total = wins + losses
+    total = total or 1
+    wr = int(wins / total * 100)
+    out = {}
+    out['title'] = f'{summoner.name} is {wins} and {losses} in the past {wins + losses} games. {wr}% WR.'
+    champions = list(champions.items())
+    champions.sort(key=lambda x: -x[1]['count'])
+    champions = champions[:3]
+    top_played = [f'{x[0]} - {x[1]["count"]} ({int(x[1]["wins"] / x[1]["count"] * 100)}% WR)' for x in champions]
+    top_played = ', '.join(top_played)
+    deaths = deaths or 1
+    kda = (kills + assists) / deaths
+    dpm = 0
+    vspm = 0
+    if seconds:
+        dpm = damage / (seconds / 60)
+        vspm = vision_score / (seconds / 60)
+    description = [
+        f'TOP: {top_played}',
+        f'AVG KDA: {kda:.2f}',
+        f'DPM: {int(dpm)}',
+        f'VISION SCORE/M: {vspm:.2f}',
+    ]
+    out['description'] = ' || '.join(description)
+    icon = summoner.get_profile_icon()
+    if icon:
+        out['image'] = icon.image_url()
+    return out
+
+
+def get_champion_names(champion_ids):
+    """Get the newest name of each champion key from data.registry.
+    """
+    names = {}
+    for key in set(champion_ids):
+        if champion := registry.get('champion', key):
+            names[key] = champion.name
+    return names
+
+
 def get_match_meta_data(request, meta):
+    """Get the meta tags for a match page.
+
+    Match stats don't change so the tags are cached.
+    """
     r = re.match(r'/([a-z]+)/([^/]+)/match/([A-Z0-9_]+)/(?:.*)?', request.path)
     if r:
         region, name, match_id = r.groups()
         name = simplify(name)
-        try:
-            summoner = Summoner.objects.get(region=region, simple_name=name)
-        except ObjectDoesNotExist:
-            logger.exception('Could not find summoner.')
-            return
-        try:
-            match = Match.objects.get(_id=match_id)
-        except ObjectDoesNotExist:
-            logger.exception('Could not find match.')
-            return
-        try:
-            part = match.participants.get(puuid=summoner.puuid)
-        except ObjectDoesNotExist:
-            logger.exception('Could not find participant in match.')
-            return
-        kills = part.stats.kills
-        deaths = part.stats.deaths
-        deaths = 1 if deaths < 1 else deaths
-        assists = part.stats.assists
-        minutes = match.game_duration / 60_000
-        dpm = 0
-        vspm = 0
-        if minutes:
-            dpm = part.stats.total_damage_dealt_to_champions / minutes
-            vspm = part.stats.vision_score / minutes
-        kda = (kills + assists) / deaths
-        queue = QUEUE_DICT.get(match.queue_id, None)
-        queue = queue['description'].strip('games').strip() if queue is not None else '?'
-        champion = part.get_champion()
-        image = champion.image_url() if champion else meta['image']
-        if minutes < 5:
-            outcome = 'draw'
-        else:
-            outcome = 'win' if part.stats.win else 'lose'
-
-        stats = [
-            f'OUTCOME: {outcome}',
-            f'DPM: {int(dpm)}',
-            f'VISION/M: {vspm:.2f}',
-        ]
-        stats = ' ᐃ '.join(stats)
-
-        meta['title'] = f'{summoner.name} ({kills} / {deaths} / {assists})[{kda:.2f} KDA] {queue}'
-        meta['description'] = stats
-        meta['image'] = image
+        cache_key = f'meta/match/{match_id}/{region}/{name}'
+        match_meta = cache.get(cache_key)
+        if match_meta is None:
+            match_meta = build_match_meta(region, name, match_id, meta['image'])
+            if match_meta is None:
+                return
+            cache.set(cache_key, match_meta, MATCH_META_CACHE_SECONDS)
+        meta.update(match_meta)
         return meta
 
 
+def build_match_meta(region, simple_name, match_id, default_image):
+    try:
+        summoner = Summoner.objects.get(region=region, simple_name=simple_name)
+    except ObjectDoesNotExist:
+        logger.exception('Could not find summoner.')
+        return None
+    try:
+        part = (
+            Participant.objects.select_related('match', 'stats')
+            .get(match___id=match_id, puuid=summoner.puuid)
+        )
+    except ObjectDoesNotExist:
+        logger.exception('Could not find match or participant in match.')
+        return None
+    match = part.match
+    kills = part.stats.kills
+    deaths = part.stats.deaths
+    deaths = 1 if deaths < 1 else deaths
+    assists = part.stats.assists
+    minutes = match.game_duration / 60_000
+    dpm = 0
+    vspm = 0
+    if minutes:
+        dpm = part.stats.total_damage_dealt_to_champions / minutes
+        vspm = part.stats.vision_score / minutes
+    kda = (kills + assists) / deaths
+    queue = QUEUE_DICT.get(match.queue_id, None)
+    queue = queue['description'].strip('games').strip() if queue is not None else '?'
+    champion = part.get_champion()
+    image = champion.image_url() if champion else default_image
+    if minutes < 5:
+        outcome = 'draw'
+    else:
+        outcome = 'win' if part.stats.win else 'lose'
+
+    stats = [
+        f'OUTCOME: {outcome}',
+        f'DPM: {int(dpm)}',
+        f'VISION/M: {vspm:.2f}',
+    ]
+    stats = ' ᐃ '.join(stats)
+
+    return {
+        'title': f'{summoner.name} ({kills} / {deaths} / {assists})[{kda:.2f} KDA] {queue}',
+        'description': stats,
+        'image': image,
+    }
+
+
 def get_base_react_context(request):
     """Get the react context data.
     """
@@ -0,0 +1,144 @@
+"""match/archive.py
+
+Archive of the raw match and timeline payloads returned by riot.
+
+Payloads are gzipped and stored once under their sha256:
+
+    blobs/ab/abcdef....json.gz
+
+and a small ref file maps a match id to the blob:
+
+    match/NA1_1234   ->  abcdef...
+    timeline/NA1_1234
+
+Re-imports and reparses read the archive before asking riot, so they don't
+cost any API budget.
+
+Refs are overwritten in place, which needs a storage that writes under the
+exact name it is given (`file_overwrite` on S3).  Other storages, ie: the
+FileSystemStorage used in development, delete the old ref first.
+
+The storage is configured with `settings.RAW_ARCHIVE_STORAGE`; the archive
+is disabled when it is None.
+
+"""
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import get_storage_class
+
+import gzip
+import hashlib
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+MATCH = "match"
+TIMELINE = "timeline"
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_archive_storage():
+    """Get the configured archive storage, or None if archiving is disabled.
+    """
+    global _storage
+    config = getattr(settings, "RAW_ARCHIVE_STORAGE", None)
+    if not config:
+        return None
+    with _storage_lock:
+        if _storage is None or getattr(_storage, "_archive_config", None) != config:
+            storage_class = get_storage_class(config["BACKEND"])
+            _storage = storage_class(**config.get("OPTIONS", {}))
+            _storage._archive_config = config
+    return _storage
+
+
+def blob_path(digest: str):
+    return f"blobs/{digest[:2]}/{digest}.json.gz"
+
+
+def ref_path(kind: str, key: str):
+    return f"{kind}/{key}"
+
+
+def is_missing(exc: Exception):
+    """Whether reading a file failed because it does not exist."""
+    if isinstance(exc, FileNotFoundError):
+        return True
+    # botocore's ClientError, raised by S3 storages
+    code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey")
+
+
+def write_ref(storage, ref: str, digest: str):
+    if not getattr(storage, "file_overwrite", False):
+        # a storage which renames on conflict
+        if storage.exists(ref):
+            storage.delete(ref)
+    storage.save(ref, ContentFile(digest.encode()))
+
+
+def archive_payload(kind: str, key: str, content: bytes | str):
+    """Compress and store a raw payload.
+
+    Parameters
+    ----------
+    kind : str
+        MATCH or TIMELINE
+    key : str
+        riot match id, ie: NA1_1234
+    content : bytes | str
+
+    Returns
+    -------
+    str | None
+        the sha256 of the payload or None if it was not archived
+
+    """
+    storage = get_archive_storage()
+    if storage is None or not content:
+        return None
+    if isinstance(content, str):
+        content = content.encode()
+    digest = hashlib.sha256(content).hexdigest()
+    try:
+        path = blob_path(digest)
+        if not storage.exists(path):
+            storage.save(path, ContentFile(gzip.compress(content, compresslevel=6)))
+        write_ref(storage, ref_path(kind, key), digest)
+    except Exception:
+        logger.exception(f"Could not archive {kind} {key}.")
+        return None
+    return digest
+
+
+def get_archived_payload(kind: str, key: str):
+    """Get a raw payload from the archive.
+
+    Returns
+    -------
+    bytes | None
+        None if the payload has not been archived
+
+    """
+    storage = get_archive_storage()
+    if storage is None:
+        return None
+    ref = ref_path(kind, key)
+    try:
+        with storage.open(ref) as f:
+            digest = f.read().decode().strip()
+        with storage.open(blob_path(digest)) as f:
+            content = gzip.decompress(f.read())
+    except Exception as exc:
+        if is_missing(exc):
+            return None
+        logger.exception(f"Could not read archived {kind} {key}.")
+        return None
+    if hashlib.sha256(content).hexdigest() != digest:
+        logger.error(f"Archived {kind} {key} does not match its digest.")
+        return None
+    return content
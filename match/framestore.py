@@ -0,0 +1,212 @@
+"""match/framestore.py
+
+Columnar storage for the participant frames of an AdvancedTimeline.
+
+Instead of one ParticipantFrame row per participant per frame, all of a
+match's participant frames are packed into a single blob:
+
+    MAGIC | header length (uint32) | json header | zlib(columns)
+
+Each stat is stored as its own column of shape (participants, frames) using
+the smallest integer type which fits.  Counters which only ever grow
+(total_gold, xp, minions_killed, damage totals, ...) are delta encoded along
+the frame axis first, which keeps their values small and compresses well.
+
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+
+MAGIC = b"PFC1"
+HEADER = struct.Struct("<I")
+
+FIELDS = [
+    "current_gold",
+    "gold_per_second",
+    "jungle_minions_killed",
+    "level",
+    "minions_killed",
+    "total_gold",
+    "time_enemy_spent_controlled",
+    "xp",
+    "x",
+    "y",
+
+    "ability_haste",
+    "ability_power",
+    "armor",
+    "armor_pen",
+    "armor_pen_percent",
+    "attack_damage",
+    "attack_speed",
+    "bonus_armor_pen_percent",
+    "bonus_magic_pen_percent",
+    "cc_reduction",
+    "cooldown_reduction",
+    "health",
+    "health_max",
+    "health_regen",
+    "lifesteal",
+    "magic_pen",
+    "magic_pen_percent",
+    "magic_resist",
+    "movement_speed",
+    "omnivamp",
+    "physical_vamp",
+    "power",
+    "power_max",
+    "power_regen",
+    "spell_vamp",
+
+    "magic_damage_done",
+    "magic_damage_done_to_champions",
+    "magic_damage_taken",
+    "physical_damage_done",
+    "physical_damage_done_to_champions",
+    "physical_damage_taken",
+    "total_damage_done",
+    "total_damage_done_to_champions",
+    "total_damage_taken",
+    "true_damage_done",
+    "true_damage_done_to_champions",
+    "true_damage_taken",
+]
+
+DELTA_FIELDS = {
+    "jungle_minions_killed",
+    "level",
+    "minions_killed",
+    "total_gold",
+    "time_enemy_spent_controlled",
+    "xp",
+    "magic_damage_done",
+    "magic_damage_done_to_champions",
+    "magic_damage_taken",
+    "physical_damage_done",
+    "physical_damage_done_to_champions",
+    "physical_damage_taken",
+    "total_damage_done",
+    "total_damage_done_to_champions",
+    "total_damage_taken",
+    "true_damage_done",
+    "true_damage_done_to_champions",
+    "true_damage_taken",
+}
+
+DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def smallest_dtype(values: np.ndarray):
+    if values.size == 0:
+        return np.dtype(np.int8)
+    low, high = values.min(), values.max()
+    for dtype in DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def encode(frames: list[tuple[int, list[dict]]]) -> bytes:
+    """Pack participant frames into a single blob.
+
+    Parameters
+    ----------
+    frames : list[tuple[int, list[dict]]]
+        (timestamp, participant frames) for every frame, where each participant
+        frame is a dict of `participant_id` and the stats in FIELDS.
+
+    Returns
+    -------
+    bytes
+
+    """
+    timestamps = [timestamp for timestamp, _ in frames]
+    participants = sorted({
+        pframe["participant_id"] for _, pframes in frames for pframe in pframes
+    })
+    index = {participant_id: i for i, participant_id in enumerate(participants)}
+
+    values = np.zeros((len(FIELDS), len(participants), len(frames)), dtype=np.int64)
+    present = np.zeros((len(participants), len(frames)), dtype=np.uint8)
+    for f, (_, pframes) in enumerate(frames):
+        for pframe in pframes:
+            p = index[pframe["participant_id"]]
+            present[p, f] = 1
+            values[:, p, f] = [pframe.get(field) or 0 for field in FIELDS]
+
+    columns = []
+    dtypes = []
+    for i, field in enumerate(FIELDS):
+        column = values[i]
+        if field in DELTA_FIELDS:
+            column = np.diff(column, axis=1, prepend=0)
+        dtype = smallest_dtype(column)
+        dtypes.append(dtype.str)
+        columns.append(column.astype(dtype).tobytes())
+    columns.append(present.tobytes())
+
+    header = json.dumps({
+        "fields": FIELDS,
+        "dtypes": dtypes,
+        "delta": [field for field in FIELDS if field in DELTA_FIELDS],
+        "participants": participants,
+        "timestamps": timestamps,
+    }).encode()
+    body = zlib.compress(b"".join(columns), 9)
+    return MAGIC + HEADER.pack(len(header)) + header + body
+
+
+def decode_arrays(blob: bytes):
+    """Unpack a blob into numpy arrays.
+
+    Returns
+    -------
+    tuple[dict, np.ndarray, np.ndarray]
+        header, values of shape (frames, participants, fields) and
+        the presence mask of shape (frames, participants)
+
+    """
+    blob = bytes(blob)
+    if blob[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a participant frame blob.")
+    offset = len(MAGIC)
+    (header_length,) = HEADER.unpack_from(blob, offset)
+    offset += HEADER.size
+    header = json.loads(blob[offset:offset + header_length])
+    body = zlib.decompress(blob[offset + header_length:])
+
+    shape = (len(header["participants"]), len(header["timestamps"]))
+    delta = set(header["delta"])
+    values = np.empty((len(header["fields"]),) + shape, dtype=np.int64)
+    position = 0
+    for i, (field, dtype) in enumerate(zip(header["fields"], header["dtypes"])):
+        count = shape[0] * shape[1]
+        column = np.frombuffer(body, dtype=dtype, count=count, offset=position)
+        position += count * np.dtype(dtype).itemsize
+        values[i] = column.reshape(shape)
+        if field in delta:
+            np.cumsum(values[i], axis=1, out=values[i])
+    present = np.frombuffer(body, dtype=np.uint8, offset=position).reshape(shape)
+    return header, values.transpose(2, 1, 0), present.T
+
+
+def decode(blob: bytes) -> dict[int, list[dict]]:
+    """Unpack a blob into participant frame dicts, keyed by frame timestamp.
+    """
+    header, values, present = decode_arrays(blob)
+    fields = header["fields"]
+    participants = header["participants"]
+    out = {}
+    for timestamp, frame_values, frame_present in zip(
+        header["timestamps"], values.tolist(), present.tolist()
+    ):
+        out[timestamp] = [
+            {"participant_id": participant_id, **dict(zip(fields, row))}
+            for participant_id, row, is_present in zip(participants, frame_values, frame_present)
+            if is_present
+        ]
+    return out
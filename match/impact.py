@@ -0,0 +1,160 @@
+"""match/impact.py
+
+Impact scores, see docs/impact-scores.md.
+
+Each participant's features are divided by their team's average for that
+feature and the weighted ratios are summed:
+
+    impact = sum(W * F / f_avg for F in features)
+
+The weights sum to 1, so an exactly average player scores 1.0.  A feature
+which the whole team has 0 of counts as average for everyone.
+
+Scores are computed for a batch of matches at once: the Stats of every
+participant in the batch are loaded into a (participants, features) array
+and the team averages are taken with `np.bincount` over a team index, so
+there is no per participant python loop.
+
+"""
+from django.db import connection
+from django.db.models import F
+
+from .models import Participant
+
+from itertools import islice
+import logging
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# feature name -> expression on Participant
+FEATURES = {
+    "damage": F("stats__total_damage_dealt_to_champions"),
+    "cc": F("stats__time_ccing_others"),
+    "vision_score": F("stats__vision_score"),
+    "kp": F("stats__kills") + F("stats__assists"),
+    "cs": F("stats__total_minions_killed") + F("stats__neutral_minions_killed"),
+    "xp": F("champ_experience"),
+    "objective_damage": F("stats__damage_dealt_to_objectives"),
+    "tower_damage": F("stats__damage_dealt_to_turrets"),
+}
+
+WEIGHTS = {
+    "damage": 0.25,
+    "cc": 0.1,
+    "vision_score": 0.1,
+    "kp": 0.2,
+    "cs": 0.1,
+    "xp": 0.05,
+    "objective_damage": 0.1,
+    "tower_damage": 0.1,
+}
+
+BATCH_SIZE = 1000
+
+
+def load_features(match_ids: list[int]):
+    """Load the features of every participant in the given matches.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        participant ids, a team index of shape (participants,) and the
+        features of shape (participants, len(FEATURES))
+
+    """
+    rows = list(
+        Participant.objects.filter(match_id__in=match_ids, stats__isnull=False)
+        .annotate(**{f"impact_{name}": expression for name, expression in FEATURES.items()})
+        .values_list("id", "match_id", "team_id", *[f"impact_{name}" for name in FEATURES])
+    )
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((0, len(FEATURES)))
+    ids, match_ids, team_ids, *features = zip(*rows)
+    teams = np.stack([np.array(match_ids, dtype=np.int64), np.array(team_ids, dtype=np.int64)], axis=1)
+    _, team_index = np.unique(teams, axis=0, return_inverse=True)
+    # a missing feature, ie: champ_experience on old matches, is left out as 0
+    values = np.array(features, dtype=np.float64).T
+    values = np.nan_to_num(values)
+    return np.array(ids, dtype=np.int64), team_index.reshape(-1), values
+
+
+def compute_scores(team_index: np.ndarray, values: np.ndarray, weights: dict[str, float] | None = None):
+    """Compute the impact score of every row.
+
+    Parameters
+    ----------
+    team_index : np.ndarray
+        shape (participants,), rows with the same value are teammates
+    values : np.ndarray
+        shape (participants, len(FEATURES))
+    weights : dict
+        {feature: weight}, defaults to WEIGHTS
+
+    Returns
+    -------
+    np.ndarray
+        shape (participants,)
+
+    """
+    weights = WEIGHTS if weights is None else weights
+    weight_vector = np.array([weights.get(name, 0) for name in FEATURES], dtype=np.float64)
+    if values.size == 0:
+        return np.empty(0)
+    team_count = int(team_index.max()) + 1
+    sizes = np.bincount(team_index, minlength=team_count)
+    averages = np.stack(
+        [np.bincount(team_index, weights=values[:, i], minlength=team_count) for i in range(values.shape[1])],
+        axis=1,
+    ) / sizes[:, None]
+    averages = averages[team_index]
+    ratios = np.divide(values, averages, out=np.ones_like(values), where=averages > 0)
+    return ratios @ weight_vector
+
+
+def save_scores(ids: np.ndarray, scores: np.ndarray):
+    table = Participant._meta.db_table
+    rows = iter(zip(ids.tolist(), np.round(scores, 4).tolist()))
+    with connection.cursor() as cursor:
+        while batch := list(islice(rows, BATCH_SIZE)):
+            values = ", ".join(["(%s, %s)"] * len(batch))
+            cursor.execute(
+                f"UPDATE {table} SET impact_score = v.score "
+                f"FROM (VALUES {values}) AS v(id, score) "
+                f"WHERE {table}.id = v.id",
+                [value for row in batch for value in row],
+            )
+
+
+def update_matches(match_ids: list[int], weights: dict[str, float] | None = None):
+    """Compute and store the impact scores of the participants of `match_ids`.
+    """
+    if not match_ids:
+        return 0
+    ids, team_index, values = load_features(match_ids)
+    save_scores(ids, compute_scores(team_index, values, weights=weights))
+    return len(ids)
+
+
+def recompute(weights: dict[str, float] | None = None, batch_size=BATCH_SIZE):
+    """Recompute every stored impact score, ie: after changing WEIGHTS.
+
+    Returns
+    -------
+    int
+        the number of participants scored
+
+    """
+    count = 0
+    match_ids = (
+        Participant.objects.values_list("match_id", flat=True)
+        .distinct()
+        .order_by("match_id")
+        .iterator()
+    )
+    while batch := list(islice(match_ids, batch_size)):
+        count += update_matches(batch, weights=weights)
+        logger.info(f"Recomputed {count} impact scores.")
+    return count
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('match', '0036_alter_participant_champion_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='advancedtimeline',
+            name='participant_frames',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
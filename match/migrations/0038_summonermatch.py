@@ -0,0 +1,58 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def forward_fill_summoner_matches(apps, schema_editor):
+    SummonerMatch = apps.get_model('match', 'SummonerMatch')
+    Match = apps.get_model('match', 'Match')
+    Participant = apps.get_model('match', 'Participant')
+    Stats = apps.get_model('match', 'Stats')
+    schema_editor.execute(
+        f"""
+        INSERT INTO {SummonerMatch._meta.db_table}
+            (puuid, match_id, game_creation, queue_id, champion_id, win)
+        SELECT p.puuid, m.id, m.game_creation, m.queue_id, p.champion_id, COALESCE(s.win, false)
+        FROM {Participant._meta.db_table} p
+        JOIN {Match._meta.db_table} m ON m.id = p.match_id
+        LEFT JOIN {Stats._meta.db_table} s ON s.participant_id = p.id
+        WHERE p.puuid IS NOT NULL AND p.puuid != '' AND m.is_fully_imported
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('match', '0037_advancedtimeline_participant_frames'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummonerMatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puuid', models.CharField(max_length=128)),
+                ('game_creation', models.BigIntegerField()),
+                ('queue_id', models.IntegerField()),
+                ('champion_id', models.IntegerField()),
+                ('win', models.BooleanField(default=False)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='match.match')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='summonermatch',
+            index=models.Index(fields=['puuid', '-game_creation', '-match'], name='summonermatch_history'),
+        ),
+        migrations.AddIndex(
+            model_name='summonermatch',
+            index=models.Index(fields=['puuid', 'queue_id', '-game_creation', '-match'], name='summonermatch_queue_history'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='summonermatch',
+            unique_together={('puuid', 'match')},
+        ),
+        migrations.RunPython(forward_fill_summoner_matches, migrations.RunPython.noop),
+    ]
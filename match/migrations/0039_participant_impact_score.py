@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('match', '0038_summonermatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participant',
+            name='impact_score',
+            field=models.FloatField(blank=True, default=None, null=True),
+        ),
+    ]
@@ -8,9 +8,7 @@ import zoneinfo
 import logging
 
 from core.models import VersionedModel
-from data.models import ReforgedTree, ReforgedRune
-from data.models import Item, SummonerSpellImage
-from data.models import SummonerSpell, Champion
+from data import registry
 
 from player.models import simplify, Summoner, Comment
 
@@ -93,66 +91,41 @@ def lp_sort(position):
 
 
 class MatchQuerySet(models.QuerySet):
-    def get_items(self, puuid=None):
-        item_ids = set()
-        qs = Stats.objects.filter(participant__match__in=self)
-        if puuid is not None:
-            qs = qs.filter(participant__puuid=puuid)
-        for stat in qs:
-            for i in range(7):
-                key = f"item_{i}"
-                item_id = getattr(stat, key)
-                item_ids.add(item_id)
-        qs = Item.objects.filter(_id__in=item_ids)
-        qs = qs.order_by("_id", "-major", "-minor")
-        qs = qs.distinct("_id").select_related("image")
-        return {x._id: x for x in qs}
-
-    def get_spell_images(self):
-        spell_ids = set()
-        for match in self.prefetch_related("participants"):
-            for part in match.participants.all():
-                spell_ids.add(part.summoner_1_id)
-                spell_ids.add(part.summoner_2_id)
-        qs = SummonerSpellImage.objects.filter(spell__key__in=spell_ids)
-        qs = qs.select_related("spell")
-        qs = qs.order_by("spell___id", "-spell__major", "-spell__minor").distinct(
-            "spell___id"
-        )
-        return {x.spell.key: x.image_url() for x in qs}
-
-    def get_perk_substyles(self):
-        substyles = set()
-        for match in self.prefetch_related("participants"):
-            for part in match.participants.all().select_related("stats"):
-                substyles.add(part.stats.perk_sub_style)
-        qs = ReforgedTree.objects.filter(_id__in=substyles)
-        qs = qs.order_by("_id", "-major", "-minor").distinct("_id")
-        return {x._id: x.image_url() for x in qs}
-
-    def get_runes(self):
-        all_runes = set()
-        for match in self.prefetch_related("participants"):
-            for part in match.participants.all():
-                for _i in range(6):
-                    all_runes.add(getattr(part.stats, f"perk_{_i}"))
-
-        rune_data = (
-            ReforgedRune.objects.filter(
-                _id__in=all_runes,
-            )
-            .order_by("_id", "-reforgedtree__major", "reforgedtree__minor")
-            .distinct("_id")
-        )
-        return {x._id: x for x in rune_data}
-
     def get_related(self):
-        return {
-            "items": self.get_items(),
-            "runes": self.get_runes(),
-            "perk_substyles": self.get_perk_substyles(),
-            "spell_images": self.get_spell_images(),
-        }
+        """Resolve the static data shown for every participant, as of each
+        match's patch, with one query and data.registry.
+
+        Returns
+        -------
+        dict
+            {match.id: {
+                "items": {item_id: Entry},
+                "runes": {perk_id: Entry},
+                "perk_substyles": {style_id: image url},
+                "spell_images": {spell key: image url},
+            }}
+
+        """
+        items = [f"stats__item_{i}" for i in range(7)]
+        perks = [f"stats__perk_{i}" for i in range(6)]
+        query = Participant.objects.filter(match__in=self).values_list(
+            "match_id", "match__major", "match__minor",
+            "summoner_1_id", "summoner_2_id", "stats__perk_sub_style", *items, *perks,
+        )
+        out = {}
+        for match_id, major, minor, spell_1, spell_2, substyle, *values in query:
+            related = out.setdefault(match_id, {
+                "items": {}, "runes": {}, "perk_substyles": {}, "spell_images": {},
+            })
+            version = {"major": major, "minor": minor}
+            for key in (spell_1, spell_2):
+                related["spell_images"][key] = registry.get_image_url("spell", key, **version)
+            related["perk_substyles"][substyle] = registry.get_image_url("rune_tree", substyle, **version)
+            for item_id in values[:len(items)]:
+                related["items"][item_id] = registry.get("item", item_id, **version)
+            for perk_id in values[len(items):]:
+                related["runes"][perk_id] = registry.get("rune", perk_id, **version)
+        return out
 
 
 class Match(VersionedModel):
@@ -251,6 +224,8 @@ class Participant(models.Model):
     # label for ML training
     # 0=top, 1=jg, 2=mid, 3=adc, 4=sup
     role_label = models.IntegerField(default=None, null=True)
+    # see match.impact
+    impact_score = models.FloatField(default=None, null=True, blank=True)
 
     class Meta:
         unique_together = ("match", "_id")
@@ -265,25 +240,14 @@ class Participant(models.Model):
         )
 
     def get_champion(self):
-        return (
-            Champion.objects.filter(key=self.champion_id)
-            .order_by("-major", "-minor")
-            .first()
-        )
+        """Get the newest version of the champion from data.registry."""
+        return registry.get("champion", self.champion_id)
 
     def spell_1_image_url(self):
-        url = ""
-        query = SummonerSpell.objects.filter(key=self.summoner_1_id)
-        if spell := query.first():
-            url = spell.image_url()
-        return url
+        return registry.get_image_url("spell", self.summoner_1_id)
 
     def spell_2_image_url(self):
-        url = ""
-        query = SummonerSpell.objects.filter(key=self.summoner_2_id)
-        if spell := query.first():
-            url = spell.image_url()
-        return url
+        return registry.get_image_url("spell", self.summoner_2_id)
 
 
 class Stats(models.Model):
@@ -418,24 +382,11 @@ class Stats(models.Model):
 
     def perk_primary_style_image_url(self):
         """Get primary perk style image URL."""
-        url = ""
-        query = ReforgedTree.objects.filter(_id=self.perk_primary_style).order_by(
-            "-version"
-        )
-        if perk := query.first():
-            url = perk.image_url()
-        return url
+        return registry.get_image_url("rune_tree", self.perk_primary_style)
 
     def perk_sub_style_image_url(self):
         """Get perk sub style image URL."""
-        url = ""
-        query = ReforgedTree.objects.filter(_id=self.perk_sub_style).order_by(
-            "-major",
-            "-minor",
-        )
-        if perk := query.first():
-            url = perk.image_url()
-        return url
+        return registry.get_image_url("rune_tree", self.perk_sub_style)
 
     def get_perk_image(self, number):
         """Get perk image URL."""
@@ -445,11 +396,7 @@ class Stats(models.Model):
         except:
             pass
         else:
-            query = ReforgedRune.objects.filter(_id=value).order_by(
-                "-reforgedtree__version"
-            )
-            if perk := query.first():
-                url = perk.image_url()
+            url = registry.get_image_url("rune", value)
         return url
 
     def perk_0_image_url(self):
@@ -478,21 +425,7 @@ class Stats(models.Model):
         except:
             pass
         else:
-            query = Item.objects.filter(_id=item_id).order_by(
-                "-major", "-minor", "-patch"
-            )
-            version_query = query.filter(major=major, minor=minor)
-            if all(
-                [
-                    major is not None,
-                    minor is not None,
-                    version_query.exists(),
-                ]
-            ):
-                if item := version_query.first():
-                    url = item.image_url()
-            elif item := query.first():
-                url = item.image_url()
+            url = registry.get_image_url("item", item_id, major=major, minor=minor)
         return url
 
     def item_0_image_url(self, major=None, minor=None):
@@ -552,12 +485,48 @@ class Ban(models.Model):
         return f"Ban(team={self.team._id}, match={self.team.match._id})"
 
 
+class SummonerMatch(models.Model):
+    """One row per participant, used to list a summoner's matches.
+
+    Written at import alongside the Participant rows so a summoner's match
+    history can be paged by (game_creation, match_id) without touching the
+    Participant or Match tables.
+
+    """
+    id: int | None
+    puuid = models.CharField(max_length=128)
+    match = models.ForeignKey("Match", on_delete=models.CASCADE, related_name="+")
+    game_creation = models.BigIntegerField()
+    queue_id = models.IntegerField()
+    champion_id = models.IntegerField()
+    win = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ("puuid", "match")
+        indexes = [
+            models.Index(
+                fields=["puuid", "-game_creation", "-match"],
+                name="summonermatch_history",
+            ),
+            models.Index(
+                fields=["puuid", "queue_id", "-game_creation", "-match"],
+                name="summonermatch_queue_history",
+            ),
+        ]
+
+    def __str__(self):
+        return f"SummonerMatch(puuid={self.puuid}, match_id={self.match_id})"
+
+
 # ADVANCED TIMELINE MODELS
 class AdvancedTimeline(models.Model):
     # interval in milliseconds
     id: int | None
     match = models.OneToOneField("Match", on_delete=models.CASCADE)
     frame_interval = models.IntegerField(default=60000, blank=True)
+    # all participant frames packed by match.framestore, replacing
+    # the ParticipantFrame rows when set
+    participant_frames = models.BinaryField(null=True, blank=True)
 
     def __str__(self):
         return f"AdvancedTimeline(match={self.match._id})"
@@ -1,6 +1,6 @@
 import logging
 from typing import Literal
-from pydantic import Field, validator
+from pydantic import Field, PrivateAttr, validator
 from core.parsers import BaseModelWithLogger
 from lolsite.tasks import get_riot_api
 
@@ -49,16 +49,31 @@ class SubPerkStyleModel(BaseModelWithLogger):
 class PerksModel(BaseModelWithLogger):
     statPerks: dict[Literal['defense', 'flex', 'offense'], int]
     styles: list[StylesModel]
+    _primary_style: PrimaryPerkStyleModel | None = PrivateAttr(None)
+    _sub_style: SubPerkStyleModel | None = PrivateAttr(None)
+
+    @validator('styles')
+    def validate_styles(cls, v):
+        descriptions = [x.description for x in v]
+        for description in ['primaryStyle', 'subStyle']:
+            if description not in descriptions:
+                raise ValueError(f'styles should have a {description} but had {descriptions}')
+        return v
 
     @property
-    def primary_style(self):
-        out = [x for x in self.styles if x.description == 'primaryStyle'][0]
-        return PrimaryPerkStyleModel(**out.dict())
+    def primary_style(self) -> PrimaryPerkStyleModel:
+        # resolved once, the import reads this for every perk of every participant
+        if self._primary_style is None:
+            out = [x for x in self.styles if x.description == 'primaryStyle'][0]
+            self._primary_style = PrimaryPerkStyleModel(**out.dict())
+        return self._primary_style
 
     @property
-    def sub_style(self):
-        out = [x for x in self.styles if x.description == 'subStyle'][0]
-        return SubPerkStyleModel(**out.dict())
+    def sub_style(self) -> SubPerkStyleModel:
+        if self._sub_style is None:
+            out = [x for x in self.styles if x.description == 'subStyle'][0]
+            self._sub_style = SubPerkStyleModel(**out.dict())
+        return self._sub_style
 
 
 class ParticipantModel(BaseModelWithLogger):
@@ -0,0 +1,332 @@
+"""match/pipeline.py
+
+Staged match import: fetch -> parse -> write.
+
+Each stage runs concurrently and hands off to the next through a bounded
+queue, so network, CPU and database work overlap and a slow stage applies
+backpressure instead of letting payloads pile up in memory.
+
+    fetch   threads, scheduled by the shared riot rate limiter
+    parse   process pool running pydantic, shared by every run in a process
+    write   the calling thread, batched bulk inserts
+
+The parse pool is a `billiard.Pool`, celery's fork of multiprocessing, which
+may start children from the daemonic prefork workers of celery.  It is only
+started inside a celery task, a web request parses on a thread.
+
+"""
+from billiard.exceptions import WorkerLostError
+from celery import current_task
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import multiprocessing
+import logging
+import os
+import queue
+import threading
+import time
+
+import billiard
+
+from . import tasks as mt
+
+
+logger = logging.getLogger(__name__)
+
+DONE = object()
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+class PoolFuture:
+    """The `concurrent.futures.Future` methods used here, over a billiard
+    AsyncResult.
+    """
+
+    def __init__(self, result):
+        self.async_result = result
+
+    def result(self):
+        return self.async_result.get()
+
+
+class ProcessPool:
+    """A billiard.Pool with the `submit` of an Executor."""
+
+    def __init__(self, processes: int):
+        self.pool = billiard.Pool(processes=processes)
+
+    def submit(self, fn, *args):
+        return PoolFuture(self.pool.apply_async(fn, args))
+
+    def terminate(self):
+        self.pool.terminate()
+
+
+def get_process_pool(processes: int):
+    """Get the parse process pool, starting it on first use.
+
+    The pool outlives a single run so that its workers are forked once per
+    process rather than once per import.
+    """
+    global _pool, _pool_key
+    key = (os.getpid(), processes)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            # fork the workers now, before the fetch threads exist
+            _pool = ProcessPool(processes)
+            _pool_key = key
+        return _pool
+
+
+def reset_process_pool():
+    """Drop the parse process pool, ie: after one of its workers died."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None and _pool_key[0] == os.getpid():
+            _pool.terminate()
+        _pool = None
+        _pool_key = None
+
+
+def in_celery_task():
+    """Whether a celery worker is running a task in this thread."""
+    return bool(current_task) and not current_task.request.called_directly
+
+
+class StageStats:
+    """Counters for a single pipeline stage.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.busy = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, count: int, busy: float):
+        with self.lock:
+            self.count += count
+            self.busy += busy
+
+    def as_dict(self, elapsed: float):
+        return {
+            "count": self.count,
+            "busy": round(self.busy, 3),
+            "per_second": round(self.count / elapsed, 2) if elapsed else 0,
+        }
+
+
+class MatchImportPipeline:
+    """Import many matches by id, overlapping fetching, parsing and writing.
+
+    Parameters
+    ----------
+    region : str
+    fetch_threads : int
+    parse_processes : int
+        Size of the parse process pool.  By default, up to 4 inside a celery
+        task and 0 elsewhere.  Parsing runs on a thread when this is 0.
+    parse_inline_below : int
+        runs with fewer match ids than this parse on a thread, handing a
+        few payloads to other processes costs more than it saves
+    parse_batch_size : int
+        payloads sent to a parse worker at a time
+    write_batch_size : int
+        matches written per bulk insert
+    queue_size : int
+        max items held between two stages
+
+    """
+
+    def __init__(
+        self,
+        region: str,
+        fetch_threads=20,
+        parse_processes=None,
+        parse_inline_below=20,
+        parse_batch_size=10,
+        write_batch_size=50,
+        queue_size=100,
+    ):
+        self.region = region
+        self.fetch_threads = fetch_threads
+        if parse_processes is None:
+            # never fork from a web request
+            parse_processes = min(4, multiprocessing.cpu_count()) if in_celery_task() else 0
+        self.parse_processes = parse_processes
+        self.parse_inline_below = parse_inline_below
+        self.parse_batch_size = parse_batch_size
+        self.write_batch_size = write_batch_size
+        self.queue_size = queue_size
+        self.stats = {
+            name: StageStats(name) for name in ["fetch", "parse", "write"]
+        }
+        self.elapsed = 0.0
+        self.stop = threading.Event()
+
+    def get_parse_executor(self, count: int):
+        """Get the executor for parsing `count` payloads.
+
+        Returns
+        -------
+        tuple[Executor, bool]
+            the executor and whether the run owns it and should shut it down
+
+        """
+        if self.parse_processes and count >= self.parse_inline_below:
+            return get_process_pool(self.parse_processes), False
+        return ThreadPoolExecutor(max_workers=1), True
+
+    def put(self, q: queue.Queue, item):
+        """Blocking put which gives up once the pipeline is stopped.
+        """
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch_worker(self, ids: queue.Queue, raw: queue.Queue):
+        while not self.stop.is_set():
+            try:
+                match_id = ids.get_nowait()
+            except queue.Empty:
+                return
+            start = time.perf_counter()
+            try:
+                data = mt.fetch_match_json(match_id, self.region)
+            except Exception:
+                logger.exception(f"Could not fetch match {match_id}.")
+                data = None
+            self.stats["fetch"].add(1, time.perf_counter() - start)
+            if data is not None:
+                self.put(raw, data)
+
+    def fetch_stage(self, match_ids, raw: queue.Queue):
+        ids: queue.Queue = queue.Queue()
+        for match_id in match_ids:
+            ids.put(match_id)
+        threads = [
+            threading.Thread(target=self.fetch_worker, args=(ids, raw), daemon=True)
+            for _ in range(min(self.fetch_threads, max(ids.qsize(), 1)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.put(raw, DONE)
+
+    def parse_stage(self, executor, raw: queue.Queue, parsed: queue.Queue):
+        in_flight: deque = deque()
+        max_in_flight = max(self.parse_processes, 1) * 2
+
+        def collect(future):
+            batch, start = future.result(), future.submitted
+            self.stats["parse"].add(future.size, time.perf_counter() - start)
+            for item in batch:
+                self.put(parsed, item)
+
+        def submit(executor, batch):
+            future = executor.submit(mt.parse_match_payloads, batch)
+            future.submitted = time.perf_counter()
+            future.size = len(batch)
+            in_flight.append(future)
+            # waiting on the oldest batch keeps the parse stage bounded
+            while len(in_flight) >= max_in_flight:
+                collect(in_flight.popleft())
+
+        try:
+            batch = []
+            while not self.stop.is_set():
+                try:
+                    item = raw.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is DONE:
+                    break
+                batch.append(item)
+                if len(batch) >= self.parse_batch_size or raw.empty():
+                    submit(executor, batch)
+                    batch = []
+            if batch:
+                submit(executor, batch)
+            while in_flight:
+                collect(in_flight.popleft())
+        except WorkerLostError:
+            logger.exception("Match parse pool broke, it is restarted on the next run.")
+            reset_process_pool()
+            self.stop.set()
+        except Exception:
+            logger.exception("Match parse stage failed.")
+            self.stop.set()
+        self.put(parsed, DONE)
+
+    def write_batch(self, batch):
+        start = time.perf_counter()
+        written = mt.import_parsed_matches(batch, self.region)
+        self.stats["write"].add(len(written), time.perf_counter() - start)
+        return written
+
+    def run(self, match_ids):
+        """Import every match in `match_ids`.
+
+        Returns
+        -------
+        list[Match]
+            the newly written matches
+
+        """
+        start = time.perf_counter()
+        self.stop.clear()
+        raw: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        parsed: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        match_ids = list(match_ids)
+        executor, owned = self.get_parse_executor(len(match_ids))
+        threads = [
+            threading.Thread(target=self.fetch_stage, args=(match_ids, raw), daemon=True),
+            threading.Thread(target=self.parse_stage, args=(executor, raw, parsed), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        written = []
+        batch = []
+        try:
+            while True:
+                try:
+                    item = parsed.get(timeout=0.1)
+                except queue.Empty:
+                    if self.stop.is_set():
+                        break
+                    continue
+                if item is DONE:
+                    break
+                batch.append(item)
+                if len(batch) >= self.write_batch_size:
+                    written += self.write_batch(batch)
+                    batch = []
+            if batch:
+                written += self.write_batch(batch)
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+            if owned:
+                executor.shutdown(cancel_futures=True)
+        self.elapsed = time.perf_counter() - start
+        logger.info(f"Match import pipeline [{self.region}]: {self.report()}")
+        return written
+
+    def report(self):
+        """Per stage item counts, busy seconds and items/second.
+        """
+        report = {
+            name: stats.as_dict(self.elapsed) for name, stats in self.stats.items()
+        }
+        report["elapsed"] = round(self.elapsed, 3)
+        return report
@@ -5,10 +5,9 @@ from .models import (
 )
 from . import models
 from match import tasks as mt
+from match import framestore
 
-from data.serializers import (
-    ItemImageSerializer,
-)
+from data import registry
 
 from django.db.models import QuerySet
 from django.core.cache import cache
@@ -208,37 +207,37 @@ class StatsSerializer(serializers.ModelSerializer):
     def get_item_0_image(self, obj):
         item = self.items.get(obj.item_0)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_1_image(self, obj):
         item = self.items.get(obj.item_1)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_2_image(self, obj):
         item = self.items.get(obj.item_2)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_3_image(self, obj):
         item = self.items.get(obj.item_3)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_4_image(self, obj):
         item = self.items.get(obj.item_4)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_5_image(self, obj):
         item = self.items.get(obj.item_5)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_6_image(self, obj):
         item = self.items.get(obj.item_6)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_perk_sub_style_image_url(self, obj):
         return self.perk_substyles.get(obj.perk_sub_style, '') or ''
@@ -296,22 +295,21 @@ class FullParticipantSerializer(serializers.ModelSerializer):
                 match_qs = Match.objects.filter(participants__in=instance)
             elif hasattr(instance, 'match'):
                 match_qs = Match.objects.filter(id=instance.match.id)
-            if match_qs:
+            if match_qs is not None:
                 self.extra = match_qs.get_related()
-        self.spell_images = self.extra.get('spell_images', {})
-        self.runes = self.extra.get('runes', {})
-        self.items = self.extra.get('items', {})
-        self.perk_substyles = self.extra.get('perk_substyles', {})
         super().__init__(instance=instance, **kwargs)
 
+    def get_assets(self, obj):
+        return self.extra.get(obj.match_id, {})
+
     def get_stats(self, obj):
-        return StatsSerializer(obj.stats, extra=self.extra).data
+        return StatsSerializer(obj.stats, extra=self.get_assets(obj)).data
 
     def get_summoner_1_image(self, obj):
-        return self.spell_images.get(obj.summoner_1_id, '')
+        return self.get_assets(obj).get('spell_images', {}).get(obj.summoner_1_id, '')
 
     def get_summoner_2_image(self, obj):
-        return self.spell_images.get(obj.summoner_2_id, '')
+        return self.get_assets(obj).get('spell_images', {}).get(obj.summoner_2_id, '')
 
 
 class FullTeamSerializer(serializers.ModelSerializer):
@@ -342,7 +340,7 @@ class FullMatchSerializer(serializers.ModelSerializer):
         match_qs = None
         if hasattr(instance, 'major'):
             match_qs = Match.objects.filter(id=instance.id)
-        if match_qs:
+        if match_qs is not None:
             self.extra = match_qs.get_related()
         super().__init__(instance, **kwargs)
 
@@ -374,7 +372,6 @@ class ParticipantFrameSerializer(serializers.ModelSerializer):
             'jungle_minions_killed',
             'level',
             'minions_killed',
-            'team_score',
             'total_gold',
             'time_enemy_spent_controlled',
             'xp',
@@ -737,6 +734,10 @@ class AdvancedTimelineSerializer(serializers.ModelSerializer):
         data = cache.get(cache_key)
         if not data:
             data = super().to_representation(instance)
+            if instance.participant_frames:
+                pframes = framestore.decode(instance.participant_frames)
+                for frame in data['frames']:
+                    frame['participantframes'] = pframes.get(frame['timestamp'], [])
             cache.set(cache_key, data, CACHE_TIME)
         return data
 
@@ -785,37 +786,37 @@ class BasicStatsSerializer(serializers.ModelSerializer):
     def get_item_0_image(self, obj):
         item = self.items.get(obj.item_0)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_1_image(self, obj):
         item = self.items.get(obj.item_1)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_2_image(self, obj):
         item = self.items.get(obj.item_2)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_3_image(self, obj):
         item = self.items.get(obj.item_3)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_4_image(self, obj):
         item = self.items.get(obj.item_4)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_5_image(self, obj):
         item = self.items.get(obj.item_5)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
     def get_item_6_image(self, obj):
         item = self.items.get(obj.item_6)
         if item:
-            return ItemImageSerializer(item.image).data
+            return registry.serialize_image(item)
 
 
 class BasicParticipantSerializer(serializers.ModelSerializer):
@@ -843,18 +844,19 @@ class BasicParticipantSerializer(serializers.ModelSerializer):
 
     def __init__(self, instance=None, extra=None, **kwargs):
         self.extra = extra or {}
-        self.spell_images = self.extra.get('spell_images', {})
-        self.items = self.extra.get('items', {})
         super().__init__(instance=instance, **kwargs)
 
+    def get_assets(self, obj):
+        return self.extra.get(obj.match_id, {})
+
     def get_stats(self, obj):
-        return BasicStatsSerializer(obj.stats, extra=self.extra).data
+        return BasicStatsSerializer(obj.stats, extra=self.get_assets(obj)).data
 
     def get_summoner_1_image(self, obj):
-        return self.spell_images.get(obj.summoner_1_id, '')
+        return self.get_assets(obj).get('spell_images', {}).get(obj.summoner_1_id, '')
 
     def get_summoner_2_image(self, obj):
-        return self.spell_images.get(obj.summoner_2_id, '')
+        return self.get_assets(obj).get('spell_images', {}).get(obj.summoner_2_id, '')
 
 
 class BasicMatchSerializer(serializers.ModelSerializer):
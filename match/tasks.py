@@ -1,19 +1,19 @@
 """match/tasks.py
 """
-from celery import group
 from django.db.utils import IntegrityError
 from django.db.models import Count, Subquery, OuterRef
 from django.db.models import Case, When, Sum
-from django.db.models import IntegerField, Q, F
+from django.db.models import IntegerField, Q
 from django.utils import timezone
 from django.db import transaction
+from django.conf import settings
 from pydantic import ValidationError
 
-from .parsers.match import MatchResponseModel, ParticipantModel
+from .parsers.match import MatchResponseModel, ParticipantModel, TeamModel
 from .parsers.timeline import TimelineResponseModel
 from .parsers import timeline as tmparsers
 
-from .models import Match, Participant, Stats
+from .models import Match, Participant, Stats, SummonerMatch
 from .models import Team, Ban
 
 from .models import AdvancedTimeline, Frame, ParticipantFrame
@@ -27,12 +27,21 @@ from .models import ChampionKillEvent
 from .models import VictimDamageDealt, VictimDamageReceived
 
 from .models import Spectate
+from . import archive
+from . import framestore
+from . import impact
+from . import pipeline
 
 from lolsite.tasks import get_riot_api
 from lolsite.helpers import query_debugger
+from lolsite.singleflight import coalesce
+from lolsite import queues
 
-from player.models import Summoner, NameChange
+from player.models import Summoner, PlayedWith
+from player import analytics
+from player import rollups
 from player import tasks as pt
+from player import ranks
 
 from lolsite.celery import app
 import logging
@@ -41,19 +50,19 @@ import time
 from functools import partial
 from typing import Optional
 
-from multiprocessing.pool import ThreadPool
-
 
 ROLES = ["top", "jg", "mid", "adc", "sup"]
+MATCH_FETCH_THREADS = 20
 logger = logging.getLogger(__name__)
 
 
-class RateLimitError(Exception):
-    pass
+def match_key(match_id, region, refresh=False):
+    return f'match:{match_id}:{refresh}'
 
 
 # @query_debugger
 @app.task(name='match.tasks.import_match')
+@coalesce(match_key)
 def import_match(match_id, region, refresh=False):
     """Import a match by its ID.
 
@@ -71,32 +80,76 @@ def import_match(match_id, region, refresh=False):
     """
     api = get_riot_api()
     if api:
-        r = api.match.get(match_id, region=region)
-        match = r.content
+        match = fetch_match_json(match_id, region)
+        if match is None:
+            return None
+        import_match_from_data(match, region, refresh=refresh)
 
-        if r.status_code == 429:
-            return "throttled"
-        if r.status_code == 404:
-            return "not found"
 
-        import_match_from_data(match, region, refresh=refresh)
+def fetch_match_json(match_id: str,  region: str, refresh=False, use_archive=True):
+    """Get the raw match json, from the archive if possible, else from riot.
 
+    Requests are scheduled by the shared rate limiter, which also retries
+    429s after riot's Retry-After.  Payloads retrieved from riot are archived.
+
+    Returns
+    -------
+    bytes | None
+        None if the match could not be retrieved.
 
-def fetch_match_json(match_id: str,  region: str, refresh=False):
+    """
+    if use_archive:
+        if (content := archive.get_archived_payload(archive.MATCH, match_id)) is not None:
+            return content
     api = get_riot_api()
     r = api.match.get(match_id, region=region)
-    match = r.content
-    if r.status_code == 429:
-        return "throttled"
-    if r.status_code == 404:
-        return "not found"
-    return match
+    if r.status_code != 200:
+        logger.warning(f"Could not fetch match {match_id} [{r.status_code}].")
+        return None
+    archive.archive_payload(archive.MATCH, match_id, r.content)
+    return r.content
+
+
+def fetch_timeline_json(match_id: str, region: str, use_archive=True):
+    """Get the raw timeline json, from the archive if possible, else from riot.
+
+    Returns
+    -------
+    bytes | None
+        None if the timeline could not be retrieved.
+
+    """
+    if use_archive:
+        if (content := archive.get_archived_payload(archive.TIMELINE, match_id)) is not None:
+            return content
+    api = get_riot_api()
+    r = api.match.timeline(match_id, region=region)
+    if r.status_code != 200:
+        logger.warning(f"Could not fetch timeline {match_id} [{r.status_code}].")
+        return None
+    archive.archive_payload(archive.TIMELINE, match_id, r.content)
+    return r.content
 
 
 def import_summoner_from_participant(participants: list[ParticipantModel], region):
+    """Create missing Summoners and record name changes of existing ones.
+
+    Stored names are compared with one query for all of the participants.
+    """
+    stored = {
+        puuid: (summoner_id, name)
+        for puuid, summoner_id, name in Summoner.objects.filter(
+            puuid__in={part.puuid for part in participants if part.puuid},
+        ).values_list('puuid', 'id', 'name')
+    }
     sums = []
+    changes = []
     for part in participants:
-        if part.summonerId:
+        if part.puuid in stored:
+            summoner_id, name = stored[part.puuid]
+            if part.summonerName and part.summonerName != name:
+                changes.append((summoner_id, part.summonerName))
+        elif part.summonerId:
             summoner = Summoner(
                 _id=part.summonerId,
                 name=part.summonerName,
@@ -106,31 +159,34 @@ def import_summoner_from_participant(participants: list[ParticipantModel], regio
             )
             sums.append(summoner)
     Summoner.objects.bulk_create(sums, ignore_conflicts=True)
+    pt.record_name_changes(changes)
 
 
 @app.task(name="match.tasks.handle_name_changes")
-def handle_name_changes(days=30):
-    """Create NameChange objects from Participant Data."""
-    qs = Participant.objects.all().annotate(
-        current_name=Subquery(
-            Summoner.objects.filter(puuid=OuterRef('puuid')).values('name')[:1]
+def handle_name_changes(hours=2):
+    """Reconcile NameChanges for recently played games.
+
+    Name changes are recorded at import, this only catches what was missed
+    there, ie: summoners created by another import at the same time.
+
+    """
+    starts_at = timezone.now() - timezone.timedelta(hours=hours)
+    timestamp = int(starts_at.timestamp() * 1000)
+    names = {}
+    for puuid, name in (
+        Participant.objects.filter(match__game_creation__gt=timestamp)
+        .exclude(summoner_name='')
+        .values_list('puuid', 'summoner_name')
+    ):
+        names.setdefault(puuid, set()).add(name)
+    changes = []
+    for puuid, summoner_id, current_name in Summoner.objects.filter(
+        puuid__in=list(names),
+    ).values_list('puuid', 'id', 'name'):
+        changes.extend(
+            (summoner_id, name) for name in names[puuid] if name != current_name
         )
-    ).exclude(current_name=F('summoner_name'))
-    if days:
-        starts_at = timezone.now() - timezone.timedelta(days=days)
-        timestamp = starts_at.timestamp() * 1000
-        qs = qs.filter(match__game_creation__gt=timestamp)
-    for participant in qs:
-        if summoner := Summoner.objects.filter(puuid=participant.puuid).values('id').first():
-            try:
-                NameChange.objects.get_or_create(summoner_id=summoner['id'], old_name=participant.summoner_name)
-            except NameChange.MultipleObjectsReturned:
-                qs = NameChange.objects.filter(
-                    summoner_id=summoner['id'],
-                    old_name=participant.summoner_name,
-                ).order_by('created_date')
-                for nc in qs[1:]:
-                    nc.delete()
+    pt.record_name_changes(changes)
 
 
 def full_import(name=None, puuid=None, region=None, **kwargs):
@@ -228,7 +284,12 @@ def ranked_import(name=None, puuid=None, region=None, **kwargs):
             summoner.save()
 
 
+def recent_matches_key(start, end, puuid, region, queue=None, startTime=None, endTime=None):
+    return f"recent_matches:{region}:{puuid}:{start}:{end}:{queue}:{startTime}:{endTime}"
+
+
 @app.task(name="match.tasks.import_recent_matches")
+@coalesce(recent_matches_key)
 def import_recent_matches(
     start: int,
     end: int,
@@ -265,6 +326,7 @@ def import_recent_matches(
         if index + size > end:
             size = end - start
         please_continue = True
+        new_matches = []
         while has_more and please_continue:
             riot_match_request_time = time.time()
 
@@ -297,36 +359,217 @@ def import_recent_matches(
                 else:
                     matches = r.json()
             if len(matches) > 0:
-                existing_ids = [x._id for x in Match.objects.filter(_id__in=matches)]
-                new_matches = list(set(matches) - set(existing_ids))
-                import_count += len(new_matches)
-                jobs = [(x, region) for x in new_matches]
-                pool = ThreadPool(processes=50)
-
-                start_time = time.perf_counter()
-                match_json_values = pool.map(lambda args: fetch_match_json(*args), jobs)
-                logger.info(f'Match fetch time: {time.perf_counter() - start_time}')
-                for match_json in match_json_values:
-                    import_match_from_data(match_json, region)
-                logger.info(f'ThreadPool match import: {time.perf_counter() - start_time}')
+                existing_ids = set(
+                    Match.objects.filter(_id__in=matches).values_list('_id', flat=True)
+                )
+                new_matches += [x for x in matches if x not in existing_ids]
             else:
                 has_more = False
             index += size
             if index >= end:
                 please_continue = False
+
+        if new_matches:
+            import_count = len(new_matches)
+            importer = pipeline.MatchImportPipeline(
+                region, fetch_threads=MATCH_FETCH_THREADS,
+            )
+            importer.run(dict.fromkeys(new_matches))
     return import_count
 
 
 @app.task(name="match.tasks.bulk_import")
 def bulk_import(puuid: str, last_import_time_hours: int = 24, count=200, offset=10):
+    """Refresh a summoner's newest matches and continue their backfill.
+
+    `offset` is no longer used, the backfill resumes from the summoner's
+    stored cursor.
+
+    """
     now = timezone.now()
     thresh = now - timezone.timedelta(hours=last_import_time_hours)
     summoner: Summoner = Summoner.objects.get(puuid=puuid)
     if summoner.last_summoner_page_import is None or summoner.last_summoner_page_import < thresh:
         logger.info(f"Doing summoner page import for {summoner} of {count} games.")
         summoner.last_summoner_page_import = now
-        summoner.save()
-        import_recent_matches(offset, offset + count, puuid, region=summoner.region)
+        summoner.save(update_fields=['last_summoner_page_import'])
+        refresh_recent_matches(puuid, summoner.region)
+        backfill_matches(puuid, summoner.region, count=count)
+
+
+def list_match_ids(puuid: str, region: str, start: int, count: int, queue=None):
+    """Get a page of match ids from riot, newest first.
+
+    Returns
+    -------
+    list[str] | None
+        None if the request failed, an empty list only past the end of the
+        summoner's history
+
+    """
+    api = get_riot_api()
+    try:
+        r = api.match.filter(puuid, region=region, start=start, count=count, queue=queue)
+    except Exception:
+        logger.exception(f"Could not list matches for {puuid}.")
+        return None
+    if r.status_code != 200:
+        logger.warning(f"Could not list matches for {puuid} [{r.status_code}].")
+        return None
+    return r.json()
+
+
+def import_match_ids(match_ids: list[str], region: str):
+    if not match_ids:
+        return []
+    importer = pipeline.MatchImportPipeline(region, fetch_threads=MATCH_FETCH_THREADS)
+    return importer.run(dict.fromkeys(match_ids))
+
+
+def refresh_matches_key(puuid, region, page_size=20, max_pages=10):
+    return f'refresh_matches:{region}:{puuid}:{page_size}:{max_pages}'
+
+
+@app.task(name="match.tasks.refresh_recent_matches")
+@coalesce(refresh_matches_key)
+def refresh_recent_matches(puuid: str, region: str, page_size=20, max_pages=10):
+    """Import the matches a summoner has played since their watermark.
+
+    Riot's match list is paged newest first and paging stops as soon as it
+    reaches the watermark match, or any match we already have, so an up to
+    date summoner costs a single small list request.
+
+    Parameters
+    ----------
+    puuid : str
+    region : str
+    page_size : int
+    max_pages : int
+        stop after this many pages, the backfill picks up the rest
+
+    Returns
+    -------
+    int
+        number of new matches found
+
+    """
+    summoner = Summoner.objects.get(puuid=puuid)
+    new_ids: list[str] = []
+    # (index, anchor) of the first match not listed, when paging stopped early
+    gap = None
+    for page in range(max_pages):
+        ids = list_match_ids(puuid, region, page * page_size, page_size)
+        if ids is None:
+            if new_ids:
+                gap = (page * page_size, new_ids[-1])
+            break
+        if summoner.watermark_match_id in ids:
+            new_ids += ids[:ids.index(summoner.watermark_match_id)]
+            break
+        known = set(Match.objects.filter(_id__in=ids).values_list('_id', flat=True))
+        if known:
+            new_ids += [x for x in ids if x not in known]
+            break
+        new_ids += ids
+        if len(ids) < page_size:
+            break
+    else:
+        if new_ids:
+            gap = (max_pages * page_size, new_ids[-1])
+
+    if new_ids:
+        logger.info(f"Found {len(new_ids)} new matches for {summoner}.")
+        import_match_ids(new_ids, region)
+    update_watermark(summoner, new_ids)
+    if gap:
+        # the watermark moved past matches which were never listed, so the
+        # backfill restarts from the first of them
+        summoner.backfill_index, summoner.backfill_anchor = gap
+        summoner.backfill_complete = False
+        summoner.save(update_fields=['backfill_index', 'backfill_anchor', 'backfill_complete'])
+        logger.info(f"Left a gap after {gap[1]} for {summoner}, the backfill resumes from it.")
+    return len(new_ids)
+
+
+def update_watermark(summoner: Summoner, new_ids: list[str]):
+    """Move the summoner's watermark to their newest imported match and shift
+    the backfill cursor by the number of matches added in front of it.
+    """
+    newest = (
+        SummonerMatch.objects.filter(puuid=summoner.puuid)
+        .order_by('-game_creation', '-match_id')
+        .values_list('match___id', 'game_creation')
+        .first()
+    )
+    fields = []
+    if newest and newest[0] != summoner.watermark_match_id:
+        summoner.watermark_match_id, summoner.watermark_game_creation = newest
+        fields += ['watermark_match_id', 'watermark_game_creation']
+    if new_ids and summoner.backfill_anchor:
+        summoner.backfill_index += len(new_ids)
+        fields.append('backfill_index')
+    if fields:
+        summoner.save(update_fields=fields)
+
+
+def backfill_matches_key(puuid, region, count=100, page_size=100):
+    return f'backfill_matches:{region}:{puuid}:{count}:{page_size}'
+
+
+@app.task(name="match.tasks.backfill_matches")
+@coalesce(backfill_matches_key)
+def backfill_matches(puuid: str, region: str, count=100, page_size=100):
+    """Import `count` more of a summoner's older matches, resuming from where
+    the last backfill stopped.
+
+    Returns
+    -------
+    int
+        number of new matches found
+
+    """
+    summoner = Summoner.objects.get(puuid=puuid)
+    if summoner.backfill_complete:
+        return 0
+
+    index = summoner.backfill_index
+    if summoner.backfill_anchor:
+        # make sure riot's list hasn't shifted under the cursor
+        lookup = max(index - 1, 0)
+        ids = list_match_ids(puuid, region, lookup, page_size)
+        if ids is None:
+            return 0
+        if summoner.backfill_anchor in ids:
+            index = lookup + ids.index(summoner.backfill_anchor) + 1
+        else:
+            logger.warning(f"Lost backfill anchor for {summoner}, resuming at {index}.")
+
+    new_ids: list[str] = []
+    anchor = summoner.backfill_anchor
+    end = index + count
+    complete = False
+    while index < end:
+        ids = list_match_ids(puuid, region, index, min(page_size, end - index))
+        if ids is None:
+            # try again next time
+            break
+        if not ids:
+            complete = True
+            break
+        known = set(Match.objects.filter(_id__in=ids).values_list('_id', flat=True))
+        new_ids += [x for x in ids if x not in known]
+        index += len(ids)
+        anchor = ids[-1]
+
+    import_match_ids(new_ids, region)
+    summoner.backfill_index = index
+    summoner.backfill_anchor = anchor
+    summoner.backfill_complete = complete
+    summoner.save(update_fields=['backfill_index', 'backfill_anchor', 'backfill_complete'])
+    if not summoner.watermark_match_id:
+        update_watermark(summoner, [])
+    logger.info(f"Backfilled {len(new_ids)} matches for {summoner}, cursor at {index}.")
+    return len(new_ids)
 
 
 def get_top_played_with(
@@ -340,6 +583,8 @@ def get_top_played_with(
 ):
     """Find the summoner names that you have played with the most.
 
+    Read from the PlayedWith index unless `recent` or `recent_days` is given.
+
     Parameters
     ----------
     summoner_id : int
@@ -347,28 +592,45 @@ def get_top_played_with(
     team : bool
         Only count players who were on the same team
     season_id : int
+        major version of the patch
     queue_id : int
     recent : int
         count of most recent games to check
     recent_days : int
+    group_by : ['summoner_name', 'puuid']
 
     Returns
     -------
-    query of counts
+    values query of {group_by, count, wins}
 
     """
     summoner = Summoner.objects.get(id=summoner_id)
 
+    if recent is None and recent_days is None:
+        query = PlayedWith.objects.filter(summoner_puuid=summoner.puuid, same_team=team)
+        if season_id is not None:
+            query = query.filter(season=season_id)
+        if queue_id is not None:
+            query = query.filter(queue_id=queue_id)
+        if group_by == "summoner_name":
+            query = query.annotate(
+                summoner_name=Subquery(
+                    Summoner.objects.filter(puuid=OuterRef("puuid")).values("name")[:1]
+                )
+            )
+        query = query.values(group_by).annotate(count=Sum("games"), wins=Sum("wins"))
+        return query.order_by("-count")
+
     p = Participant.objects.all()
     if season_id is not None:
-        p = p.filter(match__season_id=season_id)
+        p = p.filter(match__major=season_id)
     if queue_id is not None:
         p = p.filter(match__queue_id=queue_id)
 
     if recent is not None:
         m = Match.objects.all()
         if season_id is not None:
-            m = m.filter(season_id=season_id)
+            m = m.filter(major=season_id)
         if queue_id is not None:
             m = m.filter(queue_id=queue_id)
         m = m.order_by("-game_creation")
@@ -417,8 +679,32 @@ def get_top_played_with(
     return p
 
 
+def timeline_key(match_id, overwrite=False):
+    return f'timeline:{match_id}:{overwrite}'
+
+
 @app.task(name="match.tasks.import_advanced_timeline")
+@coalesce(timeline_key)
 def import_advanced_timeline(match_id: str, overwrite=False):
+    """Import the AdvancedTimeline of a match.
+
+    Everything is written with bulk inserts in two phases: first the Frames,
+    then all of the frame events.  Kill events are inserted before their
+    victim damage rows so that those can reference them.  The number of
+    statements does not depend on the length of the game.
+
+    Parameters
+    ----------
+    match_id : int
+        internal Match.id
+    overwrite : bool
+        Replace the timeline if it already exists.
+
+    Returns
+    -------
+    None
+
+    """
     victim_damage_received_events = []
     victim_damage_dealt_events = []
     ward_placed_events = []
@@ -433,36 +719,53 @@ def import_advanced_timeline(match_id: str, overwrite=False):
     turret_plate_destroyed_events = []
     elite_monster_kill_events = []
     building_kill_events = []
+    game_end_events = []
+    champion_kill_events = []
+    participant_frames = []
+    columnar_frames = []
+    frames = []
+
+    match = Match.objects.get(id=match_id)
+    if not overwrite and AdvancedTimeline.objects.filter(match=match).exists():
+        return
+    region = match.platform_id.lower()
+    logger.info(f"Requesting info for match {match.id} in region {region}")
+    # fetch and parse before opening the transaction so no locks are held
+    # while waiting on riot
+    content = fetch_timeline_json(match._id, region)
+    if content is None:
+        return
+    try:
+        start = time.perf_counter()
+        parsed = TimelineResponseModel.parse_raw(content)
+        logger.info(f"AdvancedTimeline parsing took: {time.perf_counter() - start}")
+    except ValidationError:
+        logger.exception('AdvanceTimeline could not be parsed.')
+        return
+    logger.info('Parsed AdvancedTimeline successfully.')
+    data = parsed.info
+
     with transaction.atomic():
         match = Match.objects.select_related('advancedtimeline').get(id=match_id)
-        if hasattr(match, 'advancedtimeline') and overwrite:
+        if hasattr(match, 'advancedtimeline'):
+            if not overwrite:
+                return
             match.advancedtimeline.delete()
-        api = get_riot_api()
-        region = match.platform_id.lower()
-        logger.info(f"Requesting info for match {match.id} in region {region}")
-        try:
-            response = api.match.timeline(match._id, region=region)
-            start = time.perf_counter()
-            parsed = TimelineResponseModel.parse_raw(response.content)
-            logger.info(f"AdvancedTimeline parsing took: {time.perf_counter() - start}")
-        except ValidationError:
-            logger.exception('AdvanceTimeline could not be parsed.')
-            return
-        logger.info('Parsed AdvancedTimeline successfully.')
-        data = parsed.info
         at = AdvancedTimeline(match=match, frame_interval=data.frameInterval)
         at.save()
 
+        # phase 1: frames, so that every event below can point at its frame
+        columnar = settings.COLUMNAR_PARTICIPANT_FRAMES
         for fm in data.frames:
-            frame = Frame(timeline=at, timestamp=fm.timestamp)
-            frame.save()
+            frames.append(Frame(timeline=at, timestamp=fm.timestamp))
+        Frame.objects.bulk_create(frames)
+
+        for frame, fm in zip(frames, data.frames):
             pframes = []
             for pfm in fm.participantFrames.values():
                 stats = pfm.championStats
                 dmg_stats = pfm.damageStats
                 p_frame_data = {
-                    "frame": frame,
-
                     "participant_id": pfm.participantId,
                     "current_gold": pfm.currentGold,
                     "jungle_minions_killed": pfm.jungleMinionsKilled,
@@ -512,21 +815,26 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                     "true_damage_done_to_champions": dmg_stats.trueDamageDoneToChampions,
                     "true_damage_taken": dmg_stats.trueDamageTaken,
                 }
-                pframes.append(ParticipantFrame(**p_frame_data))
-            ParticipantFrame.objects.bulk_create(pframes)
+                pframes.append(p_frame_data)
+            if columnar:
+                columnar_frames.append((fm.timestamp, pframes))
+            else:
+                participant_frames += [
+                    ParticipantFrame(frame=frame, **x) for x in pframes
+                ]
 
             for evm in fm.events:
                 match evm:
                     case tmparsers.WardPlacedEventModel():
                         ward_placed_events.append(WardPlacedEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             creator_id=evm.creatorId,
                             ward_type=evm.wardType,
                         ))
                     case tmparsers.WardKillEventModel():
                         ward_kill_events.append(WardKillEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             killer_id=evm.killerId,
                             ward_type=evm.wardType,
@@ -545,28 +853,28 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                         ...
                     case tmparsers.ItemPurchasedEventModel():
                         item_purchase_events.append(ItemPurchasedEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             item_id=evm.itemId,
                             participant_id=evm.participantId,
                         ))
                     case tmparsers.ItemDestroyedEventModel():
                         item_destroyed_events.append(ItemDestroyedEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             item_id=evm.itemId,
                             participant_id=evm.participantId,
                         ))
                     case tmparsers.ItemSoldEventModel():
                         item_sold_events.append(ItemSoldEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             item_id=evm.itemId,
                             participant_id=evm.participantId,
                         ))
                     case tmparsers.ItemUndoEventModel():
                         item_undo_events.append(ItemUndoEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             participant_id=evm.participantId,
                             before_id=evm.beforeId,
@@ -575,7 +883,7 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                         ))
                     case tmparsers.SkillLevelUpEventModel():
                         skill_level_up_events.append(SkillLevelUpEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             level_up_type=evm.levelUpType,
                             participant_id=evm.participantId,
@@ -583,14 +891,14 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                         ))
                     case tmparsers.LevelUpModel():
                         level_up_events.append(LevelUpEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             level=evm.level,
                             participant_id=evm.participantId,
                         ))
                     case tmparsers.ChampionSpecialKillEventModel():
                         champion_special_kill_events.append(ChampionSpecialKillEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             assisting_participant_ids=evm.assistingParticipantIds,
                             kill_type=evm.killType,
@@ -601,7 +909,7 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                         ))
                     case tmparsers.TurretPlateDestroyedEventModel():
                         turret_plate_destroyed_events.append(TurretPlateDestroyedEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             killer_id=evm.killerId,
                             lane_type=evm.laneType,
@@ -611,7 +919,7 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                         ))
                     case tmparsers.EliteMonsterKillEventModel():
                         elite_monster_kill_events.append(EliteMonsterKillEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             killer_id=evm.killerId,
                             killer_team_id=evm.killerTeamId,
@@ -623,7 +931,7 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                         ))
                     case tmparsers.BuildingKillEventModel():
                         building_kill_events.append(BuildingKillEvent(
-                            frame_id=frame.id,
+                            frame=frame,
                             timestamp=evm.timestamp,
                             killer_id=evm.killerId,
                             bounty=evm.bounty,
@@ -635,16 +943,16 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                             team_id=evm.teamId,
                         ))
                     case tmparsers.GameEndEventModel():
-                        GameEndEvent.objects.create(
-                            frame_id=frame.id,
+                        game_end_events.append(GameEndEvent(
+                            frame=frame,
                             timestamp=evm.timestamp,
                             game_id=evm.gameId,
                             real_timestamp=evm.realTimestamp,
                             winning_team=evm.winningTeam,
-                        )
+                        ))
                     case tmparsers.ChampionKillEventModel():
-                        cke = ChampionKillEvent.objects.create(
-                            frame_id=frame.id,
+                        cke = ChampionKillEvent(
+                            frame=frame,
                             timestamp=evm.timestamp,
                             bounty=evm.bounty,
                             shutdown_bounty=evm.shutdownBounty,
@@ -654,9 +962,10 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                             x=evm.position.x,
                             y=evm.position.y,
                         )
+                        champion_kill_events.append(cke)
                         for vd in evm.victimDamageDealt or []:
                             victim_damage_dealt_events.append(VictimDamageDealt(
-                                championkillevent_id=cke.id,
+                                championkillevent=cke,
                                 basic=vd.basic,
                                 magic_damage=vd.magicDamage,
                                 name=vd.name,
@@ -669,7 +978,7 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                             ))
                         for vd in evm.victimDamageReceived or []:
                             victim_damage_received_events.append(VictimDamageReceived(
-                                championkillevent_id=cke.id,
+                                championkillevent=cke,
                                 basic=vd.basic,
                                 magic_damage=vd.magicDamage,
                                 name=vd.name,
@@ -680,6 +989,14 @@ def import_advanced_timeline(match_id: str, overwrite=False):
                                 true_damage=vd.trueDamage,
                                 type=vd.type,
                             ))
+        if columnar_frames:
+            at.participant_frames = framestore.encode(columnar_frames)
+            at.save(update_fields=['participant_frames'])
+        ParticipantFrame.objects.bulk_create(participant_frames)
+
+        # phase 2: frame children, then the children of kill events
+        GameEndEvent.objects.bulk_create(game_end_events)
+        ChampionKillEvent.objects.bulk_create(champion_kill_events)
         WardPlacedEvent.objects.bulk_create(ward_placed_events)
         WardKillEvent.objects.bulk_create(ward_kill_events)
         ItemPurchasedEvent.objects.bulk_create(item_purchase_events)
@@ -743,16 +1060,21 @@ def import_summoners_from_spectate(data, region):
 
 def get_player_ranks(summoner_list, threshold_days=1, sync=True):
     logger.info('Applying player ranks.')
-    jobs = [pt.import_positions.s(x.id, threshold_days=threshold_days) for x in summoner_list]
-    if jobs:
-        if sync:
-            for x in jobs:
-                x()
-        else:
-            group(*jobs)()
+    if not summoner_list:
+        return
+    if sync:
+        ranks.refresh_positions(summoner_list, threshold_days=threshold_days)
+    else:
+        pt.import_many_positions.apply_async(
+            ([x.id for x in summoner_list],),
+            {"threshold_days": threshold_days},
+            priority=queues.PRIORITY_BACKGROUND,
+        )
 
 
 def apply_player_ranks(match, threshold_days=1):
+    """Set the solo queue tier and rank of a recent match's participants.
+    """
     if not isinstance(match, Match):
         match = Match.objects.get(id=match)
 
@@ -760,32 +1082,28 @@ def apply_player_ranks(match, threshold_days=1):
     one_day_ago = now - timezone.timedelta(days=1)
     if match.get_creation() > one_day_ago:
         # ok -- apply ranks
-        parts = match.participants.all()
+        parts = list(match.participants.all())
+        if any(part.tier for part in parts):
+            # ranks were already applied
+            return
         q = Q()
         for part in parts:
             q |= Q(_id=part.summoner_id, puuid=part.puuid)
-        summoner_qs = Summoner.objects.filter(q)
-        summoner_list = [x for x in summoner_qs]
-        summoners = {x.puuid: x for x in summoner_qs}
-        get_player_ranks(summoner_list, threshold_days=threshold_days, sync=True)
+        summoners = {x.puuid: x for x in Summoner.objects.filter(q)}
+        positions = ranks.get_positions(
+            list(summoners.values()),
+            threshold_days=threshold_days,
+            queue_type="RANKED_SOLO_5x5",
+        )
 
+        updated = []
         for part in parts:
-            if not part.tier:
-                # only applying if it is not already applied
-                summoner = summoners.get(part.puuid)
-                if summoner:
-                    checkpoint = summoner.get_newest_rank_checkpoint()
-                    if checkpoint:
-                        query = checkpoint.positions.filter(
-                            queue_type="RANKED_SOLO_5x5"
-                        )
-                        if query:
-                            position = query[0]
-                            part.rank, part.tier = position.rank, position.tier
-                            part.save()
-            else:
-                # if any tiers are already applied, stop
-                return
+            summoner = summoners.get(part.puuid)
+            if summoner and positions.get(summoner.id):
+                position = positions[summoner.id][0]
+                part.rank, part.tier = position.rank, position.tier
+                updated.append(part)
+        Participant.objects.bulk_update(updated, ["rank", "tier"])
 
 
 PARTICIPANT_ROLE_KEYS = {
@@ -815,20 +1133,180 @@ def get_sorted_participants(match, participants=None):
     return ordered
 
 
-@transaction.atomic()
 def import_match_from_data(data, region: str, refresh=False):
-    try:
-        parsed = MatchResponseModel.parse_raw(data)
-    except ValidationError:
-        logger.exception('Match could not be parsed.')
-        return
+    """Import a single match from raw riot JSON.
 
-    if "tutorial" in parsed.info.gameMode.lower():
-        return False
+    Thin wrapper around `import_matches_from_data`.
 
+    """
+    matches = import_matches_from_data([data], region, refresh=refresh)
+    if matches:
+        return matches[0]
+    return None
+
+
+def parse_match_payloads(data_list) -> list[MatchResponseModel]:
+    """Parse raw match payloads, dropping anything unparsable or tutorial games.
+    """
+    parsed_list = []
+    for data in data_list:
+        try:
+            parsed = MatchResponseModel.parse_raw(data)
+            for part in parsed.info.participants:
+                # resolve (and validate) the perk styles once, up front
+                part.perks.primary_style
+                part.perks.sub_style
+        except ValidationError:
+            logger.exception('Match could not be parsed.')
+            continue
+        if "tutorial" in parsed.info.gameMode.lower():
+            continue
+        parsed_list.append(parsed)
+    return parsed_list
+
+
+@transaction.atomic()
+def import_matches_from_data(data_list, region: str, refresh=False, attempts=3):
+    """Import many matches at once using set-based bulk inserts.
+
+    All Matches, Participants, Stats, Teams and Bans of the batch are written
+    with one INSERT per table, inside a single transaction.  Matches which were
+    already imported are skipped in bulk (or deleted and re-imported if
+    `refresh` is True).
+
+    Parameters
+    ----------
+    data_list : list[str | bytes]
+        raw match JSON payloads
+    region : str
+    refresh : bool
+        Whether or not to re-import matches which already exist.
+    attempts : int
+        How many times to retry the write if a concurrent import inserts
+        one of the same matches first.
+
+    Returns
+    -------
+    list[Match]
+        the newly written matches
+
+    """
+    parsed_list = parse_match_payloads(data_list)
+    return import_parsed_matches(parsed_list, region, refresh=refresh, attempts=attempts)
+
+
+@transaction.atomic()
+def import_parsed_matches(
+    parsed_list: list[MatchResponseModel],
+    region: str,
+    refresh=False,
+    attempts=3,
+):
+    """Bulk write already parsed matches.  See `import_matches_from_data`.
+    """
+    by_id = {parsed.metadata.matchId: parsed for parsed in parsed_list}
+    if not by_id:
+        return []
+
+    for attempt in range(attempts):
+        existing = set(
+            Match.objects.filter(_id__in=list(by_id)).values_list('_id', flat=True)
+        )
+        if existing:
+            if refresh:
+                with transaction.atomic():
+                    stale = Match.objects.filter(_id__in=existing)
+                    rollups.remove_matches(list(stale.values_list('id', flat=True)))
+                    stale.delete()
+            else:
+                logger.info(f"Skipping {len(existing)} matches which were already imported.")
+        to_import = [
+            parsed for _id, parsed in by_id.items()
+            if refresh or _id not in existing
+        ]
+        if not to_import:
+            return []
+        try:
+            with transaction.atomic():
+                return bulk_write_matches(to_import, region)
+        except IntegrityError:
+            # another worker imported one of these matches after we looked
+            logger.warning(f"Conflict while bulk importing matches (attempt {attempt + 1}).")
+    logger.error("Could not bulk import matches due to repeated conflicts.")
+    return []
+
+
+def invalidate_summoners(puuids):
+    """Reset the page meta tags and cached analytics of summoners with newly
+    imported games.
+    """
+    Summoner.objects.filter(puuid__in=puuids, meta__isnull=False).update(meta=None)
+    # also stops a page which read the old games from storing their meta
+    analytics.invalidate(list(puuids))
+
+
+def bulk_write_matches(parsed_list: list[MatchResponseModel], region: str):
+    """Write Matches and all of their related rows with one INSERT per table.
+
+    Assumes none of the matches exist yet.
+
+    Returns
+    -------
+    list[Match]
+
+    """
+    match_models = [build_match_model(parsed) for parsed in parsed_list]
+    Match.objects.bulk_create(match_models)
+
+    all_participants = [part for parsed in parsed_list for part in parsed.info.participants]
+    import_summoner_from_participant(all_participants, region)
+    # their page meta tags and cached analytics are out of date once this
+    # commits, resetting them sooner lets a concurrent read rebuild them from
+    # the old games
+    puuids = {part.puuid for part in all_participants if part.puuid}
+    transaction.on_commit(lambda: invalidate_summoners(puuids))
+
+    participant_models = []
+    stats_models = []
+    summoner_match_models = []
+    team_models = []
+    bans_by_team = []
+    for match_model, parsed in zip(match_models, parsed_list):
+        for part in parsed.info.participants:
+            participant_model = build_participant_model(match_model, part)
+            participant_models.append(participant_model)
+            stats_models.append(build_stats_model(participant_model, part))
+            if part.puuid:
+                summoner_match_models.append(build_summoner_match_model(match_model, part))
+        for tmodel in parsed.info.teams:
+            team_model = build_team_model(match_model, tmodel)
+            team_models.append(team_model)
+            bans_by_team.append((team_model, tmodel.bans))
+
+    Participant.objects.bulk_create(participant_models)
+    Stats.objects.bulk_create(stats_models)
+    # bots can share a puuid
+    SummonerMatch.objects.bulk_create(summoner_match_models, ignore_conflicts=True)
+
+    Team.objects.bulk_create(team_models)
+    bans = []
+    for team_model, ban_list in bans_by_team:
+        for bm in ban_list:
+            bans.append(Ban(
+                champion_id=bm.championId,
+                pick_turn=bm.pickTurn,
+                team=team_model,
+            ))
+    Ban.objects.bulk_create(bans)
+    rollups.add_matches([match.id for match in match_models])
+    impact.update_matches([match.id for match in match_models])
+    return match_models
+
+
+def build_match_model(parsed: MatchResponseModel):
     info = parsed.info
     sem_ver = info.sem_ver
-    match_model = Match(
+    return Match(
         _id=parsed.metadata.matchId,
         game_creation=info.gameCreation,
         game_duration=info.gameDuration,
@@ -843,185 +1321,171 @@ def import_match_from_data(data, region: str, refresh=False):
         build=sem_ver.get(3, ''),
         is_fully_imported=True,
     )
-    try:
-        match_model.save()
-    except IntegrityError:
-        if refresh:
-            Match.objects.filter(_id=parsed.metadata.matchId).delete()
-            match_model.save()
-        else:
-            logging.warning("Attempted to import game which was already imported. Ignoring.")
-            return
 
-    participants_data = info.participants
-    import_summoner_from_participant(participants_data, region)
-
-    for part in participants_data:
-        # PARTICIPANT
-        participant_model = Participant(
-            match=match_model,
-            _id=part.participantId,
-            summoner_id=part.summonerId,
-            puuid=part.puuid,
-            summoner_name=part.summonerName,
-            summoner_name_simplified=part.simple_name,
-            champion_id=part.championId,
-            champ_experience=part.champExperience,
-            summoner_1_id=part.summoner1Id,
-            summoner_1_casts=part.summoner1Casts,
-            summoner_2_id=part.summoner2Id,
-            summoner_2_casts=part.summoner2Casts,
-            team_id=part.teamId,
-            lane=part.lane,
-            role=part.role,
-            individual_position=part.individualPosition,
-            team_position=part.teamPosition,
-        )
-        participant_model.save()
-
-        # STATS
-        stats_model = Stats(
-            participant=participant_model,
-
-            all_in_pings=part.allInPings,
-            assist_me_pings=part.assistMePings,
-            bait_pings=part.baitPings,
-            basic_pings=part.basicPings,
-            command_pings=part.commandPings,
-            danger_pings=part.dangerPings,
-            enemy_missing_pings=part.enemyMissingPings,
-            enemy_vision_pings=part.enemyVisionPings,
-            get_back_pings=part.getBackPings,
-            hold_pings=part.holdPings,
-            need_vision_pings=part.needVisionPings,
-            on_my_way_pings=part.onMyWayPings,
-            push_pings=part.pushPings,
-            vision_cleared_pings=part.visionClearedPings,
-
-            game_ended_in_early_surrender=part.gameEndedInEarlySurrender,
-            game_ended_in_surrender=part.gameEndedInSurrender,
-            riot_id_name=part.riotIdName,
-            riot_id_tagline=part.riotIdTagline,
-
-            assists=part.assists,
-            champ_level=part.champLevel,
-            damage_dealt_to_objectives=part.damageDealtToObjectives,
-            damage_dealt_to_turrets=part.damageDealtToTurrets,
-            damage_self_mitigated=part.damageSelfMitigated,
-            deaths=part.deaths,
-            double_kills=part.doubleKills,
-            first_blood_assist=part.firstBloodAssist,
-            first_blood_kill=part.firstBloodKill,
-            first_tower_assist=part.firstTowerAssist,
-            first_tower_kill=part.firstTowerKill,
-            gold_earned=part.goldEarned,
-            inhibitor_kills=part.inhibitorKills,
-            item_0=part.item0,
-            item_1=part.item1,
-            item_2=part.item2,
-            item_3=part.item3,
-            item_4=part.item4,
-            item_5=part.item5,
-            item_6=part.item6,
-            killing_sprees=part.killingSprees,
-            kills=part.kills,
-            largest_critical_strike=part.largestCriticalStrike,
-            largest_killing_spree=part.largestKillingSpree,
-            largest_multi_kill=part.largestMultiKill,
-            longest_time_spent_living=part.longestTimeSpentLiving,
-            magic_damage_dealt=part.magicDamageDealt,
-            magic_damage_dealt_to_champions=part.magicDamageDealtToChampions,
-            magical_damage_taken=part.magicDamageTaken,
-            neutral_minions_killed=part.neutralMinionsKilled,
-            penta_kills=part.pentaKills,
-            stat_perk_0=part.stat_perk_0,
-            stat_perk_1=part.stat_perk_1,
-            stat_perk_2=part.stat_perk_2,
-            perk_0=part.perks.primary_style.selections[0].perk,
-            perk_1=part.perks.primary_style.selections[1].perk,
-            perk_2=part.perks.primary_style.selections[2].perk,
-            perk_3=part.perks.primary_style.selections[3].perk,
-            perk_4=part.perks.sub_style.selections[0].perk,
-            perk_5=part.perks.sub_style.selections[1].perk,
-
-            perk_0_var_1=part.perks.primary_style.selections[0].var1,
-            perk_1_var_1=part.perks.primary_style.selections[1].var1,
-            perk_2_var_1=part.perks.primary_style.selections[2].var1,
-            perk_3_var_1=part.perks.primary_style.selections[3].var1,
-            perk_4_var_1=part.perks.sub_style.selections[0].var1,
-            perk_5_var_1=part.perks.sub_style.selections[1].var1,
-
-            perk_0_var_2=part.perks.primary_style.selections[0].var2,
-            perk_1_var_2=part.perks.primary_style.selections[1].var2,
-            perk_2_var_2=part.perks.primary_style.selections[2].var2,
-            perk_3_var_2=part.perks.primary_style.selections[3].var2,
-            perk_4_var_2=part.perks.sub_style.selections[0].var2,
-            perk_5_var_2=part.perks.sub_style.selections[1].var2,
-
-            perk_0_var_3=part.perks.primary_style.selections[0].var3,
-            perk_1_var_3=part.perks.primary_style.selections[1].var3,
-            perk_2_var_3=part.perks.primary_style.selections[2].var3,
-            perk_3_var_3=part.perks.primary_style.selections[3].var3,
-            perk_4_var_3=part.perks.sub_style.selections[0].var3,
-            perk_5_var_3=part.perks.sub_style.selections[1].var3,
-
-            perk_primary_style=part.perks.primary_style.style,
-            perk_sub_style=part.perks.sub_style.style,
-            spell_1_casts=part.spell1Casts,
-            spell_2_casts=part.spell2Casts,
-            spell_3_casts=part.spell3Casts,
-            spell_4_casts=part.spell4Casts,
-            time_ccing_others=part.timeCCingOthers,
-            total_damage_dealt=part.totalDamageDealt,
-            total_damage_dealt_to_champions=part.totalDamageDealtToChampions,
-            total_damage_taken=part.totalDamageTaken,
-            total_damage_shielded_on_teammates=part.totalDamageShieldedOnTeammates,
-            total_heal=part.totalHeal,
-            total_heals_on_teammates=part.totalHealsOnTeammates,
-            total_minions_killed=part.totalMinionsKilled,
-            total_time_crowd_control_dealt=part.totalTimeCCDealt,
-            total_units_healed=part.totalUnitsHealed,
-            triple_kills=part.tripleKills,
-            true_damage_dealt=part.trueDamageDealt,
-            true_damage_dealt_to_champions=part.trueDamageDealtToChampions,
-            true_damage_taken=part.trueDamageTaken,
-            turret_kills=part.turretKills,
-            unreal_kills=part.unrealKills,
-            vision_score=part.visionScore,
-            vision_wards_bought_in_game=part.visionWardsBoughtInGame,
-            wards_killed=part.wardsKilled,
-            wards_placed=part.wardsPlaced,
-            win=part.win,
-        )
-        stats_model.save()
-
-    # TEAMS
-    teams = parsed.info.teams
-    for tmodel in teams:
-        team_model = Team(
-            match=match_model,
-            _id=tmodel.teamId,
-            baron_kills=tmodel.objectives.baron.kills,
-            first_baron=tmodel.objectives.baron.first,
-            dragon_kills=tmodel.objectives.dragon.kills,
-            first_dragon=tmodel.objectives.dragon.first,
-            first_blood=tmodel.objectives.champion.first,
-            first_inhibitor=tmodel.objectives.inhibitor.first,
-            inhibitor_kills=tmodel.objectives.inhibitor.kills,
-            first_rift_herald=tmodel.objectives.riftHerald.first,
-            rift_herald_kills=tmodel.objectives.riftHerald.kills,
-            first_tower=tmodel.objectives.tower.first,
-            tower_kills=tmodel.objectives.tower.kills,
-            win=tmodel.win,
-        )
-        team_model.save()
 
-        # BANS
-        bans = []
-        for bm in tmodel.bans:
-            bans.append(Ban(
-                champion_id=bm.championId,
-                pick_turn=bm.pickTurn,
-                team=team_model,
-            ))
-        Ban.objects.bulk_create(bans)
+def build_participant_model(match_model: Match, part: ParticipantModel):
+    return Participant(
+        match=match_model,
+        _id=part.participantId,
+        summoner_id=part.summonerId,
+        puuid=part.puuid,
+        summoner_name=part.summonerName,
+        summoner_name_simplified=part.simple_name,
+        champion_id=part.championId,
+        champ_experience=part.champExperience,
+        summoner_1_id=part.summoner1Id,
+        summoner_1_casts=part.summoner1Casts,
+        summoner_2_id=part.summoner2Id,
+        summoner_2_casts=part.summoner2Casts,
+        team_id=part.teamId,
+        lane=part.lane,
+        role=part.role,
+        individual_position=part.individualPosition,
+        team_position=part.teamPosition,
+    )
+
+
+def build_summoner_match_model(match_model: Match, part: ParticipantModel):
+    return SummonerMatch(
+        puuid=part.puuid,
+        match=match_model,
+        game_creation=match_model.game_creation,
+        queue_id=match_model.queue_id,
+        champion_id=part.championId,
+        win=part.win,
+    )
+
+
+def build_stats_model(participant_model: Participant, part: ParticipantModel):
+    return Stats(
+        participant=participant_model,
+
+        all_in_pings=part.allInPings,
+        assist_me_pings=part.assistMePings,
+        bait_pings=part.baitPings,
+        basic_pings=part.basicPings,
+        command_pings=part.commandPings,
+        danger_pings=part.dangerPings,
+        enemy_missing_pings=part.enemyMissingPings,
+        enemy_vision_pings=part.enemyVisionPings,
+        get_back_pings=part.getBackPings,
+        hold_pings=part.holdPings,
+        need_vision_pings=part.needVisionPings,
+        on_my_way_pings=part.onMyWayPings,
+        push_pings=part.pushPings,
+        vision_cleared_pings=part.visionClearedPings,
+
+        game_ended_in_early_surrender=part.gameEndedInEarlySurrender,
+        game_ended_in_surrender=part.gameEndedInSurrender,
+        riot_id_name=part.riotIdName,
+        riot_id_tagline=part.riotIdTagline,
+
+        assists=part.assists,
+        champ_level=part.champLevel,
+        damage_dealt_to_objectives=part.damageDealtToObjectives,
+        damage_dealt_to_turrets=part.damageDealtToTurrets,
+        damage_self_mitigated=part.damageSelfMitigated,
+        deaths=part.deaths,
+        double_kills=part.doubleKills,
+        first_blood_assist=part.firstBloodAssist,
+        first_blood_kill=part.firstBloodKill,
+        first_tower_assist=part.firstTowerAssist,
+        first_tower_kill=part.firstTowerKill,
+        gold_earned=part.goldEarned,
+        inhibitor_kills=part.inhibitorKills,
+        item_0=part.item0,
+        item_1=part.item1,
+        item_2=part.item2,
+        item_3=part.item3,
+        item_4=part.item4,
+        item_5=part.item5,
+        item_6=part.item6,
+        killing_sprees=part.killingSprees,
+        kills=part.kills,
+        largest_critical_strike=part.largestCriticalStrike,
+        largest_killing_spree=part.largestKillingSpree,
+        largest_multi_kill=part.largestMultiKill,
+        longest_time_spent_living=part.longestTimeSpentLiving,
+        magic_damage_dealt=part.magicDamageDealt,
+        magic_damage_dealt_to_champions=part.magicDamageDealtToChampions,
+        magical_damage_taken=part.magicDamageTaken,
+        neutral_minions_killed=part.neutralMinionsKilled,
+        penta_kills=part.pentaKills,
+        stat_perk_0=part.stat_perk_0,
+        stat_perk_1=part.stat_perk_1,
+        stat_perk_2=part.stat_perk_2,
+        perk_0=part.perks.primary_style.selections[0].perk,
+        perk_1=part.perks.primary_style.selections[1].perk,
+        perk_2=part.perks.primary_style.selections[2].perk,
+        perk_3=part.perks.primary_style.selections[3].perk,
+        perk_4=part.perks.sub_style.selections[0].perk,
+        perk_5=part.perks.sub_style.selections[1].perk,
+
+        perk_0_var_1=part.perks.primary_style.selections[0].var1,
+        perk_1_var_1=part.perks.primary_style.selections[1].var1,
+        perk_2_var_1=part.perks.primary_style.selections[2].var1,
+        perk_3_var_1=part.perks.primary_style.selections[3].var1,
+        perk_4_var_1=part.perks.sub_style.selections[0].var1,
+        perk_5_var_1=part.perks.sub_style.selections[1].var1,
+
+        perk_0_var_2=part.perks.primary_style.selections[0].var2,
+        perk_1_var_2=part.perks.primary_style.selections[1].var2,
+        perk_2_var_2=part.perks.primary_style.selections[2].var2,
+        perk_3_var_2=part.perks.primary_style.selections[3].var2,
+        perk_4_var_2=part.perks.sub_style.selections[0].var2,
+        perk_5_var_2=part.perks.sub_style.selections[1].var2,
+
+        perk_0_var_3=part.perks.primary_style.selections[0].var3,
+        perk_1_var_3=part.perks.primary_style.selections[1].var3,
+        perk_2_var_3=part.perks.primary_style.selections[2].var3,
+        perk_3_var_3=part.perks.primary_style.selections[3].var3,
+        perk_4_var_3=part.perks.sub_style.selections[0].var3,
+        perk_5_var_3=part.perks.sub_style.selections[1].var3,
+
+        perk_primary_style=part.perks.primary_style.style,
+        perk_sub_style=part.perks.sub_style.style,
+        spell_1_casts=part.spell1Casts,
+        spell_2_casts=part.spell2Casts,
+        spell_3_casts=part.spell3Casts,
+        spell_4_casts=part.spell4Casts,
+        time_ccing_others=part.timeCCingOthers,
+        total_damage_dealt=part.totalDamageDealt,
+        total_damage_dealt_to_champions=part.totalDamageDealtToChampions,
+        total_damage_taken=part.totalDamageTaken,
+        total_damage_shielded_on_teammates=part.totalDamageShieldedOnTeammates,
+        total_heal=part.totalHeal,
+        total_heals_on_teammates=part.totalHealsOnTeammates,
+        total_minions_killed=part.totalMinionsKilled,
+        total_time_crowd_control_dealt=part.totalTimeCCDealt,
+        total_units_healed=part.totalUnitsHealed,
+        triple_kills=part.tripleKills,
+        true_damage_dealt=part.trueDamageDealt,
+        true_damage_dealt_to_champions=part.trueDamageDealtToChampions,
+        true_damage_taken=part.trueDamageTaken,
+        turret_kills=part.turretKills,
+        unreal_kills=part.unrealKills,
+        vision_score=part.visionScore,
+        vision_wards_bought_in_game=part.visionWardsBoughtInGame,
+        wards_killed=part.wardsKilled,
+        wards_placed=part.wardsPlaced,
+        win=part.win,
+    )
+
+
+def build_team_model(match_model: Match, tmodel: TeamModel):
+    return Team(
+        match=match_model,
+        _id=tmodel.teamId,
+        baron_kills=tmodel.objectives.baron.kills,
+        first_baron=tmodel.objectives.baron.first,
+        dragon_kills=tmodel.objectives.dragon.kills,
+        first_dragon=tmodel.objectives.dragon.first,
+        first_blood=tmodel.objectives.champion.first,
+        first_inhibitor=tmodel.objectives.inhibitor.first,
+        inhibitor_kills=tmodel.objectives.inhibitor.kills,
+        first_rift_herald=tmodel.objectives.riftHerald.first,
+        rift_herald_kills=tmodel.objectives.riftHerald.kills,
+        first_tower=tmodel.objectives.tower.first,
+        tower_kills=tmodel.objectives.tower.kills,
+        win=tmodel.win,
+    )
@@ -50,3 +50,185 @@ class MatchFactory(DjangoModelFactory):
         if extracted:
             for _ in range(extracted):
                 ParticipantFactory(match=self)
+
+
+def _default_for(field):
+    if field.outer_type_ is bool or field.type_ is bool:
+        return False
+    if field.type_ is str:
+        return ''
+    return 0
+
+
+def participant_payload(participant_id: int, team_id: int, **kwargs):
+    """Build a minimal but valid riot participant dict for match parsing."""
+    from match.parsers.match import ParticipantModel
+    data = {
+        name: _default_for(field)
+        for name, field in ParticipantModel.__fields__.items()
+        if field.required
+    }
+    data.update({
+        'participantId': participant_id,
+        'teamId': team_id,
+        'puuid': f'puuid-{participant_id}',
+        'summonerId': f'summoner-{participant_id}',
+        'summonerName': f'Summoner {participant_id}',
+        'championId': participant_id,
+        'championName': f'Champion{participant_id}',
+        'summoner1Id': 4,
+        'summoner2Id': 14,
+        'teamPosition': 'TOP',
+        'win': team_id == 100,
+        'perks': {
+            'statPerks': {'defense': 5002, 'flex': 5008, 'offense': 5005},
+            'styles': [
+                {
+                    'description': 'primaryStyle',
+                    'style': 8000,
+                    'selections': [
+                        {'perk': 8005 + i, 'var1': i, 'var2': 0, 'var3': 0}
+                        for i in range(4)
+                    ],
+                },
+                {
+                    'description': 'subStyle',
+                    'style': 8100,
+                    'selections': [
+                        {'perk': 8105 + i, 'var1': i, 'var2': 0, 'var3': 0}
+                        for i in range(2)
+                    ],
+                },
+            ],
+        },
+    })
+    data.update(kwargs)
+    return data
+
+
+def team_payload(team_id: int, win: bool):
+    objective = {'first': False, 'kills': 0}
+    return {
+        'teamId': team_id,
+        'win': win,
+        'bans': [{'championId': team_id + i, 'pickTurn': i} for i in range(5)],
+        'objectives': {
+            key: dict(objective)
+            for key in ['baron', 'champion', 'dragon', 'inhibitor', 'riftHerald', 'tower']
+        },
+    }
+
+
+def match_payload(match_id='NA1_1', game_creation=1_600_000_000_000, participants=None, **kwargs):
+    """Build a riot match-v5 style dict which `MatchResponseModel` can parse."""
+    if participants is None:
+        participants = [
+            participant_payload(i, 100 if i <= 5 else 200)
+            for i in range(1, 11)
+        ]
+    info = {
+        'participants': participants,
+        'teams': [team_payload(100, True), team_payload(200, False)],
+        'gameCreation': game_creation,
+        'gameEndTimestamp': game_creation + 1_800_000,
+        'gameDuration': 1800,
+        'gameId': int(match_id.split('_')[-1]),
+        'gameMode': 'CLASSIC',
+        'gameName': '',
+        'gameStartTimestamp': game_creation,
+        'gameType': 'MATCHED_GAME',
+        'gameVersion': '13.4.493.9251',
+        'mapId': 11,
+        'platformId': 'NA1',
+        'queueId': 420,
+        'tournamentCode': None,
+    }
+    info.update(kwargs)
+    return {
+        'metadata': {
+            'dataVersion': 2,
+            'matchId': match_id,
+            'participants': [x['puuid'] for x in participants],
+        },
+        'info': info,
+    }
+
+
+def participant_frame_payload(participant_id: int, minute: int):
+    """Build a riot participant frame with stats that grow over the game."""
+    from match.parsers.timeline import ChampionStatModel, DamageStatModel
+    champion_stats = {name: 50 + participant_id for name in ChampionStatModel.__fields__}
+    damage_stats = {
+        name: minute * (1000 + participant_id * 37) for name in DamageStatModel.__fields__
+    }
+    return {
+        'championStats': champion_stats,
+        'currentGold': (minute * 397 + participant_id) % 3000,
+        'damageStats': damage_stats,
+        'goldPerSecond': 0,
+        'jungleMinionsKilled': minute * (participant_id % 2),
+        'level': min(18, 1 + minute // 2),
+        'minionsKilled': minute * 7,
+        'participantId': participant_id,
+        'position': {'x': 500 + minute * 211 % 14000, 'y': 14000 - minute * 97 % 14000},
+        'timeEnemySpentControlled': minute * 3,
+        'totalGold': 500 + minute * 410 + participant_id,
+        'xp': minute * 480,
+    }
+
+
+def timeline_payload(match_id='NA1_1', frames=30):
+    """Build a riot match-v5 timeline which `TimelineResponseModel` can parse.
+
+    Every frame gets an item purchase, a ward placed and a champion kill with
+    victim damage, and the last frame ends the game.
+
+    """
+    frame_list = []
+    for minute in range(frames):
+        timestamp = minute * 60000
+        participant_id = minute % 10 + 1
+        damage = {
+            'basic': False, 'magicDamage': 100, 'name': 'Champion1',
+            'participantId': participant_id, 'physicalDamage': 200,
+            'spellName': 'spell', 'spellSlot': 0, 'trueDamage': 0, 'type': 'OTHER',
+        }
+        events = [
+            {'type': 'ITEM_PURCHASED', 'timestamp': timestamp + 1, 'itemId': 1055, 'participantId': participant_id},
+            {'type': 'WARD_PLACED', 'timestamp': timestamp + 2, 'creatorId': participant_id, 'wardType': 'YELLOW_TRINKET'},
+            {
+                'type': 'CHAMPION_KILL', 'timestamp': timestamp + 3, 'bounty': 300,
+                'killStreakLength': 0, 'killerId': participant_id,
+                'victimId': participant_id % 10 + 1, 'position': {'x': 10, 'y': 10},
+                'assistingParticipantIds': [3, 4],
+                'victimDamageDealt': [damage, damage],
+                'victimDamageReceived': [damage, damage, damage],
+            },
+        ]
+        if minute == frames - 1:
+            events.append({
+                'type': 'GAME_END', 'timestamp': timestamp + 4, 'realTimestamp': 0,
+                'gameId': int(match_id.split('_')[-1]), 'winningTeam': 100,
+            })
+        frame_list.append({
+            'timestamp': timestamp,
+            'events': events,
+            'participantFrames': {
+                str(i): participant_frame_payload(i, minute) for i in range(1, 11)
+            },
+        })
+    return {
+        'metadata': {
+            'dataVersion': 2,
+            'matchId': match_id,
+            'participants': [f'puuid-{i}' for i in range(1, 11)],
+        },
+        'info': {
+            'frameInterval': 60000,
+            'frames': frame_list,
+            'gameId': int(match_id.split('_')[-1]),
+            'participants': [
+                {'participantId': i, 'puuid': f'puuid-{i}'} for i in range(1, 11)
+            ],
+        },
+    }
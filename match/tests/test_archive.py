@@ -0,0 +1,50 @@
+"""match/tests/test_archive.py
+"""
+import json
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from match import archive
+from match import tasks as mt
+
+from .factories import match_payload
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        storage = {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": tmp.name},
+        }
+        override = override_settings(RAW_ARCHIVE_STORAGE=storage)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_roundtrip(self):
+        content = json.dumps(match_payload('NA1_1')).encode()
+        digest = archive.archive_payload(archive.MATCH, 'NA1_1', content)
+        # identical payloads share one blob
+        self.assertEqual(archive.archive_payload(archive.MATCH, 'NA1_2', content), digest)
+        self.assertEqual(archive.get_archived_payload(archive.MATCH, 'NA1_1'), content)
+        self.assertEqual(archive.get_archived_payload(archive.MATCH, 'NA1_2'), content)
+        self.assertIsNone(archive.get_archived_payload(archive.TIMELINE, 'NA1_1'))
+
+    def test_ref_is_replaced(self):
+        old, new = [json.dumps(match_payload('NA1_1', gameDuration=x)).encode() for x in [1000, 2000]]
+        archive.archive_payload(archive.MATCH, 'NA1_1', old)
+        archive.archive_payload(archive.MATCH, 'NA1_1', new)
+        self.assertEqual(archive.get_archived_payload(archive.MATCH, 'NA1_1'), new)
+
+    def test_fetch_reads_archive_first(self):
+        content = json.dumps(match_payload('NA1_1')).encode()
+        api = mock.Mock()
+        api.match.get.return_value = mock.Mock(status_code=200, content=content)
+        with mock.patch('match.tasks.get_riot_api', return_value=api):
+            self.assertEqual(mt.fetch_match_json('NA1_1', 'na'), content)
+            self.assertEqual(mt.fetch_match_json('NA1_1', 'na'), content)
+            mt.import_match('NA1_1', 'na', refresh=True)
+        self.assertEqual(api.match.get.call_count, 1)
@@ -0,0 +1,46 @@
+"""match/tests/test_framestore.py
+"""
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from match import framestore
+from match import tasks as mt
+from match.models import ParticipantFrame
+from match.serializers import AdvancedTimelineSerializer
+
+from .factories import MatchFactory, timeline_payload
+
+
+class FramestoreTest(TestCase):
+    def import_timeline(self, match_id, columnar):
+        match = MatchFactory(_id=match_id, platform_id='NA1')
+        content = json.dumps(timeline_payload(match_id, frames=40))
+        with override_settings(COLUMNAR_PARTICIPANT_FRAMES=columnar):
+            with mock.patch('match.tasks.fetch_timeline_json', return_value=content):
+                mt.import_advanced_timeline(match.id)
+        match.refresh_from_db()
+        return match.advancedtimeline
+
+    def test_matches_row_storage(self):
+        rows = self.import_timeline('NA1_1', columnar=False)
+        packed = self.import_timeline('NA1_2', columnar=True)
+        self.assertIsNone(rows.participant_frames)
+        self.assertEqual(
+            ParticipantFrame.objects.filter(frame__timeline=packed).count(), 0,
+        )
+
+        expected = AdvancedTimelineSerializer(rows).data
+        actual = AdvancedTimelineSerializer(packed).data
+        self.assertEqual(len(actual['frames']), 40)
+        for a, b in zip(expected['frames'], actual['frames']):
+            self.assertEqual(
+                sorted(a['participantframes'], key=lambda x: x['participant_id']),
+                b['participantframes'],
+            )
+
+    def test_size(self):
+        packed = self.import_timeline('NA1_1', columnar=True)
+        raw_size = 40 * 10 * (len(framestore.FIELDS) + 1) * 4
+        self.assertLess(len(packed.participant_frames) * 10, raw_size)
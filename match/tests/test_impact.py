@@ -0,0 +1,45 @@
+"""match/tests/test_impact.py
+"""
+import json
+
+from django.test import TestCase
+
+import numpy as np
+
+from match import impact
+from match import tasks as mt
+from match.models import Participant, Stats
+
+from .factories import match_payload
+
+
+class ComputeScoresTest(TestCase):
+    def test_compute_scores(self):
+        features = len(impact.FEATURES)
+        values = np.array([[1] * features, [3] * features, [5] * features, [0] * features], dtype=np.float64)
+        team_index = np.array([0, 0, 1, 1])
+        scores = impact.compute_scores(team_index, values)
+        np.testing.assert_allclose(scores, [0.5, 1.5, 2.0, 0.0])
+        # nobody on the team has any of a feature
+        scores = impact.compute_scores(np.array([0, 0]), np.zeros((2, features)))
+        np.testing.assert_allclose(scores, [1.0, 1.0])
+
+
+class UpdateMatchesTest(TestCase):
+    def test_scored_at_import(self):
+        mt.import_matches_from_data([json.dumps(match_payload('NA1_1'))], 'na')
+        scores = list(Participant.objects.values_list('impact_score', flat=True))
+        self.assertEqual(len(scores), 10)
+        self.assertNotIn(None, scores)
+        # each team averages 1.0
+        for team_id in [100, 200]:
+            team = [x for x, in Participant.objects.filter(team_id=team_id).values_list('impact_score')]
+            self.assertAlmostEqual(sum(team) / len(team), 1.0, places=3)
+
+    def test_recompute(self):
+        mt.import_matches_from_data([json.dumps(match_payload(f'NA1_{i}')) for i in range(3)], 'na')
+        top = Stats.objects.order_by('id').first()
+        Stats.objects.filter(id=top.id).update(total_damage_dealt_to_champions=10 ** 6)
+        Participant.objects.update(impact_score=None)
+        self.assertEqual(impact.recompute(weights={'damage': 1}, batch_size=2), 30)
+        self.assertGreater(Participant.objects.get(id=top.participant_id).impact_score, 4)
@@ -0,0 +1,41 @@
+"""match/tests/test_parsers.py
+"""
+import json
+
+from django.test import SimpleTestCase
+
+from match.parsers.match import MatchResponseModel
+from match.parsers.match import PrimaryPerkStyleModel, SubPerkStyleModel
+from match.parsers.timeline import TimelineResponseModel
+
+from .factories import match_payload, timeline_payload
+
+
+class FastParseTest(SimpleTestCase):
+    def test_match_equivalent(self):
+        data = match_payload('NA1_1')
+        data['info']['participants'][0]['someNewRiotField'] = 1
+        data['info']['someOtherField'] = {'a': 1}
+        raw = json.dumps(data)
+
+        fast = MatchResponseModel.parse_raw(raw)
+        reference = MatchResponseModel.parse_obj(json.loads(raw))
+        self.assertEqual(fast.dict(), reference.dict())
+        self.assertNotIn('someNewRiotField', fast.info.participants[0].dict())
+
+        for part in fast.info.participants:
+            styles = {x.description: x.dict() for x in part.perks.styles}
+            self.assertEqual(
+                part.perks.primary_style, PrimaryPerkStyleModel(**styles['primaryStyle']),
+            )
+            self.assertEqual(
+                part.perks.sub_style, SubPerkStyleModel(**styles['subStyle']),
+            )
+            # resolved once
+            self.assertIs(part.perks.primary_style, part.perks.primary_style)
+
+    def test_timeline_equivalent(self):
+        raw = json.dumps(timeline_payload('NA1_1', frames=5))
+        fast = TimelineResponseModel.parse_raw(raw)
+        reference = TimelineResponseModel.parse_obj(json.loads(raw))
+        self.assertEqual(fast.dict(), reference.dict())
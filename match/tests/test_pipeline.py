@@ -0,0 +1,56 @@
+"""match/tests/test_pipeline.py
+"""
+import json
+from unittest import mock
+
+from django.test import TestCase
+
+from match.models import Match
+from match.pipeline import MatchImportPipeline
+
+from .factories import match_payload
+
+
+def fake_fetch(match_id, region):
+    if match_id == 'NA1_404':
+        return None
+    return json.dumps(match_payload(match_id))
+
+
+@mock.patch('match.tasks.fetch_match_json', fake_fetch)
+class MatchImportPipelineTest(TestCase):
+    def test_run(self):
+        ids = [f'NA1_{i}' for i in range(1, 8)] + ['NA1_404']
+        pipeline = MatchImportPipeline(
+            'na', fetch_threads=3, parse_processes=0,
+            parse_batch_size=2, write_batch_size=3, queue_size=2,
+        )
+        matches = pipeline.run(ids)
+        self.assertEqual(len(matches), 7)
+        self.assertEqual(Match.objects.count(), 7)
+
+        report = pipeline.report()
+        self.assertEqual(report['fetch']['count'], 8)
+        self.assertEqual(report['parse']['count'], 7)
+        self.assertEqual(report['write']['count'], 7)
+
+    def test_process_pool(self):
+        pipeline = MatchImportPipeline('na', parse_processes=2, parse_inline_below=0)
+        matches = pipeline.run(['NA1_1', 'NA1_2'])
+        self.assertEqual(sorted(x._id for x in matches), ['NA1_1', 'NA1_2'])
+        pool = pipeline.get_parse_executor(2)[0]
+        # the pool is kept for the next run
+        matches = pipeline.run(['NA1_3'])
+        self.assertEqual([x._id for x in matches], ['NA1_3'])
+        self.assertIs(pipeline.get_parse_executor(1)[0], pool)
+
+    def test_no_processes_in_requests(self):
+        self.assertEqual(MatchImportPipeline('na').parse_processes, 0)
+        with mock.patch('match.pipeline.in_celery_task', return_value=True):
+            self.assertGreater(MatchImportPipeline('na').parse_processes, 0)
+
+    def test_small_runs_parse_inline(self):
+        pipeline = MatchImportPipeline('na', parse_processes=2)
+        with mock.patch('match.pipeline.get_process_pool') as get_process_pool:
+            self.assertEqual(len(pipeline.run(['NA1_1', 'NA1_2'])), 2)
+        get_process_pool.assert_not_called()
@@ -0,0 +1,44 @@
+"""match/tests/test_serializers.py
+"""
+from django.test import TestCase
+
+import json
+
+from data import registry
+from data.models import SummonerSpell, SummonerSpellImage
+from match import tasks as mt
+from match.models import Match
+from match.serializers import BasicMatchSerializer
+
+from .factories import match_payload
+
+
+class MatchAssetsTest(TestCase):
+    def setUp(self):
+        for version in ['13.1.1', '13.3.1', '13.6.1']:
+            spell = SummonerSpell.objects.create(
+                key=4, _id='SummonerFlash', version=version, language='en_US', max_rank=1, summoner_level=7,
+            )
+            SummonerSpellImage.objects.create(spell=spell, full='SummonerFlash.png', h=48, w=48, x=0, y=0)
+        registry.clear()
+        mt.import_matches_from_data([
+            json.dumps(match_payload('NA1_1', gameVersion='13.4.493.9251')),
+            json.dumps(match_payload('NA1_2', gameVersion='13.6.500.1')),
+        ], 'na')
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_assets_as_of_match_patch(self):
+        data = BasicMatchSerializer(Match.objects.order_by('_id'), many=True).data
+        images = [
+            {part['summoner_1_image'].split('/')[4] for part in match['participants']}
+            for match in data
+        ]
+        self.assertEqual(images, [{'13.3.1'}, {'13.6.1'}])
+
+    def test_related_in_one_query(self):
+        registry.get('spell', 4)
+        with self.assertNumQueries(1):
+            related = Match.objects.all().get_related()
+        self.assertEqual(len(related), 2)
@@ -0,0 +1,214 @@
+"""match/tests/test_tasks.py
+"""
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from match import tasks as mt
+from match.models import Match, Participant, Stats, Team, Ban
+from match.models import AdvancedTimeline, ParticipantFrame
+from match.models import ChampionKillEvent, GameEndEvent, VictimDamageReceived
+from player.models import Summoner, NameChange
+from player.tests.factories import SummonerFactory
+
+from .factories import MatchFactory, match_payload, timeline_payload
+
+
+class ImportMatchesFromDataTest(TestCase):
+    def test_bulk_import(self):
+        payloads = [json.dumps(match_payload(f'NA1_{i}')) for i in range(1, 6)]
+        with CaptureQueriesContext(connection) as ctx:
+            matches = mt.import_matches_from_data(payloads, 'na')
+        self.assertEqual(len(matches), 5)
+        self.assertEqual(Match.objects.count(), 5)
+        self.assertEqual(Participant.objects.count(), 50)
+        self.assertEqual(Stats.objects.count(), 50)
+        self.assertEqual(Team.objects.count(), 10)
+        self.assertEqual(Ban.objects.count(), 50)
+        self.assertEqual(Summoner.objects.count(), 10)
+        # the number of statements should not grow with the number of matches
+        self.assertLess(len(ctx.captured_queries), 25)
+
+        stats = Stats.objects.get(participant__match___id='NA1_1', participant___id=1)
+        self.assertEqual(stats.perk_0, 8005)
+        self.assertEqual(stats.perk_5, 8106)
+        self.assertEqual(stats.perk_sub_style, 8100)
+        self.assertEqual(stats.participant.summoner_name_simplified, 'summoner1')
+
+    def test_skip_existing(self):
+        mt.import_match_from_data(json.dumps(match_payload('NA1_1')), 'na')
+        payloads = [json.dumps(match_payload(f'NA1_{i}')) for i in range(1, 3)]
+        matches = mt.import_matches_from_data(payloads, 'na')
+        self.assertEqual([x._id for x in matches], ['NA1_2'])
+        self.assertEqual(Match.objects.count(), 2)
+        self.assertEqual(Participant.objects.count(), 20)
+
+    def test_refresh(self):
+        old = mt.import_match_from_data(json.dumps(match_payload('NA1_1')), 'na')
+        new = mt.import_match_from_data(
+            json.dumps(match_payload('NA1_1')), 'na', refresh=True,
+        )
+        self.assertNotEqual(old.id, new.id)
+        self.assertEqual(Match.objects.count(), 1)
+        self.assertEqual(Participant.objects.count(), 10)
+
+    def test_unparsable_and_tutorial(self):
+        no_sub_style = match_payload('NA1_3')
+        styles = no_sub_style['info']['participants'][0]['perks']['styles']
+        styles[:] = [x for x in styles if x['description'] != 'subStyle']
+        payloads = [
+            'throttled',
+            json.dumps(match_payload('NA1_1', gameMode='TUTORIAL_MODULE_1')),
+            json.dumps(match_payload('NA1_2')),
+            json.dumps(no_sub_style),
+        ]
+        matches = mt.import_matches_from_data(payloads, 'na')
+        self.assertEqual([x._id for x in matches], ['NA1_2'])
+
+
+class ImportAdvancedTimelineTest(TestCase):
+    def import_timeline(self, match_id, frames, overwrite=False):
+        match = Match.objects.filter(_id=match_id).first() or MatchFactory(
+            _id=match_id, platform_id='NA1',
+        )
+        content = json.dumps(timeline_payload(match_id, frames=frames))
+        with mock.patch('match.tasks.fetch_timeline_json', return_value=content):
+            with CaptureQueriesContext(connection) as ctx:
+                mt.import_advanced_timeline(match.id, overwrite=overwrite)
+        return len(ctx.captured_queries)
+
+    @override_settings(COLUMNAR_PARTICIPANT_FRAMES=False)
+    def test_bounded_statements(self):
+        short = self.import_timeline('NA1_1', frames=5)
+        long = self.import_timeline('NA1_2', frames=40)
+        self.assertEqual(short, long)
+
+        timeline = AdvancedTimeline.objects.get(match___id='NA1_2')
+        self.assertEqual(timeline.frames.count(), 40)
+        self.assertEqual(
+            ParticipantFrame.objects.filter(frame__timeline=timeline).count(), 400,
+        )
+        kills = ChampionKillEvent.objects.filter(frame__timeline=timeline)
+        self.assertEqual(kills.count(), 40)
+        self.assertEqual(
+            VictimDamageReceived.objects.filter(championkillevent__in=kills).count(), 120,
+        )
+        self.assertEqual(GameEndEvent.objects.filter(frame__timeline=timeline).count(), 1)
+
+    def test_overwrite(self):
+        self.import_timeline('NA1_1', frames=5)
+        old = AdvancedTimeline.objects.get(match___id='NA1_1')
+        self.import_timeline('NA1_1', frames=5)
+        self.assertEqual(AdvancedTimeline.objects.get(match___id='NA1_1').id, old.id)
+        self.import_timeline('NA1_1', frames=6, overwrite=True)
+        self.assertEqual(AdvancedTimeline.objects.get(match___id='NA1_1').frames.count(), 6)
+
+
+class WatermarkTest(TestCase):
+    def setUp(self):
+        self.summoner = SummonerFactory(puuid='puuid-1')
+        self.history = [f'NA1_{i}' for i in range(30, 0, -1)]
+        self.list_calls = []
+        # list requests from this start on fail, ie: riot returned a 429
+        self.fail_from = None
+        patches = [
+            mock.patch('match.tasks.list_match_ids', self.fake_list),
+            mock.patch('match.tasks.fetch_match_json', self.fake_fetch),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fake_list(self, puuid, region, start, count, queue=None):
+        self.list_calls.append((start, count))
+        if self.fail_from is not None and start >= self.fail_from:
+            return None
+        return self.history[start:start + count]
+
+    def fake_fetch(self, match_id, region):
+        n = int(match_id.split('_')[1])
+        return json.dumps(match_payload(match_id, game_creation=1_600_000_000_000 + n * 1000))
+
+    def play(self, n):
+        start = len(self.history)
+        self.history = [f'NA1_{i}' for i in range(start + n, start, -1)] + self.history
+
+    def test_refresh_stops_at_watermark(self):
+        mt.backfill_matches('puuid-1', 'na', count=10, page_size=5)
+        self.summoner.refresh_from_db()
+        self.assertEqual(self.summoner.watermark_match_id, 'NA1_30')
+        self.assertEqual(self.summoner.backfill_anchor, 'NA1_21')
+
+        self.play(3)
+        self.list_calls = []
+        self.assertEqual(mt.refresh_recent_matches('puuid-1', 'na'), 3)
+        self.assertEqual(len(self.list_calls), 1)
+        self.summoner.refresh_from_db()
+        self.assertEqual(self.summoner.watermark_match_id, 'NA1_33')
+        self.assertEqual(self.summoner.backfill_index, 13)
+
+        # nothing new
+        self.assertEqual(mt.refresh_recent_matches('puuid-1', 'na'), 0)
+
+    def test_backfill_resumes(self):
+        mt.backfill_matches('puuid-1', 'na', count=10)
+        self.play(2)
+        mt.refresh_recent_matches('puuid-1', 'na')
+        # a game the refresh didn't see still shifts the list
+        self.play(1)
+        mt.backfill_matches('puuid-1', 'na', count=10)
+        self.assertEqual(Match.objects.count(), 22)
+        self.assertFalse(Match.objects.filter(_id='NA1_33').exists())
+
+        mt.backfill_matches('puuid-1', 'na', count=100)
+        self.summoner.refresh_from_db()
+        self.assertTrue(self.summoner.backfill_complete)
+        self.assertEqual(Match.objects.count(), 32)
+
+    def test_failed_list_is_not_the_end(self):
+        self.fail_from = 10
+        mt.backfill_matches('puuid-1', 'na', count=20, page_size=5)
+        self.summoner.refresh_from_db()
+        self.assertFalse(self.summoner.backfill_complete)
+        self.assertEqual(self.summoner.backfill_index, 10)
+
+        self.fail_from = None
+        mt.backfill_matches('puuid-1', 'na', count=100)
+        self.summoner.refresh_from_db()
+        self.assertTrue(self.summoner.backfill_complete)
+        self.assertEqual(Match.objects.count(), 30)
+
+    def test_refresh_records_gap(self):
+        mt.backfill_matches('puuid-1', 'na', count=5, page_size=5)
+        self.play(12)
+        self.assertEqual(mt.refresh_recent_matches('puuid-1', 'na', page_size=5, max_pages=2), 10)
+        self.summoner.refresh_from_db()
+        self.assertEqual(self.summoner.watermark_match_id, 'NA1_42')
+        self.assertEqual((self.summoner.backfill_index, self.summoner.backfill_anchor), (10, 'NA1_33'))
+
+        mt.backfill_matches('puuid-1', 'na', count=100)
+        self.assertEqual(Match.objects.count(), 42)
+
+
+class NameChangeTest(TestCase):
+    def test_recorded_at_import(self):
+        summoner = SummonerFactory(puuid='puuid-1', name='Current Name')
+        with self.assertNumQueries(3):
+            mt.import_summoner_from_participant(
+                mt.MatchResponseModel.parse_raw(json.dumps(match_payload('NA1_1'))).info.participants,
+                'na',
+            )
+        self.assertEqual(
+            list(NameChange.objects.values_list('summoner_id', 'old_name')),
+            [(summoner.id, 'Summoner 1')],
+        )
+        # importing the same names again doesn't duplicate them
+        mt.import_matches_from_data([json.dumps(match_payload('NA1_2'))], 'na')
+        self.assertEqual(NameChange.objects.count(), 1)
+
+        Summoner.objects.filter(puuid='puuid-2').update(name='Another Name')
+        mt.handle_name_changes(hours=24 * 365 * 100)
+        self.assertEqual(NameChange.objects.count(), 2)
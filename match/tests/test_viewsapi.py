@@ -0,0 +1,60 @@
+"""match/tests/test_viewsapi.py
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from unittest import mock
+import json
+
+from match import tasks as mt
+from match.models import Match, SummonerMatch
+from match.viewsapi import MatchBySummoner, _count_played_together
+from player.models import PlayedWith, Summoner
+
+from .factories import match_payload
+
+
+class MatchBySummonerTest(TestCase):
+    def setUp(self):
+        payloads = [
+            json.dumps(match_payload(f'NA1_{i}', game_creation=1_600_000_000_000 + (i // 2)))
+            for i in range(1, 26)
+        ]
+        mt.import_matches_from_data(payloads, 'na')
+        self.summoner = Summoner.objects.get(puuid='puuid-1')
+        self.url = reverse('matches-by-summoner', kwargs={'region': 'na', 'name': 'summoner1'})
+
+    def test_keyset_pages(self):
+        self.assertEqual(SummonerMatch.objects.filter(puuid='puuid-1').count(), 25)
+        seen = []
+        url = self.url + '?limit=10'
+        with mock.patch.object(MatchBySummoner, 'get_summoner', return_value=self.summoner):
+            while url:
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+                seen.extend(x['_id'] for x in response.data['results'])
+                url = response.data['next']
+
+        expected = [
+            x._id for x in Match.objects.order_by('-game_creation', '-id')
+        ]
+        self.assertEqual(seen, expected)
+
+
+class PlayedTogetherTest(TestCase):
+    def setUp(self):
+        payloads = [json.dumps(match_payload(f'NA1_{i}')) for i in range(1, 4)]
+        mt.import_matches_from_data(payloads, 'na')
+
+    def test_count_by_region(self):
+        for names in [['Summoner 1', 'Summoner 2'], ['Summoner 1', 'Summoner 2', 'Summoner 3']]:
+            self.assertEqual(_count_played_together(names, 'na'), 3)
+            self.assertEqual(_count_played_together(names, 'euw'), 0)
+
+    def test_missing_index_rows_fall_back_to_matches(self):
+        PlayedWith.objects.all().delete()
+        self.assertEqual(_count_played_together(['Summoner 1', 'Summoner 2'], 'na'), 3)
@@ -1,6 +1,6 @@
 """match/viewsapi.py
 """
-from django.db.models import Q, Exists, OuterRef
+from django.db.models import Q, Exists, OuterRef, Sum
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework.generics import ListAPIView, QuerySet, RetrieveAPIView
@@ -8,33 +8,44 @@ from rest_framework.generics import ListAPIView, QuerySet, RetrieveAPIView
 from lolsite.tasks import get_riot_api
 from lolsite.helpers import query_debugger
 from data import constants
+from data import registry
 from match import tasks as mt
 
-from .models import Match, AdvancedTimeline
+from .models import Match, AdvancedTimeline, SummonerMatch
 from .models import Participant, sort_positions, Ban
 from .serializers import FullMatchSerializer, BasicMatchSerializer
 from .serializers import MatchSerializer, AdvancedTimelineSerializer, BanSerializer
 
-from player.models import Summoner
+from player.models import Summoner, PlayedWith
 from django.shortcuts import get_object_or_404
-from lolsite.helpers import CustomLimitOffsetPagination
+from lolsite.helpers import KeysetPagination
+from lolsite.singleflight import get_singleflight
+from lolsite import queues
 
 from player import tasks as pt
+from player import ranks
 from player.models import simplify
 from player.serializers import RankPositionSerializer
 
-from data.models import Champion
-from data.serializers import BasicChampionWithImageSerializer
 
 import logging
+import re
 
 logger = logging.getLogger(__name__)
+# don't enqueue the same background import more than once in this many seconds
+BACKGROUND_IMPORT_TTL = 60
 
 
 class MatchBySummoner(ListAPIView):
+    """A summoner's matches, newest first.
+
+    Pages through the SummonerMatch index with a (game_creation, match_id)
+    cursor; follow the `next` link for the following page.
+
+    """
     serializer_class = BasicMatchSerializer
-    queryset = Match.objects.filter(is_fully_imported=True)
-    pagination_class = CustomLimitOffsetPagination
+    queryset = SummonerMatch.objects.all()
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -47,10 +58,11 @@ class MatchBySummoner(ListAPIView):
         sync_import = self.request.query_params.get('sync_import', False)
         start: int = self.paginator.get_offset(self.request)
         limit: int = self.paginator.get_limit(self.request)
+        cursor = self.paginator.get_cursor(self.request)
 
         summoner = self.get_summoner(name, region)
 
-        qs = qs.filter(participants__puuid=summoner.puuid)
+        qs = qs.filter(puuid=summoner.puuid)
         if isinstance(queue, int):
             qs = qs.filter(queue_id=queue)
 
@@ -60,14 +72,21 @@ class MatchBySummoner(ListAPIView):
         ]
         if played_with:
             sync_import = False
-            qs = self.get_played_with(played_with, region, qs)
+            qs = self.get_played_with(played_with, region, qs, summoner, queue=queue)
 
         if sync_import in constants.TRUTHY:
-            mt.import_recent_matches(
-                start, start + limit, summoner.puuid, region, queue=queue,
-            )
-            mt.bulk_import.s(summoner.puuid, count=40, offset=10).apply_async(countdown=5)
-        qs = qs.order_by('-game_creation')
+            # pages after a cursor are older, the backfill below fills them in
+            if cursor is None and start == 0 and queue is None:
+                mt.refresh_recent_matches(summoner.puuid, region)
+            elif cursor is None:
+                mt.import_recent_matches(
+                    start, start + limit, summoner.puuid, region, queue=queue,
+                )
+            if get_singleflight().claim(f'bulk_import:{summoner.puuid}', BACKGROUND_IMPORT_TTL):
+                mt.bulk_import.s(summoner.puuid, count=40, offset=10).apply_async(
+                    countdown=5, priority=queues.PRIORITY_BACKGROUND,
+                )
+        qs = qs.order_by('-game_creation', '-match_id')
         return qs
 
     @staticmethod
@@ -83,12 +102,21 @@ class MatchBySummoner(ListAPIView):
             summoner = get_object_or_404(Summoner, region=region, simple_name=name)
         else:
             # update in the background if we already have the user imported
-            pt.import_summoner.s(region, name=name).apply_async(countdown=1)
+            if get_singleflight().claim(pt.summoner_key(region, name=name), BACKGROUND_IMPORT_TTL):
+                pt.import_summoner.s(region, name=name).apply_async(
+                    countdown=1, priority=queues.PRIORITY_USER,
+                )
             summoner = summoner_query[0]
         return summoner
 
     @staticmethod
-    def get_played_with(names: list[str], region: str, qs: QuerySet[Summoner]):
+    def get_played_with(
+        names: list[str],
+        region: str,
+        qs: QuerySet[SummonerMatch],
+        summoner: Summoner,
+        queue: int | None = None,
+    ):
         played_with = [
             pt.simplify(name)
             for name in names if len(name.strip()) > 0
@@ -100,9 +128,17 @@ class MatchBySummoner(ListAPIView):
                 summoner_ids.append(sid)
         with_summoners = Summoner.objects.filter(id__in=summoner_ids)
         for x in with_summoners:
-            qs = qs.filter(Exists(Participant.objects.filter(puuid=x.puuid, match_id=OuterRef('id'))))
+            qs = qs.filter(Exists(SummonerMatch.objects.filter(puuid=x.puuid, match_id=OuterRef('match_id'))))
         return qs
 
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        matches = Match.objects.filter(
+            id__in=[x.match_id for x in page],
+        ).order_by('-game_creation', '-id')
+        serializer = self.get_serializer(matches, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class AdvancedTimelineView(RetrieveAPIView):
     serializer_class = AdvancedTimelineSerializer
@@ -214,27 +250,20 @@ def get_spectate(request, format=None):
         else:
             mt.import_spectate_from_data(spectate_data, region)
             summoners = mt.import_summoners_from_spectate(spectate_data, region)
-
-            for x in summoners.values():
-                pt.import_positions(x, threshold_days=3)
+            summoner_list = list(Summoner.objects.filter(id__in=summoners.values()))
+            positions = ranks.get_positions(summoner_list, threshold_days=3)
 
             for part in spectate_data["participants"]:
-                positions = None
-                query = Summoner.objects.filter(region=region, _id=part["summonerId"])
-                if summoner := query.first():
-                    checkpoint = summoner.get_newest_rank_checkpoint()
-                    positions = RankPositionSerializer(
-                        checkpoint.positions.all(), many=True
+                part_positions = None
+                if summoner_id := summoners.get(part["summonerId"]):
+                    part_positions = RankPositionSerializer(
+                        positions.get(summoner_id, []), many=True
                     ).data
-                    positions = sort_positions(positions)
-                part["positions"] = positions
+                    part_positions = sort_positions(part_positions)
+                part["positions"] = part_positions
 
-                query = Champion.objects.filter(key=part["championId"]).order_by(
-                    "-version"
-                )
-                if query.exists():
-                    champion = query.first()
-                    part['champion'] = BasicChampionWithImageSerializer(champion).data
+                if champion := registry.get("champion", part["championId"]):
+                    part['champion'] = registry.serialize_champion(champion)
 
             data = {"data": spectate_data}
 
@@ -318,10 +347,11 @@ def get_latest_unlabeled_match(request, format=None):
     return Response(data)
 
 
-def _get_played_together(summoner_names):
+def _get_played_together(summoner_names, region):
     simplified_names = [simplify(x) for x in summoner_names]
     if simplified_names:
-        qs = Match.objects.all()
+        # ie: NA1 for na, see Match.url
+        qs = Match.objects.filter(platform_id__iregex=rf'^{re.escape(region)}\d?$')
         for name in simplified_names:
             qs = qs.filter(participants__summoner_name_simplified=name)
     else:
@@ -329,6 +359,26 @@ def _get_played_together(summoner_names):
     return qs
 
 
+def _count_played_together(summoner_names, region):
+    """Count the games played together, from the PlayedWith index when
+    there are only two summoners.
+    """
+    simplified_names = list({simplify(x) for x in summoner_names if x.strip()})
+    if len(simplified_names) == 2:
+        summoners = list(
+            Summoner.objects.filter(simple_name__in=simplified_names, region=region.lower())
+        )
+        if len(summoners) == 2:
+            count = PlayedWith.objects.filter(
+                summoner_puuid=summoners[0].puuid,
+                puuid=summoners[1].puuid,
+            ).aggregate(count=Sum('games'))['count']
+            # no row is not proof they never played together, count the matches
+            if count:
+                return count
+    return _get_played_together(simplified_names, region).count()
+
+
 @api_view(['GET'])
 def get_played_together(request, format=None):
     """Get a count of games played together
@@ -344,7 +394,7 @@ def get_played_together(request, format=None):
         {count: int}
 
     """
-    summoner_names = request.GET.get('summoner_names')
-    qs = _get_played_together(summoner_names)
-    data = {'count': qs.count()}
+    summoner_names = request.GET.get('summoner_names', '').split(',')
+    region = request.GET.get('region', '')
+    data = {'count': _count_played_together(summoner_names, region)}
     return Response(data)
@@ -0,0 +1,257 @@
+"""player/analytics.py
+
+In memory stats for one summoner.
+
+All of a summoner's games are pulled with one narrow query into a column
+per stat (a `Columns`), which is cached per puuid and
+`Summoner.games_version`.  Importing one of their matches bumps the version,
+so every process misses its cached copy even with a per-process cache.  Any grouping (champion, role, queue, patch,
+weekday, ...) and the derived metrics are then computed with numpy instead
+of a GROUP BY over Stats, Participant and Match for every combination.
+
+    columns = analytics.get_columns(puuid)
+    columns.group(["team_position", "weekday"], queue_in=[420])
+
+Metric names match get_summoner_champions_overview.
+
+"""
+from django.core.cache import cache
+from django.db.models import F
+
+from match.models import Stats
+from .models import Summoner
+from .rollups import MIN_GAME_TIME
+
+import logging
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_CACHE_SECONDS = 60 * 60 * 24
+
+# column name -> path from Stats
+COLUMNS = {
+    "champion_id": F("participant__champion_id"),
+    "team_position": F("participant__team_position"),
+    "queue_id": F("participant__match__queue_id"),
+    "major": F("participant__match__major"),
+    "minor": F("participant__match__minor"),
+    "game_creation": F("participant__match__game_creation"),
+    "duration": F("participant__match__game_duration"),
+    "win": F("win"),
+    "kills": F("kills"),
+    "deaths": F("deaths"),
+    "assists": F("assists"),
+    "damage_dealt_to_turrets": F("damage_dealt_to_turrets"),
+    "damage_dealt_to_objectives": F("damage_dealt_to_objectives"),
+    "total_damage_dealt_to_champions": F("total_damage_dealt_to_champions"),
+    "total_damage_taken": F("total_damage_taken"),
+    "gold_earned": F("gold_earned"),
+    "vision_score": F("vision_score"),
+    "cs": F("total_minions_killed") + F("neutral_minions_killed"),
+}
+
+# sums, named like the champion overview
+SUMS = {
+    "kills_sum": "kills",
+    "deaths_sum": "deaths",
+    "assists_sum": "assists",
+    "damage_dealt_to_turrets_sum": "damage_dealt_to_turrets",
+    "damage_dealt_to_objectives_sum": "damage_dealt_to_objectives",
+    "total_damage_dealt_to_champions_sum": "total_damage_dealt_to_champions",
+    "total_damage_taken_sum": "total_damage_taken",
+    "gold_earned_sum": "gold_earned",
+    "cs_sum": "cs",
+    "vision_score_sum": "vision_score",
+}
+
+# metric -> the sum divided by minutes played
+PER_MINUTE = {
+    "cspm": "cs_sum",
+    "vspm": "vision_score_sum",
+    "dpm": "total_damage_dealt_to_champions_sum",
+    "objective_dpm": "damage_dealt_to_objectives_sum",
+    "turret_dpm": "damage_dealt_to_turrets_sum",
+    "dtpm": "total_damage_taken_sum",
+    "gpm": "gold_earned_sum",
+}
+
+# columns which can be grouped on
+GROUPS = ["champion_id", "team_position", "queue_id", "major", "patch", "weekday"]
+
+METRICS = (
+    ["count", "wins", "losses", "minutes", "kda", "dtpd"]
+    + list(SUMS)
+    + list(PER_MINUTE)
+)
+
+
+def get_cache_key(puuid: str, version: int):
+    return f"analytics/{puuid}/{version}"
+
+
+def get_games_version(puuid: str):
+    return Summoner.objects.filter(puuid=puuid).values_list("games_version", flat=True).first() or 0
+
+
+def load_columns(puuid: str):
+    """Read one summoner's games into a Columns with one query."""
+    rows = list(
+        Stats.objects.filter(
+            participant__puuid=puuid,
+            participant__match__game_duration__gt=MIN_GAME_TIME,
+        )
+        .annotate(**{f"column_{name}": expression for name, expression in COLUMNS.items()})
+        .values_list(*[f"column_{name}" for name in COLUMNS])
+    )
+    return Columns.from_rows(rows)
+
+
+def get_columns(puuid: str):
+    """Get a summoner's Columns from the cache, loading them on a miss."""
+    key = get_cache_key(puuid, get_games_version(puuid))
+    columns = cache.get(key)
+    if columns is None:
+        columns = load_columns(puuid)
+        cache.set(key, columns, ANALYTICS_CACHE_SECONDS)
+    return columns
+
+
+def invalidate(puuids: list[str]):
+    """Bump the games_version of summoners with newly imported games, which
+    stops every process from reading their cached columns.
+    """
+    puuids = [x for x in puuids if x]
+    if puuids:
+        Summoner.objects.filter(puuid__in=puuids).update(games_version=F("games_version") + 1)
+
+
+class Columns:
+    """A summoner's games, one numpy array per name in COLUMNS.
+
+    Derived columns:
+
+    patch
+        major * 1000 + minor
+    weekday
+        of game_creation in UTC, 0 is monday
+    minutes
+        game duration in minutes
+
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        self.columns = columns
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple]):
+        columns = {}
+        values = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+        for name, column in zip(COLUMNS, values):
+            if name == "team_position":
+                columns[name] = np.array([x or "" for x in column], dtype=str)
+            elif name == "win":
+                columns[name] = np.array(column, dtype=bool)
+            else:
+                # None, ie: a match without a version, becomes 0
+                columns[name] = np.nan_to_num(np.array(column, dtype=np.float64)).astype(np.int64)
+        return cls(columns)
+
+    def __len__(self):
+        return len(self.columns["win"])
+
+    def __getitem__(self, name: str):
+        if name in self.columns:
+            return self.columns[name]
+        if name == "patch":
+            return self["major"] * 1000 + self["minor"]
+        if name == "weekday":
+            # 1970-01-01 was a thursday
+            return (self["game_creation"] // (1000 * 60 * 60 * 24) + 3) % 7
+        if name == "minutes":
+            return self["duration"] / 1000 / 60
+        raise KeyError(name)
+
+    def get_mask(
+        self,
+        queue_in=None,
+        champion_in=None,
+        major_version=None,
+        minor_version=None,
+        start_timestamp=None,
+        end_timestamp=None,
+    ):
+        mask = np.ones(len(self), dtype=bool)
+        if queue_in:
+            mask &= np.isin(self["queue_id"], queue_in)
+        if champion_in is not None:
+            mask &= np.isin(self["champion_id"], champion_in)
+        if major_version is not None:
+            mask &= self["major"] == int(major_version)
+        if minor_version is not None:
+            mask &= self["minor"] == int(minor_version)
+        if start_timestamp is not None:
+            mask &= self["game_creation"] > start_timestamp
+        if end_timestamp is not None:
+            mask &= self["game_creation"] < end_timestamp
+        return mask
+
+    def group(self, by: list[str], metrics: list[str] | None = None, **filters):
+        """Aggregate the games by one or more columns.
+
+        Parameters
+        ----------
+        by : list[str]
+            names of columns, ie: ["champion_id"] or ["team_position", "weekday"]
+        metrics : list[str]
+            names in METRICS, defaults to all of them
+        filters
+            see `get_mask`
+
+        Returns
+        -------
+        list[dict]
+            one dict per group, ordered by the group columns
+
+        """
+        metrics = METRICS if not metrics else metrics
+        mask = self.get_mask(**filters)
+        keys = [self[name][mask] for name in by]
+        if not mask.any():
+            return []
+        group_keys, index = zip(*[np.unique(key, return_inverse=True) for key in keys])
+        # combine the per column codes into one group code
+        code = np.zeros(mask.sum(), dtype=np.int64)
+        for key, column_index in zip(group_keys, index):
+            code = code * len(key) + column_index.reshape(-1)
+        codes, first, inverse = np.unique(code, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        size = len(codes)
+
+        def total(values):
+            return np.bincount(inverse, weights=values[mask], minlength=size)
+
+        sums = {"count": np.bincount(inverse, minlength=size).astype(np.float64)}
+        sums["wins"] = total(self["win"].astype(np.float64))
+        sums["losses"] = sums["count"] - sums["wins"]
+        sums["minutes"] = total(self["minutes"])
+        for name, column in SUMS.items():
+            sums[name] = total(self[column].astype(np.float64))
+        deaths = np.where(sums["deaths_sum"] == 0, 1, sums["deaths_sum"])
+        sums["kda"] = (sums["kills_sum"] + sums["assists_sum"]) / deaths
+        sums["dtpd"] = sums["total_damage_taken_sum"] / deaths
+        minutes = np.where(sums["minutes"] == 0, 1, sums["minutes"])
+        for name, column in PER_MINUTE.items():
+            sums[name] = sums[column] / minutes
+
+        out = []
+        for i in range(size):
+            # read the group's values back from its first game
+            row = {name: key[first[i]].item() for name, key in zip(by, keys)}
+            for name in metrics:
+                value = sums[name][i].item()
+                row[name] = int(value) if name in ("count", "wins", "losses") else value
+            out.append(row)
+        return out
@@ -2,7 +2,7 @@
 """
 from data import constants as dc
 from data.models import Champion
-from player.models import Summoner, SummonerLink
+from player.models import Summoner, SummonerLink, ChampionRollup
 from match.models import Stats
 
 from django.db.models import Sum, Count, F, FloatField
@@ -13,6 +13,50 @@ from django.db.models import IntegerField, Q
 from django.utils.dateparse import parse_datetime
 
 
+def get_stats_sums():
+    return {
+        "count": Count("champion_id"),
+        "kills_sum": Sum("kills"),
+        "deaths_sum": Sum("deaths"),
+        "assists_sum": Sum("assists"),
+        "damage_dealt_to_turrets_sum": Sum("damage_dealt_to_turrets"),
+        "damage_dealt_to_objectives_sum": Sum("damage_dealt_to_objectives"),
+        "total_damage_dealt_to_champions_sum": Sum("total_damage_dealt_to_champions"),
+        "total_damage_taken_sum": Sum("total_damage_taken"),
+        "gold_earned_sum": Sum("gold_earned"),
+        "wins": Sum(Case(
+            When(win=True, then=Value(1)), default=Value(0), output_field=IntegerField()
+        )),
+        "losses": Sum(Case(
+            When(win=False, then=Value(1)), default=Value(0), output_field=IntegerField()
+        )),
+        "duration": Sum("participant__match__game_duration"),
+        "cs": Sum(
+            F("total_minions_killed") + F("neutral_minions_killed"), output_field=FloatField()
+        ),
+        "vision_score": Sum("vision_score"),
+    }
+
+
+def get_rollup_sums():
+    return {
+        "count": Sum("games"),
+        "kills_sum": Sum("kills"),
+        "deaths_sum": Sum("deaths"),
+        "assists_sum": Sum("assists"),
+        "damage_dealt_to_turrets_sum": Sum("damage_dealt_to_turrets"),
+        "damage_dealt_to_objectives_sum": Sum("damage_dealt_to_objectives"),
+        "total_damage_dealt_to_champions_sum": Sum("total_damage_dealt_to_champions"),
+        "total_damage_taken_sum": Sum("total_damage_taken"),
+        "gold_earned_sum": Sum("gold_earned"),
+        "wins": Sum("win_count"),
+        "losses": Sum("loss_count"),
+        "duration": Sum("duration"),
+        "cs": Sum("cs", output_field=FloatField()),
+        "vision_score": Sum("vision_score"),
+    }
+
+
 def get_summoner_champions_overview(
     puuid: str=None,
     major_version=None,
@@ -42,24 +86,34 @@ def get_summoner_champions_overview(
     Returns
     -------
     QuerySet
+        read from ChampionRollup unless a datetime range is given
 
     """
     all_fields = True if not fields else False
-    min_game_time = 60 * 5 * 1000
-    query = Stats.objects.select_related(
-        'participant', 'participant__match'
-    ).filter(participant__match__game_duration__gt=min_game_time)
+    use_rollup = start_datetime is None and end_datetime is None
+    if use_rollup:
+        # ChampionRollup is keyed by patch and queue so it can answer
+        # everything but a datetime range.
+        query = ChampionRollup.objects.all()
+        participant = match = ""
+    else:
+        min_game_time = 60 * 5 * 1000
+        query = Stats.objects.select_related(
+            'participant', 'participant__match'
+        ).filter(participant__match__game_duration__gt=min_game_time)
+        participant = "participant__"
+        match = "participant__match__"
 
     if puuid is not None:
-        query = query.filter(participant__puuid=puuid)
+        query = query.filter(**{f"{participant}puuid": puuid})
     if champion_in is not None:
-        query = query.filter(participant__champion_id__in=champion_in)
+        query = query.filter(**{f"{participant}champion_id__in": champion_in})
     if major_version is not None:
-        query = query.filter(participant__match__major=major_version)
+        query = query.filter(**{f"{match}major": major_version})
     if minor_version is not None:
-        query = query.filter(participant__match__minor=minor_version)
+        query = query.filter(**{f"{match}minor": minor_version})
     if queue_in:
-        query = query.filter(participant__match__queue_id__in=queue_in)
+        query = query.filter(**{f"{match}queue_id__in": queue_in})
     if start_datetime is not None:
         start_dt = parse_datetime(start_datetime)
         start_timestamp = start_dt.timestamp() * 1000
@@ -72,65 +126,53 @@ def get_summoner_champions_overview(
         season = int(season)
         season_start = dc.SEASON_PATCHES[season]["season"]["start"]
         season_end = dc.SEASON_PATCHES[season]["season"]["end"]
-        q = Q(
-            participant__match__major=season_start[0],
-            participant__match__minor__gte=season_start[1],
-        )
-        q |= Q(
-            participant__match__major=season_end[0],
-            participant__match__minor__lte=season_end[1],
-        )
+        q = Q(**{
+            f"{match}major": season_start[0],
+            f"{match}minor__gte": season_start[1],
+        })
+        q |= Q(**{
+            f"{match}major": season_end[0],
+            f"{match}minor__lte": season_end[1],
+        })
         query = query.filter(q)
 
-    query = query.annotate(
-        champion_id=F("participant__champion_id"),
-        win_true=Case(
-            When(win=True, then=Value(1)), default=Value(0), output_field=IntegerField()
-        ),
-        loss_true=Case(
-            When(win=False, then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField(),
-        ),
-    )
+    if use_rollup:
+        sums = get_rollup_sums()
+    else:
+        sums = get_stats_sums()
+        query = query.annotate(champion_id=F("participant__champion_id"))
     query = query.values("champion_id")
-    query = query.annotate(count=Count("champion_id"))
+    query = query.annotate(count=sums["count"])
 
     annotation_kwargs = {}
     if all_fields or any(field in fields for field in ["kda", "kills_sum"]):
-        annotation_kwargs["kills_sum"] = Sum("kills")
+        annotation_kwargs["kills_sum"] = sums["kills_sum"]
     if all_fields or any(field in fields for field in ["kda", "deaths_sum", "dtpd"]):
-        annotation_kwargs["deaths_sum"] = Sum("deaths")
+        annotation_kwargs["deaths_sum"] = sums["deaths_sum"]
     if all_fields or any(field in fields for field in ["kda", "assists_sum"]):
-        annotation_kwargs["assists_sum"] = Sum("assists")
+        annotation_kwargs["assists_sum"] = sums["assists_sum"]
     if all_fields or any(
         field in fields for field in ["damage_dealt_to_turrets_sum", "turret_dpm"]
     ):
-        annotation_kwargs["damage_dealt_to_turrets_sum"] = Sum(
-            "damage_dealt_to_turrets"
-        )
+        annotation_kwargs["damage_dealt_to_turrets_sum"] = sums["damage_dealt_to_turrets_sum"]
     if all_fields or any(
         field in fields for field in ["damage_dealt_to_objectives_sum", "objective_dpm"]
     ):
-        annotation_kwargs["damage_dealt_to_objectives_sum"] = Sum(
-            "damage_dealt_to_objectives"
-        )
+        annotation_kwargs["damage_dealt_to_objectives_sum"] = sums["damage_dealt_to_objectives_sum"]
     if all_fields or any(
         field in fields for field in ["total_damage_dealt_to_champions_sum", "dpm"]
     ):
-        annotation_kwargs["total_damage_dealt_to_champions_sum"] = Sum(
-            "total_damage_dealt_to_champions"
-        )
+        annotation_kwargs["total_damage_dealt_to_champions_sum"] = sums["total_damage_dealt_to_champions_sum"]
     if all_fields or any(
         field in fields for field in ["total_damage_taken_sum", "dtpm", "dtpd"]
     ):
-        annotation_kwargs["total_damage_taken_sum"] = Sum("total_damage_taken")
+        annotation_kwargs["total_damage_taken_sum"] = sums["total_damage_taken_sum"]
     if all_fields or any(field in fields for field in ["gold_earned_sum", "gpm"]):
-        annotation_kwargs["gold_earned_sum"] = Sum("gold_earned")
+        annotation_kwargs["gold_earned_sum"] = sums["gold_earned_sum"]
     if all_fields or any(field in fields for field in ["wins"]):
-        annotation_kwargs["wins"] = Sum("win_true")
+        annotation_kwargs["wins"] = sums["wins"]
     if all_fields or any(field in fields for field in ["losses"]):
-        annotation_kwargs["losses"] = Sum("loss_true")
+        annotation_kwargs["losses"] = sums["losses"]
     if all_fields or any(
         field in fields
         for field in [
@@ -145,7 +187,7 @@ def get_summoner_champions_overview(
         ]
     ):
         annotation_kwargs["minutes"] = ExpressionWrapper(
-            Sum("participant__match__game_duration") / 60 / 1000, output_field=FloatField()
+            sums["duration"] / 60 / 1000, output_field=FloatField()
         )
     if annotation_kwargs:
         query = query.annotate(**annotation_kwargs)
@@ -161,13 +203,12 @@ def get_summoner_champions_overview(
         )
     if all_fields or "cspm" in fields:
         annotation_kwargs["cspm"] = ExpressionWrapper(
-            (Sum(F("total_minions_killed") + F("neutral_minions_killed"), output_field=FloatField()))
-            / F("minutes"),
+            sums["cs"] / F("minutes"),
             output_field=FloatField(),
         )
     if all_fields or "vspm" in fields:
         annotation_kwargs["vspm"] = ExpressionWrapper(
-            Sum("vision_score") / F("minutes"), output_field=FloatField()
+            sums["vision_score"] / F("minutes"), output_field=FloatField()
         )
     if all_fields or "dpm" in fields:
         annotation_kwargs["dpm"] = ExpressionWrapper(
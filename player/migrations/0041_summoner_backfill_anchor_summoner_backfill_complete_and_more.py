@@ -0,0 +1,38 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0040_alter_summoner_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summoner',
+            name='backfill_anchor',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='summoner',
+            name='backfill_complete',
+            field=models.BooleanField(blank=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='summoner',
+            name='backfill_index',
+            field=models.IntegerField(blank=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='summoner',
+            name='watermark_game_creation',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='summoner',
+            name='watermark_match_id',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0041_summoner_backfill_anchor_summoner_backfill_complete_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChampionRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puuid', models.CharField(max_length=128)),
+                ('champion_id', models.IntegerField()),
+                ('queue_id', models.IntegerField()),
+                ('major', models.IntegerField()),
+                ('minor', models.IntegerField()),
+                ('games', models.IntegerField(default=0)),
+                ('win_count', models.IntegerField(default=0)),
+                ('loss_count', models.IntegerField(default=0)),
+                ('kills', models.BigIntegerField(default=0)),
+                ('deaths', models.BigIntegerField(default=0)),
+                ('assists', models.BigIntegerField(default=0)),
+                ('damage_dealt_to_turrets', models.BigIntegerField(default=0)),
+                ('damage_dealt_to_objectives', models.BigIntegerField(default=0)),
+                ('total_damage_dealt_to_champions', models.BigIntegerField(default=0)),
+                ('total_damage_taken', models.BigIntegerField(default=0)),
+                ('gold_earned', models.BigIntegerField(default=0)),
+                ('vision_score', models.BigIntegerField(default=0)),
+                ('cs', models.BigIntegerField(default=0)),
+                ('duration', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('puuid', 'champion_id', 'queue_id', 'major', 'minor')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0042_championrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayedWith',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summoner_puuid', models.CharField(max_length=128)),
+                ('puuid', models.CharField(max_length=128)),
+                ('same_team', models.BooleanField()),
+                ('queue_id', models.IntegerField()),
+                ('season', models.IntegerField()),
+                ('games', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('last_played', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('summoner_puuid', 'puuid', 'same_team', 'queue_id', 'season')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0043_playedwith'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summoner',
+            name='meta',
+            field=models.JSONField(blank=True, default=None, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:38
+
+from django.db import migrations
+from django.db.models import Min
+
+
+def forward_remove_duplicates(apps, schema_editor):
+    NameChange = apps.get_model('player', 'NameChange')
+    keep = (
+        NameChange.objects.values('summoner_id', 'old_name')
+        .annotate(keep=Min('id'))
+        .values('keep')
+    )
+    NameChange.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0044_summoner_meta'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward_remove_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='namechange',
+            unique_together={('summoner', 'old_name')},
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.1.6 on 2026-10-18 20:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0045_alter_namechange_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyRankRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue_type', models.CharField(blank=True, default='', max_length=32)),
+                ('period_start', models.DateField()),
+                ('start_date', models.DateTimeField()),
+                ('peak_rank_integer', models.IntegerField()),
+                ('trough_rank_integer', models.IntegerField()),
+                ('first_rank_integer', models.IntegerField()),
+                ('last_rank_integer', models.IntegerField()),
+                ('peak_rank', models.JSONField()),
+                ('trough_rank', models.JSONField()),
+                ('summoner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='player.summoner')),
+            ],
+            options={
+                'abstract': False,
+                'unique_together': {('summoner', 'queue_type', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRankRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue_type', models.CharField(blank=True, default='', max_length=32)),
+                ('period_start', models.DateField()),
+                ('start_date', models.DateTimeField()),
+                ('peak_rank_integer', models.IntegerField()),
+                ('trough_rank_integer', models.IntegerField()),
+                ('first_rank_integer', models.IntegerField()),
+                ('last_rank_integer', models.IntegerField()),
+                ('peak_rank', models.JSONField()),
+                ('trough_rank', models.JSONField()),
+                ('summoner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='player.summoner')),
+            ],
+            options={
+                'abstract': False,
+                'unique_together': {('summoner', 'queue_type', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-18 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0046_weeklyrankrollup_dailyrankrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summoner',
+            name='games_version',
+            field=models.IntegerField(blank=True, default=0),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+def backfill_champion_rollups(apps, schema_editor):
+    """Roll up every match imported before ChampionRollup existed, the
+    same totals as player.rollups.upsert.
+    """
+    ChampionRollup = apps.get_model('player', 'ChampionRollup')
+    Match = apps.get_model('match', 'Match')
+    Participant = apps.get_model('match', 'Participant')
+    Stats = apps.get_model('match', 'Stats')
+    schema_editor.execute(
+        f"""
+        INSERT INTO {ChampionRollup._meta.db_table}
+            (puuid, champion_id, queue_id, major, minor,
+             games, win_count, loss_count, kills, deaths, assists,
+             damage_dealt_to_turrets, damage_dealt_to_objectives,
+             total_damage_dealt_to_champions, total_damage_taken,
+             gold_earned, vision_score, cs, duration)
+        SELECT p.puuid, p.champion_id, m.queue_id, COALESCE(m.major, 0), COALESCE(m.minor, 0),
+            COUNT(*),
+            SUM(CASE WHEN s.win THEN 1 ELSE 0 END),
+            SUM(CASE WHEN NOT s.win THEN 1 ELSE 0 END),
+            SUM(s.kills), SUM(s.deaths), SUM(s.assists),
+            SUM(s.damage_dealt_to_turrets), SUM(s.damage_dealt_to_objectives),
+            SUM(s.total_damage_dealt_to_champions), SUM(s.total_damage_taken),
+            SUM(s.gold_earned), SUM(s.vision_score),
+            SUM(s.total_minions_killed + s.neutral_minions_killed),
+            SUM(m.game_duration)
+        FROM {Stats._meta.db_table} s
+        JOIN {Participant._meta.db_table} p ON p.id = s.participant_id
+        JOIN {Match._meta.db_table} m ON m.id = p.match_id
+        WHERE p.puuid IS NOT NULL AND m.game_duration > %s
+        GROUP BY p.puuid, p.champion_id, m.queue_id, COALESCE(m.major, 0), COALESCE(m.minor, 0)
+        ON CONFLICT DO NOTHING
+        """,
+        # games shorter than this are remakes, see player.rollups.MIN_GAME_TIME
+        [60 * 5 * 1000],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0047_summoner_games_version'),
+        ('match', '0039_participant_impact_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_champion_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+def backfill_played_with(apps, schema_editor):
+    """Count every pair of players in the matches imported before PlayedWith
+    existed, the same rows as player.rollups.get_played_with_rows.
+    """
+    PlayedWith = apps.get_model('player', 'PlayedWith')
+    Match = apps.get_model('match', 'Match')
+    Participant = apps.get_model('match', 'Participant')
+    Stats = apps.get_model('match', 'Stats')
+    schema_editor.execute(
+        f"""
+        INSERT INTO {PlayedWith._meta.db_table}
+            (summoner_puuid, puuid, same_team, queue_id, season, games, wins, last_played)
+        SELECT p.puuid, o.puuid, p.team_id = o.team_id, m.queue_id, COALESCE(m.major, 0),
+            COUNT(*),
+            SUM(CASE WHEN s.win THEN 1 ELSE 0 END),
+            MAX(m.game_creation)
+        FROM {Participant._meta.db_table} p
+        JOIN {Participant._meta.db_table} o ON o.match_id = p.match_id AND o.puuid != p.puuid
+        JOIN {Match._meta.db_table} m ON m.id = p.match_id
+        LEFT JOIN {Stats._meta.db_table} s ON s.participant_id = o.id
+        WHERE p.puuid IS NOT NULL AND p.puuid != '' AND o.puuid IS NOT NULL AND o.puuid != ''
+        GROUP BY p.puuid, o.puuid, p.team_id = o.team_id, m.queue_id, COALESCE(m.major, 0)
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0048_backfill_championrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_played_with, migrations.RunPython.noop),
+    ]
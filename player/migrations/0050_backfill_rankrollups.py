@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.utils import timezone
+
+from player.rollups import apply_rank, new_rank_rollup
+
+
+def backfill_rank_rollups(apps, schema_editor):
+    """Fold every RankPosition written before the rank rollups existed into
+    them, the same rows as player.rollups.rebuild_rank_rollups.
+    """
+    RankPosition = apps.get_model('player', 'RankPosition')
+    periods = [
+        (apps.get_model('player', 'DailyRankRollup'), lambda day: day),
+        (
+            apps.get_model('player', 'WeeklyRankRollup'),
+            lambda day: day - timezone.timedelta(days=day.weekday()),
+        ),
+    ]
+    positions = RankPosition.objects.order_by('checkpoint__created_date', 'id').values_list(
+        'checkpoint__summoner_id', 'queue_type', 'checkpoint__created_date', 'rank_integer',
+    )
+    for model, get_period_start in periods:
+        built = {}
+        for summoner_id, queue_type, created_date, rank_integer in positions.iterator():
+            period_start = get_period_start(timezone.localtime(created_date).date())
+            key = (summoner_id, queue_type, period_start)
+            if key in built:
+                apply_rank(built[key], rank_integer)
+            else:
+                built[key] = new_rank_rollup(
+                    model, summoner_id, queue_type, period_start, created_date, rank_integer,
+                )
+        model.objects.bulk_create(built.values(), batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('player', '0049_backfill_playedwith'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rank_rollups, migrations.RunPython.noop),
+    ]
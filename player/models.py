@@ -14,7 +14,7 @@ from django.utils import timezone
 from notification.models import Notification
 
 from data import constants as dc
-from data.models import ProfileIcon
+from data import registry
 
 from player.utils import get_admin
 
@@ -99,11 +99,30 @@ class Summoner(models.Model):
     last_summoner_page_import = models.DateTimeField(null=True)
     created_date = models.DateTimeField(default=timezone.now, db_index=True)
 
+    # newest match we have imported for this summoner.  Refreshes only look
+    # at riot's match list up to this match.
+    watermark_match_id = models.CharField(max_length=32, default="", blank=True)
+    watermark_game_creation = models.BigIntegerField(null=True, blank=True)
+
+    # resumable cursor for deep backfills.  backfill_index is the position in
+    # riot's match list just after backfill_anchor, the oldest match reached.
+    backfill_index = models.IntegerField(default=0, blank=True)
+    backfill_anchor = models.CharField(max_length=32, default="", blank=True)
+    backfill_complete = models.BooleanField(default=False, blank=True)
+
+    # page <head> meta tags built from recent games.  Reset to None when new
+    # matches are imported and rebuilt on the next page load.
+    meta = models.JSONField(default=None, null=True, blank=True)
+    # bumped whenever matches of this summoner are imported.  Caches of their
+    # games are keyed on it so that every process sees the new games.
+    games_version = models.IntegerField(default=0, blank=True)
+
     def __str__(self):
         return f'Summoner(name="{self.name}", region={self.region})'
 
     def get_profile_icon(self):
-        return ProfileIcon.objects.filter(_id=self.profile_icon_id).order_by('-major', '-minor').first()
+        """Get the newest version of the profile icon from data.registry."""
+        return registry.get("profile_icon", self.profile_icon_id)
 
     def save(self, *args, **kwargs):
         if self.name:
@@ -183,6 +202,9 @@ class NameChange(models.Model):
     old_name = models.CharField(max_length=128, default="")
     created_date = models.DateTimeField(default=timezone.now, db_index=True)
 
+    class Meta:
+        unique_together = ["summoner", "old_name"]
+
     def __str__(self):
         return (
             f'NameChange(old_name="{self.old_name}", new_name="{self.summoner.name}")'
@@ -243,6 +265,38 @@ class RankPosition(models.Model):
         return decode_int_to_rank(self.rank_integer)
 
 
+class RankRollup(models.Model):
+    """A summoner's rank over one period, maintained by player.rollups
+    whenever import_positions writes a checkpoint.
+    """
+    summoner = models.ForeignKey("Summoner", on_delete=models.CASCADE, related_name="+")
+    queue_type = models.CharField(max_length=32, default="", blank=True)
+    # first day of the period
+    period_start = models.DateField()
+    # created_date of the first checkpoint in the period
+    start_date = models.DateTimeField()
+
+    peak_rank_integer = models.IntegerField()
+    trough_rank_integer = models.IntegerField()
+    first_rank_integer = models.IntegerField()
+    last_rank_integer = models.IntegerField()
+    # decoded peak and trough, see decode_int_to_rank
+    peak_rank = models.JSONField()
+    trough_rank = models.JSONField()
+
+    class Meta:
+        abstract = True
+        unique_together = ["summoner", "queue_type", "period_start"]
+
+
+class DailyRankRollup(RankRollup):
+    pass
+
+
+class WeeklyRankRollup(RankRollup):
+    """Weeks start on Monday."""
+
+
 def encode_rank_to_int(tier, division, lp):
     ranks = dc.RANKS[9]
     tier_index = ranks["TIERS"].index(tier.lower())
@@ -502,3 +556,66 @@ class Reputation(models.Model):
 
     class Meta:
         unique_together = ['user', 'summoner']
+
+
+class ChampionRollup(models.Model):
+    """Running totals of a summoner's games on a champion.
+
+    One row per (puuid, champion, queue, patch), maintained at match import
+    by player.rollups.
+
+    """
+    puuid = models.CharField(max_length=128)
+    champion_id = models.IntegerField()
+    queue_id = models.IntegerField()
+    major = models.IntegerField()
+    minor = models.IntegerField()
+
+    games = models.IntegerField(default=0)
+    win_count = models.IntegerField(default=0)
+    loss_count = models.IntegerField(default=0)
+    kills = models.BigIntegerField(default=0)
+    deaths = models.BigIntegerField(default=0)
+    assists = models.BigIntegerField(default=0)
+    damage_dealt_to_turrets = models.BigIntegerField(default=0)
+    damage_dealt_to_objectives = models.BigIntegerField(default=0)
+    total_damage_dealt_to_champions = models.BigIntegerField(default=0)
+    total_damage_taken = models.BigIntegerField(default=0)
+    gold_earned = models.BigIntegerField(default=0)
+    vision_score = models.BigIntegerField(default=0)
+    cs = models.BigIntegerField(default=0)
+    # milliseconds
+    duration = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['puuid', 'champion_id', 'queue_id', 'major', 'minor']
+
+    def __str__(self):
+        return f'ChampionRollup(puuid={self.puuid}, champion_id={self.champion_id}, games={self.games})'
+
+
+class PlayedWith(models.Model):
+    """How often a summoner has played with another summoner.
+
+    One row per (summoner, other player, same team, queue, season),
+    maintained at match import by player.rollups.  `season` is the major
+    version of the patch.
+
+    """
+    summoner_puuid = models.CharField(max_length=128)
+    puuid = models.CharField(max_length=128)
+    same_team = models.BooleanField()
+    queue_id = models.IntegerField()
+    season = models.IntegerField()
+
+    games = models.IntegerField(default=0)
+    # games won by the other player
+    wins = models.IntegerField(default=0)
+    # game_creation of the latest game together
+    last_played = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['summoner_puuid', 'puuid', 'same_team', 'queue_id', 'season']
+
+    def __str__(self):
+        return f'PlayedWith(summoner_puuid={self.summoner_puuid}, puuid={self.puuid}, games={self.games})'
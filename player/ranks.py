@@ -0,0 +1,257 @@
+"""player/ranks.py
+
+Batched rank lookups for a set of summoners, ie: the 10 players of a match
+or a live game.
+
+League entries are only fetched for summoners whose newest checkpoint is
+stale, concurrently, through the rate limited riot client.  The entries are
+diffed in memory against the positions of each summoner's newest checkpoint
+and only the summoners whose positions changed get a new checkpoint, written
+in bulk.  Positions are then resolved for every summoner with one query.
+
+"""
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from lolsite.tasks import get_riot_api
+
+from .models import Summoner, RankCheckpoint, RankPosition
+from . import rollups
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+RANK_FETCH_THREADS = 10
+# summoners fetched and written per round in refresh_positions
+RANK_SYNC_BATCH_SIZE = 500
+
+# a new checkpoint is only written if one of these changed
+POSITION_KEY = ["queue_type", "tier", "rank", "league_points", "wins", "losses", "series_progress"]
+
+
+def get_stale_summoners(summoners: list[Summoner], threshold_days=1):
+    """Get the summoners without a checkpoint newer than `threshold_days`.
+    """
+    if threshold_days is None:
+        return list(summoners)
+    newest = dict(
+        RankCheckpoint.objects.filter(summoner__in=summoners)
+        .values("summoner_id")
+        .annotate(newest=Max("created_date"))
+        .values_list("summoner_id", "newest")
+    )
+    threshold = timezone.now() - timezone.timedelta(days=threshold_days)
+    return [x for x in summoners if not newest.get(x.id) or newest[x.id] <= threshold]
+
+
+def fetch_league_entries(summoners: list[Summoner], threads=RANK_FETCH_THREADS):
+    """Fetch league entries concurrently.
+
+    Returns
+    -------
+    dict
+        {summoner.id: list of riot league entries}, summoners whose request
+        failed are left out
+
+    """
+    api = get_riot_api()
+
+    def fetch(summoner: Summoner):
+        try:
+            r = api.league.entries(summoner._id, summoner.region)
+        except Exception:
+            logger.exception(f"Could not fetch league entries for {summoner}.")
+            return summoner, None
+        if 200 <= r.status_code < 300:
+            return summoner, r.json()
+        logger.warning(f"League entries for {summoner} returned {r.status_code}.")
+        return summoner, None
+
+    out = {}
+    if not summoners:
+        return out
+    with ThreadPoolExecutor(max_workers=min(threads, len(summoners))) as executor:
+        for summoner, entries in executor.map(fetch, summoners):
+            if entries is not None:
+                out[summoner.id] = entries
+    return out
+
+
+def get_newest_positions(summoner_ids: list[int], queue_type=None):
+    """Get the positions of each summoner's newest checkpoint in one query.
+
+    Returns
+    -------
+    dict
+        {summoner_id: [RankPosition, ...]}
+
+    """
+    newest = (
+        RankCheckpoint.objects.filter(summoner_id=OuterRef("checkpoint__summoner_id"))
+        .order_by("-created_date")
+        .values("id")[:1]
+    )
+    query = RankPosition.objects.filter(
+        checkpoint__summoner_id__in=summoner_ids,
+        checkpoint_id=Subquery(newest),
+    ).select_related("checkpoint")
+    if queue_type is not None:
+        query = query.filter(queue_type=queue_type)
+    out: dict[int, list[RankPosition]] = {}
+    for position in query:
+        out.setdefault(position.checkpoint.summoner_id, []).append(position)
+    return out
+
+
+def build_position(entry: dict):
+    """Build an unsaved RankPosition from a riot league entry.
+    """
+    position = RankPosition(
+        league_points=entry["leaguePoints"],
+        wins=entry["wins"],
+        losses=entry["losses"],
+        queue_type=entry["queueType"],
+        rank=entry["rank"],
+        tier=entry["tier"],
+        hot_streak=entry["hotStreak"],
+        fresh_blood=entry["freshBlood"],
+        inactive=entry["inactive"],
+        veteran=entry["veteran"],
+        series_progress=entry.get("miniSeries", {}).get("progress", None),
+    )
+    position.rank_integer = position.encode()
+    return position
+
+
+def get_position_key(position: RankPosition):
+    return tuple(getattr(position, name) for name in POSITION_KEY)
+
+
+def sync_positions(entries: dict[int, list[dict]], checkpoints: dict[int, RankCheckpoint]):
+    """Save league entries as new RankCheckpoints for the summoners whose
+    positions changed.
+
+    Parameters
+    ----------
+    entries : dict
+        {summoner.id: list of riot league entries}
+    checkpoints : dict
+        {summoner.id: RankCheckpoint}, each summoner's newest checkpoint,
+        summoners without one always get a new checkpoint
+
+    Returns
+    -------
+    list[RankCheckpoint]
+        the new checkpoints
+
+    """
+    current = defaultdict(set)
+    query = RankPosition.objects.filter(
+        checkpoint__in=[checkpoints[x] for x in entries if x in checkpoints]
+    ).values_list("checkpoint__summoner_id", *POSITION_KEY)
+    for summoner_id, *key in query:
+        current[summoner_id].add(tuple(key))
+
+    new = []
+    for summoner_id, summoner_entries in entries.items():
+        positions = []
+        for entry in summoner_entries:
+            if "rank" not in entry:
+                logger.info(f"Rank information not available, skipping {entry} for {summoner_id}.")
+                continue
+            positions.append(build_position(entry))
+        if summoner_id in checkpoints and {get_position_key(x) for x in positions} == current[summoner_id]:
+            continue
+        new.append((RankCheckpoint(summoner_id=summoner_id), positions))
+    if not new:
+        return []
+
+    with transaction.atomic():
+        RankCheckpoint.objects.bulk_create([checkpoint for checkpoint, _ in new])
+        for checkpoint, positions in new:
+            for position in positions:
+                position.checkpoint = checkpoint
+        RankPosition.objects.bulk_create(
+            [position for _, positions in new for position in positions], batch_size=1000,
+        )
+        rollups.add_rank_checkpoints(
+            [(checkpoint.summoner_id, checkpoint.created_date, positions) for checkpoint, positions in new]
+        )
+    logger.info(f"Saved {len(new)} new rank checkpoints for {len(entries)} summoners.")
+    return [checkpoint for checkpoint, _ in new]
+
+
+def get_newest_checkpoints(summoner_ids: list[int]):
+    """Get each summoner's newest RankCheckpoint in one query.
+
+    Returns
+    -------
+    dict
+        {summoner_id: RankCheckpoint}
+
+    """
+    newest = (
+        RankCheckpoint.objects.filter(summoner_id=OuterRef("summoner_id"))
+        .order_by("-created_date")
+        .values("id")[:1]
+    )
+    return {
+        x.summoner_id: x
+        for x in RankCheckpoint.objects.filter(summoner_id__in=summoner_ids, id=Subquery(newest))
+    }
+
+
+def refresh_positions(
+    summoners: list[Summoner],
+    threshold_days=1,
+    threads=RANK_FETCH_THREADS,
+    batch_size=RANK_SYNC_BATCH_SIZE,
+):
+    """Import positions for every stale summoner in `summoners`.
+
+    Riot requests run concurrently; the writes happen on the calling thread,
+    `batch_size` summoners at a time.
+
+    Parameters
+    ----------
+    summoners : list[Summoner]
+    threshold_days : int | None
+        summoners with a checkpoint newer than this are skipped,
+        None refreshes everyone
+
+    Returns
+    -------
+    list[RankCheckpoint]
+        the new checkpoints
+
+    """
+    created = []
+    summoners = iter(summoners)
+    while batch := list(islice(summoners, batch_size)):
+        stale = get_stale_summoners(batch, threshold_days=threshold_days)
+        if not stale:
+            continue
+        logger.info(f"Refreshing positions for {len(stale)} summoners.")
+        entries = fetch_league_entries(stale, threads=threads)
+        checkpoints = get_newest_checkpoints(list(entries))
+        created.extend(sync_positions(entries, checkpoints))
+    return created
+
+
+def get_positions(summoners: list[Summoner], threshold_days=1, queue_type=None):
+    """Refresh stale summoners and return everyone's newest positions.
+
+    Returns
+    -------
+    dict
+        {summoner_id: [RankPosition, ...]}
+
+    """
+    refresh_positions(summoners, threshold_days=threshold_days)
+    return get_newest_positions([x.id for x in summoners], queue_type=queue_type)
@@ -0,0 +1,352 @@
+"""player/rollups.py
+
+Maintain the tables which are derived from imported matches.
+
+ChampionRollup
+    per (puuid, champion, queue, patch) totals used by the champion overview
+PlayedWith
+    per (puuid, other puuid, same team, queue, season) co-occurrence counts
+DailyRankRollup, WeeklyRankRollup
+    per (summoner, queue, period) peak, trough, first and last rank
+
+Match updates add (or subtract) the totals of the affected matches from the
+existing rows with `INSERT ... ON CONFLICT DO UPDATE`, so they are safe to
+run inside the import transaction and concurrently with other imports.
+New rank checkpoints are folded into the rank rollups the same way.
+
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from django.db.models import Case, F, IntegerField, QuerySet, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from match.models import Participant, Stats
+from .models import ChampionRollup, PlayedWith
+from .models import DailyRankRollup, WeeklyRankRollup, RankPosition
+from .models import decode_int_to_rank
+
+from collections import defaultdict
+from itertools import islice
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# games shorter than this are remakes and are left out of the overview
+MIN_GAME_TIME = 60 * 5 * 1000
+
+KEYS = {
+    "puuid": "participant__puuid",
+    "champion_id": "participant__champion_id",
+    "queue_id": "participant__match__queue_id",
+    "major": "participant__match__major",
+    "minor": "participant__match__minor",
+}
+
+
+def get_totals():
+    return {
+        "games": Sum(Value(1)),
+        "win_count": Sum(Case(When(win=True, then=Value(1)), default=Value(0), output_field=IntegerField())),
+        "loss_count": Sum(Case(When(win=False, then=Value(1)), default=Value(0), output_field=IntegerField())),
+        "kills": Sum("kills"),
+        "deaths": Sum("deaths"),
+        "assists": Sum("assists"),
+        "damage_dealt_to_turrets": Sum("damage_dealt_to_turrets"),
+        "damage_dealt_to_objectives": Sum("damage_dealt_to_objectives"),
+        "total_damage_dealt_to_champions": Sum("total_damage_dealt_to_champions"),
+        "total_damage_taken": Sum("total_damage_taken"),
+        "gold_earned": Sum("gold_earned"),
+        "vision_score": Sum("vision_score"),
+        "cs": Sum(F("total_minions_killed") + F("neutral_minions_killed")),
+        "duration": Sum("participant__match__game_duration"),
+    }
+
+
+def aggregate_stats(stats: QuerySet[Stats], sign=1):
+    totals = get_totals()
+    if sign != 1:
+        totals = {name: agg * Value(sign) for name, agg in totals.items()}
+    keys = {name: F(path) for name, path in KEYS.items()}
+    # a match without a parsable version is rolled up under 0.0
+    keys["major"] = Coalesce(KEYS["major"], Value(0))
+    keys["minor"] = Coalesce(KEYS["minor"], Value(0))
+    return (
+        stats.filter(participant__match__game_duration__gt=MIN_GAME_TIME)
+        .annotate(**{f"rollup_{name}": path for name, path in keys.items()})
+        .values(*[f"rollup_{name}" for name in KEYS])
+        .annotate(**totals)
+        .order_by(*[f"rollup_{name}" for name in KEYS])
+    )
+
+
+def upsert(stats: QuerySet[Stats], sign=1):
+    """Add (or with sign=-1, remove) the totals of `stats` to the rollup.
+    """
+    query = aggregate_stats(stats, sign=sign)
+    select, params = query.query.sql_with_params()
+    table = ChampionRollup._meta.db_table
+    keys = list(KEYS)
+    totals = list(get_totals())
+    columns = ", ".join(keys + totals)
+    updates = ", ".join(f"{name} = {table}.{name} + EXCLUDED.{name}" for name in totals)
+    sql = (
+        f"INSERT INTO {table} ({columns}) {select} "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+PLAYED_WITH_KEYS = ["summoner_puuid", "puuid", "same_team", "queue_id", "season"]
+PLAYED_WITH_BATCH_SIZE = 1000
+
+
+def get_played_with_rows(match_ids: list[int], sign=1, summoner_puuid=None):
+    """Count every pair of players in the given matches.
+
+    Returns
+    -------
+    list[tuple]
+        PLAYED_WITH_KEYS + (games, wins, last_played), sorted by key
+
+    """
+    participants = (
+        Participant.objects.filter(match_id__in=match_ids)
+        .exclude(puuid__isnull=True)
+        .exclude(puuid="")
+        .values_list(
+            "match_id", "puuid", "team_id", "stats__win",
+            "match__queue_id", "match__major", "match__game_creation",
+        )
+    )
+    by_match = defaultdict(list)
+    for row in participants:
+        by_match[row[0]].append(row[1:])
+
+    totals: dict[tuple, list[int]] = {}
+    for players in by_match.values():
+        for puuid, team_id, _, queue_id, major, game_creation in players:
+            if summoner_puuid is not None and puuid != summoner_puuid:
+                continue
+            for other, other_team_id, other_win, *_ in players:
+                if other == puuid:
+                    continue
+                key = (puuid, other, team_id == other_team_id, queue_id, major or 0)
+                total = totals.setdefault(key, [0, 0, 0])
+                total[0] += sign
+                total[1] += sign if other_win else 0
+                total[2] = max(total[2], game_creation)
+    return [key + tuple(total) for key, total in sorted(totals.items())]
+
+
+def upsert_played_with(rows: list[tuple]):
+    table = PlayedWith._meta.db_table
+    columns = ", ".join(PLAYED_WITH_KEYS + ["games", "wins", "last_played"])
+    placeholder = "(" + ", ".join(["%s"] * (len(PLAYED_WITH_KEYS) + 3)) + ")"
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while batch := list(islice(rows, PLAYED_WITH_BATCH_SIZE)):
+            values = ", ".join([placeholder] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {values} "
+                f"ON CONFLICT ({', '.join(PLAYED_WITH_KEYS)}) DO UPDATE SET "
+                f"games = {table}.games + EXCLUDED.games, "
+                f"wins = {table}.wins + EXCLUDED.wins, "
+                f"last_played = GREATEST({table}.last_played, EXCLUDED.last_played)",
+                [value for row in batch for value in row],
+            )
+
+
+def add_matches(match_ids: list[int]):
+    """Add newly imported matches to the rollups.
+    """
+    if match_ids:
+        upsert(Stats.objects.filter(participant__match_id__in=match_ids))
+        upsert_played_with(get_played_with_rows(match_ids))
+
+
+def remove_matches(match_ids: list[int]):
+    """Remove matches from the rollups, ie: before they are deleted.
+
+    `PlayedWith.last_played` is left as it was.
+    """
+    if match_ids:
+        upsert(Stats.objects.filter(participant__match_id__in=match_ids), sign=-1)
+        ChampionRollup.objects.filter(games__lte=0).delete()
+        upsert_played_with(get_played_with_rows(match_ids, sign=-1))
+        PlayedWith.objects.filter(games__lte=0).delete()
+
+
+@transaction.atomic()
+def rebuild(puuid: str | None = None):
+    """Rebuild the rollups from scratch, for one summoner or for everyone.
+    """
+    stats = Stats.objects.all()
+    rollups = ChampionRollup.objects.all()
+    played_with = PlayedWith.objects.all()
+    matches = Participant.objects.all()
+    if puuid is not None:
+        stats = stats.filter(participant__puuid=puuid)
+        rollups = rollups.filter(puuid=puuid)
+        played_with = played_with.filter(summoner_puuid=puuid)
+        matches = matches.filter(puuid=puuid)
+    rollups.delete()
+    count = upsert(stats)
+    logger.info(f"Rebuilt {count} champion rollups.")
+
+    played_with.delete()
+    match_ids = matches.values_list("match_id", flat=True).distinct().order_by("match_id").iterator()
+    while batch := list(islice(match_ids, PLAYED_WITH_BATCH_SIZE)):
+        upsert_played_with(get_played_with_rows(batch, summoner_puuid=puuid))
+    return count
+
+
+RANK_PERIODS = [
+    (DailyRankRollup, lambda day: day),
+    (WeeklyRankRollup, lambda day: day - timezone.timedelta(days=day.weekday())),
+]
+
+
+RANK_ROLLUP_FIELDS = [
+    "peak_rank_integer", "trough_rank_integer", "last_rank_integer", "peak_rank", "trough_rank",
+]
+
+
+def new_rank_rollup(model, summoner_id, queue_type, period_start, created_date, rank_integer):
+    decoded = decode_int_to_rank(rank_integer)
+    return model(
+        summoner_id=summoner_id,
+        queue_type=queue_type,
+        period_start=period_start,
+        start_date=created_date,
+        peak_rank_integer=rank_integer,
+        trough_rank_integer=rank_integer,
+        first_rank_integer=rank_integer,
+        last_rank_integer=rank_integer,
+        peak_rank=decoded,
+        trough_rank=decoded,
+    )
+
+
+def apply_rank(rollup, rank_integer):
+    """Fold a later rank into a rollup."""
+    rollup.last_rank_integer = rank_integer
+    if rank_integer > rollup.peak_rank_integer:
+        rollup.peak_rank_integer = rank_integer
+        rollup.peak_rank = decode_int_to_rank(rank_integer)
+    if rank_integer < rollup.trough_rank_integer:
+        rollup.trough_rank_integer = rank_integer
+        rollup.trough_rank = decode_int_to_rank(rank_integer)
+
+
+def add_rank_positions(summoner_id: int, created_date, positions: list[RankPosition]):
+    """Fold the positions of a new RankCheckpoint into the rank rollups.
+    """
+    add_rank_checkpoints([(summoner_id, created_date, positions)])
+
+
+RANK_ROLLUP_KEYS = ["summoner_id", "queue_type", "period_start"]
+RANK_ROLLUP_COLUMNS = RANK_ROLLUP_KEYS + [
+    "start_date", "peak_rank_integer", "trough_rank_integer", "first_rank_integer",
+    "last_rank_integer", "peak_rank", "trough_rank",
+]
+
+
+def upsert_rank_rollups(model, rows: list):
+    """Fold rollups built from new checkpoints into the existing rows.
+
+    A row which already exists keeps its start_date and first rank, takes
+    the new last rank and widens its peak and trough.
+    """
+    table = model._meta.db_table
+    fields = [model._meta.get_field(x) for x in RANK_ROLLUP_COLUMNS]
+    placeholder = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while batch := list(islice(rows, PLAYED_WITH_BATCH_SIZE)):
+            values = ", ".join([placeholder] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(RANK_ROLLUP_COLUMNS)}) VALUES {values} "
+                f"ON CONFLICT ({', '.join(RANK_ROLLUP_KEYS)}) DO UPDATE SET "
+                f"last_rank_integer = EXCLUDED.last_rank_integer, "
+                f"peak_rank = CASE WHEN EXCLUDED.peak_rank_integer > {table}.peak_rank_integer "
+                f"THEN EXCLUDED.peak_rank ELSE {table}.peak_rank END, "
+                f"peak_rank_integer = GREATEST({table}.peak_rank_integer, EXCLUDED.peak_rank_integer), "
+                f"trough_rank = CASE WHEN EXCLUDED.trough_rank_integer < {table}.trough_rank_integer "
+                f"THEN EXCLUDED.trough_rank ELSE {table}.trough_rank END, "
+                f"trough_rank_integer = LEAST({table}.trough_rank_integer, EXCLUDED.trough_rank_integer)",
+                [
+                    field.get_db_prep_save(getattr(row, field.attname), connection)
+                    for row in batch for field in fields
+                ],
+            )
+
+
+@transaction.atomic()
+def add_rank_checkpoints(checkpoints: list[tuple[int, object, list[RankPosition]]]):
+    """Fold the positions of many new RankCheckpoints into the rank rollups.
+
+    Safe to run concurrently, see `upsert_rank_rollups`.
+
+    Parameters
+    ----------
+    checkpoints : list[tuple]
+        (summoner_id, created_date, positions) for each new checkpoint
+
+    """
+    for model, get_period_start in RANK_PERIODS:
+        ranks = sorted(
+            (
+                created_date, summoner_id, position.queue_type,
+                get_period_start(timezone.localtime(created_date).date()),
+                position.rank_integer,
+            )
+            for summoner_id, created_date, positions in checkpoints
+            for position in positions
+        )
+        built = {}
+        for created_date, summoner_id, queue_type, period_start, rank_integer in ranks:
+            key = (summoner_id, queue_type, period_start)
+            if key in built:
+                apply_rank(built[key], rank_integer)
+            else:
+                built[key] = new_rank_rollup(
+                    model, summoner_id, queue_type, period_start, created_date, rank_integer,
+                )
+        # in key order so that concurrent upserts lock rows in the same order
+        upsert_rank_rollups(model, [built[key] for key in sorted(built)])
+
+
+@transaction.atomic()
+def rebuild_rank_rollups(summoner_id: int | None = None):
+    """Rebuild the rank rollups from every RankPosition.
+    """
+    positions = RankPosition.objects.all()
+    if summoner_id is not None:
+        positions = positions.filter(checkpoint__summoner_id=summoner_id)
+    positions = positions.order_by("checkpoint__created_date", "id").values_list(
+        "checkpoint__summoner_id", "queue_type", "checkpoint__created_date", "rank_integer",
+    )
+    count = 0
+    for model, get_period_start in RANK_PERIODS:
+        rollups = model.objects.all()
+        if summoner_id is not None:
+            rollups = rollups.filter(summoner_id=summoner_id)
+        rollups.delete()
+
+        built = {}
+        for row_summoner_id, queue_type, created_date, rank_integer in positions.iterator():
+            period_start = get_period_start(timezone.localtime(created_date).date())
+            key = (row_summoner_id, queue_type, period_start)
+            if key in built:
+                apply_rank(built[key], rank_integer)
+            else:
+                built[key] = new_rank_rollup(
+                    model, row_summoner_id, queue_type, period_start, created_date, rank_integer,
+                )
+        model.objects.bulk_create(built.values(), batch_size=1000)
+        count += len(built)
+    logger.info(f"Rebuilt {count} rank rollups.")
+    return count
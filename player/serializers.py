@@ -4,7 +4,7 @@ from django.contrib.auth import get_user_model
 from django.db.models import Q
 from rest_framework import serializers
 
-from data.models import ProfileIcon
+from data import registry
 from data.serializers import DynamicSerializer
 from .models import Summoner, Reputation
 from .models import RankPosition, Custom
@@ -90,12 +90,7 @@ class SummonerSerializer(DynamicSerializer):
         return False
 
     def get_profile_icon(self, obj):
-        query = ProfileIcon.objects.filter(_id=obj.profile_icon_id)
-        query = query.order_by('_id', "-major", "-minor", "-patch").distinct('_id')
-        if query:
-            profile_icon = query[0]
-            return profile_icon.image_url()
-        return ''
+        return registry.get_image_url("profile_icon", obj.profile_icon_id)
 
 
 class RankPositionSerializer(DynamicSerializer):
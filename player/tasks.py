@@ -5,13 +5,15 @@ from django.contrib.auth.models import User
 
 from .models import Summoner
 from .models import simplify
-from .models import RankCheckpoint, RankPosition
 from .models import Custom, EmailVerification
 from .models import Pro
+from .models import NameChange
 
 from . import constants
+from . import ranks
 
 from lolsite.tasks import get_riot_api
+from lolsite.singleflight import coalesce
 import logging
 
 
@@ -43,7 +45,21 @@ def import_pros(overwrite=False):
                 summoner.save()
 
 
+def summoner_key(region, account_id=None, name=None, summoner_id=None, puuid=None):
+    """Key used to coalesce concurrent imports of the same summoner.
+
+    Every identifier is part of the key, so calls only share a result when
+    they were made with the same arguments.
+    """
+    if all(x is None for x in [account_id, name, summoner_id, puuid]):
+        return None
+    if name is not None:
+        name = simplify(name)
+    return f"summoner:{region.lower()}:{account_id}:{name}:{summoner_id}:{puuid}"
+
+
 @app.task(name="player.tasks.import_summoner")
+@coalesce(summoner_key)
 def import_summoner(region, account_id=None, name=None, summoner_id=None, puuid=None):
     """Import a summoner by one a several identifiers.
 
@@ -88,13 +104,42 @@ def import_summoner(region, account_id=None, name=None, summoner_id=None, puuid=
         "_id": data["id"],
         'region': region.lower(),
     }
+    previous = (
+        Summoner.objects.filter(puuid=data['puuid'])
+        .values('id', 'name', 'profile_icon_id')
+        .first()
+    )
+    if previous and (previous['name'], previous['profile_icon_id']) != (data['name'], data['profileIconId']):
+        # the page meta tags show the name and icon
+        model_data['meta'] = None
     summoner, _ = Summoner.objects.update_or_create(
         puuid=data['puuid'],
         defaults=model_data,
     )
+    if previous and previous['name'] != data['name']:
+        record_name_changes([(summoner.id, previous['name'])])
     return summoner.id
 
 
+def record_name_changes(changes):
+    """Bulk insert NameChanges, skipping any we already have.
+
+    Parameters
+    ----------
+    changes : list[tuple[int, str]]
+        (internal summoner id, old name)
+
+    """
+    NameChange.objects.bulk_create(
+        [
+            NameChange(summoner_id=summoner_id, old_name=old_name)
+            for summoner_id, old_name in set(changes)
+            if old_name
+        ],
+        ignore_conflicts=True,
+    )
+
+
 @app.task(name='player.tasks.import_positions')
 def import_positions(summoner, threshold_days=None):
     """Get most recent position data for Summoner.
@@ -128,56 +173,52 @@ def import_positions(summoner, threshold_days=None):
     r = api.league.entries(summoner._id, region)
     logger.info(f'api.league.entries response: {r}')
     if r.status_code >= 200 and r.status_code < 300:
-        positions = r.json()
-        create_new = False
-        # need to check if anything has changed
-        if rankcheckpoint:
-            for pos in positions:
-                try:
-                    attrs = {
-                        "league_points": pos["leaguePoints"],
-                        "wins": pos["wins"],
-                        "losses": pos["losses"],
-                        "queue_type": pos["queueType"],
-                        "rank": pos["rank"],
-                        "tier": pos["tier"],
-                        "series_progress": pos.get("miniSeries", {}).get(
-                            "progress", None
-                        ),
-                    }
-                    rankcheckpoint.positions.get(**attrs)
-                    logger.info("Nothing has changed, not creating a new checkpoint")
-                except:
-                    logger.info("Change detected.")
-                    create_new = True
-        else:
-            create_new = True
-
-        if create_new:
-            rankcheckpoint = RankCheckpoint(summoner=summoner)
-            rankcheckpoint.save()
-            for pos in positions:
-                if 'rank' not in pos:
-                    logger.info(f'Position Data: {pos}')
-                    logger.info(f'Rank information not available.  Skipping for {summoner}.')
-                    continue
-                attrs = {
-                    "checkpoint": rankcheckpoint,
-                    "league_points": pos["leaguePoints"],
-                    "wins": pos["wins"],
-                    "losses": pos["losses"],
-                    "queue_type": pos["queueType"],
-                    "rank": pos["rank"],
-                    "tier": pos["tier"],
-                    "hot_streak": pos["hotStreak"],
-                    "fresh_blood": pos["freshBlood"],
-                    "inactive": pos["inactive"],
-                    "veteran": pos["veteran"],
-                    "series_progress": pos.get("miniSeries", {}).get("progress", None),
-                }
-                logger.info(f'Saving new rank position for {summoner}')
-                rankposition = RankPosition(**attrs)
-                rankposition.save()
+        save_positions(summoner, r.json(), rankcheckpoint)
+
+
+def save_positions(summoner: Summoner, positions: list[dict], rankcheckpoint=None):
+    """Save riot league entries as a new RankCheckpoint if anything changed.
+
+    Parameters
+    ----------
+    summoner : Summoner
+    positions : list[dict]
+        riot league entries
+    rankcheckpoint : RankCheckpoint | None
+        the summoner's newest checkpoint
+
+    Returns
+    -------
+    RankCheckpoint | None
+        the new checkpoint, if one was created
+
+    """
+    checkpoints = {summoner.id: rankcheckpoint} if rankcheckpoint else {}
+    created = ranks.sync_positions({summoner.id: positions}, checkpoints)
+    return created[0] if created else None
+
+
+@app.task(name="player.tasks.import_many_positions")
+def import_many_positions(summoner_ids: list[int], threshold_days=None):
+    """Get the most recent position data for many summoners.
+
+    League entries are fetched concurrently and the changed positions are
+    written in bulk, see player.ranks.
+
+    Parameters
+    ----------
+    summoner_ids : list[int]
+    threshold_days : int
+        Only update summoners whose last update was more than {threshold_days} days ago
+
+    Returns
+    -------
+    int
+        the number of new checkpoints
+
+    """
+    summoners = Summoner.objects.filter(id__in=summoner_ids).order_by("id")
+    return len(ranks.refresh_positions(summoners.iterator(), threshold_days=threshold_days))
 
 
 def simplify_email(email):
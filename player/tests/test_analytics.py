@@ -0,0 +1,61 @@
+"""player/tests/test_analytics.py
+"""
+import json
+
+from django.test import TestCase, override_settings
+
+from match import tasks as mt
+from match.models import Match
+from match.tests.factories import match_payload
+from player import analytics, filters
+
+
+class AnalyticsTest(TestCase):
+    def setUp(self):
+        payloads = [json.dumps(match_payload(f'NA1_{i}')) for i in range(1, 4)]
+        mt.import_matches_from_data(payloads, 'na')
+        Match.objects.filter(_id='NA1_3').update(queue_id=450)
+
+    def test_matches_champion_overview(self):
+        expected = filters.get_summoner_champions_overview(
+            puuid='puuid-1', start_datetime='2000-01-01T00:00:00Z',
+        )
+        expected = {x['champion_id']: x for x in expected}
+        rows = analytics.load_columns('puuid-1').group(['champion_id'])
+        self.assertEqual(len(rows), len(expected))
+        for row in rows:
+            for name in ['count', 'wins', 'losses', 'kills_sum', 'kda', 'dpm', 'cspm', 'gpm', 'dtpd']:
+                self.assertAlmostEqual(row[name], expected[row['champion_id']][name], places=5, msg=name)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_import_invalidates_every_process(self):
+        self.assertEqual(len(analytics.get_columns('puuid-1')), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            mt.import_matches_from_data([json.dumps(match_payload('NA1_4'))], 'na')
+        # the cached copy is keyed on the old games_version, in any process
+        self.assertEqual(len(analytics.get_columns('puuid-1')), 4)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(analytics.get_columns('puuid-1')), 4)
+
+    def test_group(self):
+        columns = analytics.load_columns('puuid-1')
+        self.assertEqual(len(columns), 3)
+        rows = columns.group(['queue_id', 'weekday'], ['count'])
+        self.assertEqual([x['queue_id'] for x in rows], sorted(x['queue_id'] for x in rows))
+        self.assertEqual(sum(x['count'] for x in rows), 3)
+        self.assertEqual(columns.group(['patch'], ['count'], queue_in=[450])[0]['count'], 1)
+        self.assertEqual(columns.group(['patch'], queue_in=[999]), [])
+
+    def test_view_rejects_bad_parameters(self):
+        url = '/api/v1/player/stats/'
+        for data in [
+            {'puuid': 'puuid-1', 'group_by': []},
+            {'puuid': 'puuid-1', 'group_by': ['nope']},
+            {'puuid': 'puuid-1', 'start_datetime': 'yesterday'},
+            {'puuid': 'puuid-1', 'end_datetime': '2023-02-30T00:00:00Z'},
+        ]:
+            response = self.client.post(url, data, content_type='application/json')
+            self.assertEqual(response.status_code, 400, msg=data)
+        response = self.client.post(url, {'puuid': 'puuid-1'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), len({x['champion_id'] for x in response.data['data']}))
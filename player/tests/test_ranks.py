@@ -0,0 +1,80 @@
+"""player/tests/test_ranks.py
+"""
+from django.test import TestCase
+from django.utils import timezone
+
+from unittest import mock
+import json
+
+from match import tasks as mt
+from match.models import Participant
+from match.tests.factories import match_payload
+from player import ranks
+from player.models import DailyRankRollup, RankCheckpoint, RankPosition
+from player.tests.factories import SummonerFactory
+from player.tests.test_rollups import league_entry
+
+
+class ApplyPlayerRanksTest(TestCase):
+    def setUp(self):
+        now = int(timezone.now().timestamp() * 1000)
+        self.match = mt.import_matches_from_data(
+            [json.dumps(match_payload('NA1_1', game_creation=now))], 'na'
+        )[0]
+        self.api = mock.Mock()
+        self.api.league.entries.side_effect = lambda summoner_id, region: mock.Mock(
+            status_code=200,
+            json=lambda: [league_entry('PLATINUM', 'III', int(summoner_id.split('-')[1]))],
+        )
+
+    def test_apply_player_ranks(self):
+        with mock.patch.object(ranks, 'get_riot_api', return_value=self.api):
+            mt.apply_player_ranks(self.match.id)
+        self.assertEqual(self.api.league.entries.call_count, 10)
+        self.assertEqual(RankCheckpoint.objects.count(), 10)
+        self.assertEqual(
+            set(Participant.objects.values_list('tier', 'rank')), {('PLATINUM', 'III')},
+        )
+
+        # fresh checkpoints aren't fetched again
+        Participant.objects.update(tier='', rank='')
+        with mock.patch.object(ranks, 'get_riot_api', return_value=self.api):
+            with self.assertNumQueries(6):
+                mt.apply_player_ranks(self.match.id)
+        self.assertEqual(self.api.league.entries.call_count, 10)
+
+    def test_newest_positions(self):
+        with mock.patch.object(ranks, 'get_riot_api', return_value=self.api):
+            mt.apply_player_ranks(self.match.id)
+        position = RankPosition.objects.order_by('id').first()
+        summoner_id = position.checkpoint.summoner_id
+        checkpoint = RankCheckpoint.objects.create(summoner_id=summoner_id)
+        RankPosition.objects.create(
+            checkpoint=checkpoint, queue_type='RANKED_SOLO_5x5', tier='GOLD', rank='I',
+        )
+        positions = ranks.get_newest_positions([summoner_id])
+        self.assertEqual([x.tier for x in positions[summoner_id]], ['GOLD'])
+
+
+class SyncPositionsTest(TestCase):
+    def setUp(self):
+        self.summoners = [SummonerFactory() for _ in range(3)]
+        entries = {x.id: [league_entry('GOLD', 'II', 10)] for x in self.summoners}
+        ranks.sync_positions(entries, {})
+
+    def test_sync_positions(self):
+        unchanged, changed, skipped = self.summoners
+        checkpoints = ranks.get_newest_checkpoints([x.id for x in self.summoners])
+        entries = {
+            unchanged.id: [league_entry('GOLD', 'II', 10)],
+            changed.id: [league_entry('GOLD', 'II', 30)],
+            skipped.id: [{'queueType': 'CHERRY'}, league_entry('GOLD', 'II', 10)],
+        }
+        with self.assertNumQueries(9):
+            created = ranks.sync_positions(entries, checkpoints)
+        self.assertEqual([x.summoner_id for x in created], [changed.id])
+        self.assertEqual(RankCheckpoint.objects.count(), 4)
+        position = ranks.get_newest_positions([changed.id])[changed.id][0]
+        self.assertEqual(position.league_points, 30)
+        self.assertEqual(position.rank_integer, position.encode())
+        self.assertEqual(DailyRankRollup.objects.get(summoner=changed).peak_rank_integer, position.rank_integer)
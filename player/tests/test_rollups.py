@@ -0,0 +1,207 @@
+"""player/tests/test_rollups.py
+"""
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from unittest import mock
+import importlib
+import json
+
+from match import tasks as mt
+from match.tests.factories import match_payload, participant_payload
+from player import filters
+from player import rollups
+from player import tasks as pt
+from player.models import ChampionRollup, PlayedWith, Summoner
+from player.models import DailyRankRollup, WeeklyRankRollup, RankCheckpoint, RankPosition
+from player.tests.factories import SummonerFactory
+
+
+def payload(match_id, kills, win, **kwargs):
+    participants = [
+        participant_payload(i, 100 if i <= 5 else 200, kills=kills + i, deaths=i % 3, assists=i)
+        for i in range(1, 11)
+    ]
+    if not win:
+        for participant in participants:
+            participant['win'] = not participant['win']
+    return json.dumps(match_payload(match_id, participants=participants, **kwargs))
+
+
+def run_migration(name, function):
+    """Run the RunPython function of a data migration on the current tables."""
+    module = importlib.import_module(f'player.migrations.{name}')
+    with connection.schema_editor() as schema_editor:
+        getattr(module, function)(apps, schema_editor)
+
+
+class ChampionRollupTest(TestCase):
+    def setUp(self):
+        mt.import_matches_from_data([
+            payload('NA1_1', 3, True),
+            payload('NA1_2', 7, False),
+            payload('NA1_3', 1, True, queueId=440),
+            # a remake is left out of the overview
+            payload('NA1_4', 0, True, gameDuration=200),
+        ], 'na')
+
+    def overview(self, **kwargs):
+        return {x['champion_id']: x for x in filters.get_summoner_champions_overview(**kwargs)}
+
+    def stats_overview(self, **kwargs):
+        # a datetime range always reads the Stats table
+        return self.overview(start_datetime='2000-01-01T00:00:00+00:00', **kwargs)
+
+    def test_matches_stats(self):
+        self.assertEqual(ChampionRollup.objects.filter(puuid='puuid-1').count(), 2)
+        for kwargs in [{'puuid': 'puuid-1'}, {'puuid': 'puuid-7', 'queue_in': [420]}]:
+            rollup, stats = self.overview(**kwargs), self.stats_overview(**kwargs)
+            self.assertEqual(rollup, stats)
+        champion = self.overview(puuid='puuid-1')[1]
+        self.assertEqual(champion['count'], 3)
+        self.assertEqual(champion['wins'], 2)
+        self.assertEqual(champion['kills_sum'], 4 + 8 + 2)
+
+    def test_refresh_and_rebuild(self):
+        before = self.overview(puuid='puuid-2')
+        mt.import_matches_from_data([payload('NA1_1', 3, True)], 'na', refresh=True)
+        self.assertEqual(self.overview(puuid='puuid-2'), before)
+
+        ChampionRollup.objects.update(kills=0)
+        rollups.rebuild()
+        self.assertEqual(self.overview(puuid='puuid-2'), before)
+
+    def test_backfill_migration(self):
+        fields = [x.name for x in ChampionRollup._meta.fields if x.name != 'id']
+        before = sorted(ChampionRollup.objects.values_list(*fields))
+        ChampionRollup.objects.all().delete()
+        run_migration('0048_backfill_championrollup', 'backfill_champion_rollups')
+        self.assertEqual(sorted(ChampionRollup.objects.values_list(*fields)), before)
+
+
+class PlayedWithTest(TestCase):
+    def setUp(self):
+        mt.import_matches_from_data([
+            payload('NA1_1', 3, True),
+            payload('NA1_2', 7, False),
+            payload('NA1_3', 1, True, queueId=440),
+        ], 'na')
+        self.summoner = Summoner.objects.get(puuid='puuid-1')
+
+    def test_top_played_with(self):
+        self.assertEqual(PlayedWith.objects.filter(summoner_puuid='puuid-1').count(), 18)
+        for team in [True, False]:
+            for queue_id in [None, 440]:
+                kwargs = dict(team=team, queue_id=queue_id, group_by='puuid')
+                indexed = list(mt.get_top_played_with(self.summoner.id, **kwargs).order_by('puuid'))
+                # recent_days always reads the matches
+                scanned = list(
+                    mt.get_top_played_with(self.summoner.id, recent_days=100_000, **kwargs)
+                    .order_by('puuid')
+                )
+                self.assertEqual(indexed, scanned)
+        top = mt.get_top_played_with(self.summoner.id, group_by='summoner_name')[0]
+        self.assertEqual(top['count'], 3)
+        self.assertEqual(top['wins'], 2)
+
+    def test_refresh(self):
+        before = list(PlayedWith.objects.values().order_by('id'))
+        mt.import_matches_from_data([payload('NA1_1', 3, True)], 'na', refresh=True)
+        self.assertEqual(list(PlayedWith.objects.values().order_by('id')), before)
+        rollups.rebuild(puuid='puuid-1')
+        self.assertEqual(PlayedWith.objects.filter(summoner_puuid='puuid-1').count(), 18)
+
+    def test_backfill_migration(self):
+        fields = [x.name for x in PlayedWith._meta.fields if x.name != 'id']
+        before = sorted(PlayedWith.objects.values_list(*fields))
+        PlayedWith.objects.all().delete()
+        run_migration('0049_backfill_playedwith', 'backfill_played_with')
+        self.assertEqual(sorted(PlayedWith.objects.values_list(*fields)), before)
+
+
+def league_entry(tier, rank, lp):
+    return {
+        'queueType': 'RANKED_SOLO_5x5', 'tier': tier, 'rank': rank, 'leaguePoints': lp,
+        'wins': lp, 'losses': 0, 'hotStreak': False, 'freshBlood': False,
+        'inactive': False, 'veteran': False,
+    }
+
+
+class RankRollupTest(TestCase):
+    def setUp(self):
+        self.summoner = SummonerFactory()
+
+    def import_positions(self, *entries):
+        api = mock.Mock()
+        api.league.entries.return_value = mock.Mock(status_code=200, json=lambda: list(entries))
+        with mock.patch.object(pt, 'get_riot_api', return_value=api):
+            pt.import_positions(self.summoner.id)
+
+    def test_import_positions(self):
+        self.import_positions(league_entry('GOLD', 'II', 10))
+        self.import_positions(league_entry('GOLD', 'I', 50))
+        self.import_positions(league_entry('GOLD', 'II', 90))
+
+        rollup = DailyRankRollup.objects.get(summoner=self.summoner)
+        self.assertEqual(rollup.peak_rank, {'tier': 'gold', 'division': 'I', 'league_points': 50})
+        self.assertEqual(rollup.trough_rank['league_points'], 10)
+        self.assertEqual(rollup.last_rank_integer, RankPosition.objects.order_by('id').last().rank_integer)
+        self.assertEqual(WeeklyRankRollup.objects.get(summoner=self.summoner).first_rank_integer,
+                         RankPosition.objects.order_by('id').first().rank_integer)
+
+    def test_upsert_into_concurrent_row(self):
+        """A row written by another worker is folded into, not duplicated."""
+        now = timezone.now()
+        peak = RankPosition(tier='GOLD', rank='I', league_points=50).encode()
+        rollup = rollups.new_rank_rollup(
+            DailyRankRollup, self.summoner.id, 'RANKED_SOLO_5x5', timezone.localtime(now).date(), now, peak,
+        )
+        rollup.save()
+        position = RankPosition(queue_type='RANKED_SOLO_5x5', tier='GOLD', rank='II', league_points=10)
+        position.rank_integer = position.encode()
+        rollups.add_rank_checkpoints([(self.summoner.id, now, [position])])
+
+        rollup = DailyRankRollup.objects.get(summoner=self.summoner)
+        self.assertEqual(rollup.peak_rank_integer, peak)
+        self.assertEqual(rollup.first_rank_integer, peak)
+        self.assertEqual(rollup.trough_rank, {'tier': 'gold', 'division': 'II', 'league_points': 10})
+        self.assertEqual(rollup.last_rank_integer, position.rank_integer)
+
+    def test_rebuild(self):
+        now = timezone.now()
+        for days, lp in [(20, 10), (20, 30), (9, 5), (8, 70), (1, 40)]:
+            checkpoint = RankCheckpoint.objects.create(
+                summoner=self.summoner, created_date=now - timezone.timedelta(days=days),
+            )
+            position = RankPosition.objects.create(
+                checkpoint=checkpoint, queue_type='RANKED_SOLO_5x5', tier='SILVER', rank='IV', league_points=lp,
+            )
+            rollups.add_rank_positions(self.summoner.id, checkpoint.created_date, [position])
+
+        fields = ['period_start', 'start_date', 'peak_rank_integer', 'trough_rank_integer',
+                  'first_rank_integer', 'last_rank_integer', 'peak_rank', 'trough_rank']
+        before = [list(model.objects.order_by('period_start').values(*fields))
+                  for model in [DailyRankRollup, WeeklyRankRollup]]
+        self.assertEqual(len(before[0]), 4)
+        rollups.rebuild_rank_rollups()
+        after = [list(model.objects.order_by('period_start').values(*fields))
+                 for model in [DailyRankRollup, WeeklyRankRollup]]
+        self.assertEqual(before, after)
+
+        DailyRankRollup.objects.all().delete()
+        WeeklyRankRollup.objects.all().delete()
+        run_migration('0050_backfill_rankrollups', 'backfill_rank_rollups')
+        backfilled = [list(model.objects.order_by('period_start').values(*fields))
+                      for model in [DailyRankRollup, WeeklyRankRollup]]
+        self.assertEqual(before, backfilled)
+
+        # a day whose first checkpoint is before start is still returned
+        first = RankCheckpoint.objects.order_by('created_date')[2].created_date
+        response = self.client.post('/api/v1/player/rank-history/', {
+            'id': self.summoner.id, 'queue': 'RANKED_SOLO_5x5', 'group_by': 'day',
+            'start': (first + timezone.timedelta(microseconds=1)).isoformat(),
+        }, content_type='application/json')
+        self.assertEqual(response.data['data'][0]['start_date'], first)
+        self.assertEqual(len(response.data['data']), 3)
@@ -25,6 +25,7 @@ urlpatterns = [
     path("summoners/", player_views.get_summoners),
     path("summoner-search/", player_views.summoner_search),
     path("champions-overview/", player_views.get_summoner_champions_overview),
+    path("stats/", player_views.get_summoner_stats),
     path("positions/", player_views.get_positions),
     path("sign-up/", player_views.sign_up),
     path("verify/", player_views.verify_email),
@@ -6,24 +6,28 @@ from rest_framework.decorators import api_view
 from rest_framework.generics import RetrieveAPIView, CreateAPIView, UpdateAPIView, ListAPIView
 
 from django.utils import timezone
-from django.core.cache import cache
+from django.utils.dateparse import parse_date, parse_datetime
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import AnonymousUser, User
-from django.db.models.functions import Extract
-from django.db.models import Max, Min, F
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 
 from lolsite.viewsapi import require_login
 from lolsite.tasks import get_riot_api
 from lolsite.helpers import query_debugger
+from lolsite.singleflight import get_singleflight
+from lolsite import queues
 
 from player import tasks as pt
+from player import analytics
+from player import rollups
 from player import constants as player_constants
 from player import filters as player_filters
 from player.models import (
-    RankPosition, Comment, Favorite,
-    SummonerLink, decode_int_to_rank, validate_password,
+    Comment, Favorite,
+    SummonerLink, validate_password,
     Reputation, NameChange,
+    DailyRankRollup, WeeklyRankRollup,
 )
 
 from data.models import ProfileIcon, Champion
@@ -45,6 +49,8 @@ import logging
 
 
 logger = logging.getLogger(__name__)
+# don't enqueue the same background import more than once in this many seconds
+BACKGROUND_IMPORT_TTL = 60
 
 
 @api_view(["POST"])
@@ -107,7 +113,8 @@ class SummonerByNameView(RetrieveAPIView):
             region=region,
         ).first()
         if summoner:
-            pt.import_summoner.delay(self.kwargs['region'], name=name)
+            if get_singleflight().claim(pt.summoner_key(region, name=name), BACKGROUND_IMPORT_TTL):
+                pt.import_summoner.apply_async((region,), {'name': name}, priority=queues.PRIORITY_USER)
             return summoner
         summoner_id = pt.import_summoner(self.kwargs['region'], name=name)
         return get_object_or_404(Summoner, id=summoner_id)
@@ -322,6 +329,62 @@ def get_summoner_champions_overview(request, format=None):
     return Response(data, status=status_code)
 
 
+@api_view(["POST"])
+def get_summoner_stats(request, format=None):
+    """Get a summoner's stats grouped by any of `analytics.GROUPS`.
+
+    POST Parameters
+    ---------------
+    puuid : str
+    group_by : list[str]
+        `Ex: ["team_position", "weekday"]`
+    metrics : list[str]
+        leave empty to return all metrics
+    queue_in : list[int]
+    champion_in : list[int]
+    major_version : int
+    minor_version : int
+    start_datetime : ISO Datetime
+    end_datetime : ISO Datetime
+
+    Returns
+    -------
+    JSON
+
+    """
+    group_by = request.data.get("group_by", ["champion_id"])
+    metrics = request.data.get("metrics", [])
+    invalid = []
+    if not request.data.get("puuid"):
+        invalid.append("puuid")
+    if not group_by or not isinstance(group_by, list):
+        invalid.append("group_by")
+    else:
+        invalid += [x for x in group_by if x not in analytics.GROUPS]
+    if not isinstance(metrics, list):
+        invalid.append("metrics")
+    else:
+        invalid += [x for x in metrics if x not in analytics.METRICS]
+
+    filters = {
+        "queue_in": request.data.get("queue_in", None),
+        "champion_in": request.data.get("champion_in", None),
+        "major_version": request.data.get("major_version", None),
+        "minor_version": request.data.get("minor_version", None),
+    }
+    for name, key in [("start_timestamp", "start_datetime"), ("end_timestamp", "end_datetime")]:
+        if value := request.data.get(key):
+            try:
+                filters[name] = parse_datetime(value).timestamp() * 1000
+            except (AttributeError, TypeError, ValueError):
+                # parse_datetime returns None for a badly formatted value
+                invalid.append(key)
+    if invalid:
+        return Response({"message": f"Invalid parameters: {invalid}"}, status=400)
+    columns = analytics.get_columns(request.data["puuid"])
+    return Response({"data": columns.group(group_by, metrics, **filters)})
+
+
 @api_view(["GET"])
 def summoner_search(request: Request, format=None):
     """Provide at least 3 character simple_name to take advantage of trigram gin index.
@@ -383,6 +446,16 @@ def is_logged_in(request, format=None):
     return Response(data, status=status_code)
 
 
+def to_local_date(value: str):
+    """The local date of an ISO datetime, or of a plain ISO date."""
+    moment = parse_datetime(value)
+    if moment is None:
+        return parse_date(value)
+    if timezone.is_naive(moment):
+        return moment.date()
+    return timezone.localtime(moment).date()
+
+
 @api_view(["POST"])
 def get_rank_history(request, format=None):
     """Get a history of a player's rank.
@@ -392,12 +465,14 @@ def get_rank_history(request, format=None):
     id : int
         The ID of the summoner.  (internal ID)
     group_by : str
-        enum('day', 'month', 'week')
+        enum('day', 'week')
         No grouping, if not provided
     queue : str
         enum('RANKED_SOLO_5x5', '')
     start : ISO Date
     end : ISO Date
+        every day or week which overlaps start and end is returned whole,
+        including checkpoints just outside of the range
 
     Returns
     -------
@@ -414,43 +489,32 @@ def get_rank_history(request, format=None):
         start = request.data.get("start", None)
         end = request.data.get("end", None)
 
-        query = RankPosition.objects.filter(
-            checkpoint__summoner__id=summoner_id, queue_type=queue
-        )
-        if start is not None:
-            query = query.filter(checkpoint__created_date__gte=start)
-        if end is not None:
-            query = query.filter(checkpoint__created_date__lte=end)
-
-        if group_by is not None:
-            query = query.annotate(
-                day=Extract("checkpoint__created_date", "day"),
-                month=Extract("checkpoint__created_date", "month"),
-                year=Extract("checkpoint__created_date", "year"),
-                week=Extract("checkpoint__created_date", "week"),
+        models = {"day": DailyRankRollup, "week": WeeklyRankRollup}
+        if group_by in models:
+            model = models[group_by]
+            get_period_start = dict(rollups.RANK_PERIODS)[model]
+            query = model.objects.filter(summoner_id=summoner_id, queue_type=queue)
+            try:
+                if start:
+                    query = query.filter(period_start__gte=get_period_start(to_local_date(start)))
+                if end:
+                    query = query.filter(period_start__lte=to_local_date(end))
+            except (AttributeError, TypeError, ValueError):
+                return Response({"message": "Invalid start or end."}, status=400)
+            query = query.order_by("period_start").values(
+                "period_start", "start_date",
+                "peak_rank_integer", "trough_rank_integer",
+                "first_rank_integer", "last_rank_integer",
+                "peak_rank", "trough_rank",
             )
-            if group_by == "day":
-                query = query.values("day", "month", "year", "week")
-                query = query.annotate(
-                    peak_rank_integer=Max("rank_integer"),
-                    trough_rank_integer=Min("rank_integer"),
-                )
-                query = query.order_by("year", "month", "day")
-            elif group_by == "week":
-                query = query.values("month", "year", "week")
-                query = query.annotate(
-                    peak_rank_integer=Max("rank_integer"),
-                    trough_rank_integer=Min("rank_integer"),
-                )
-                query = query.order_by("year", "month", "week")
-
-            query = query.annotate(start_date=Min("checkpoint__created_date"))
+            data["data"] = []
             for elt in query:
-                elt["peak_rank"] = decode_int_to_rank(elt["peak_rank_integer"])
-                elt["trough_rank"] = decode_int_to_rank(elt["trough_rank_integer"])
-            data["data"] = query
-        else:
-            pass
+                period_start = elt.pop("period_start")
+                elt["day"] = period_start.day
+                elt["month"] = period_start.month
+                elt["year"] = period_start.year
+                elt["week"] = period_start.isocalendar()[1]
+                data["data"].append(elt)
 
     return Response(data, status=status_code)
 
@@ -867,7 +931,6 @@ def get_top_played_with(request, format=None):
     """
     data = {}
     status_code = 200
-    cache_seconds = 60 * 60 * 12
 
     if request.method == "POST":
         _id = request.data.get("summoner_id", None)
@@ -893,24 +956,17 @@ def get_top_played_with(request, format=None):
             status_code = 400
 
         if summoner_id:
-            cache_key = f"{summoner_id}/{group_by}/{season_id}/{queue_id}/{recent}/{start}/{end}/{recent_days}"
-            cached = cache.get(cache_key)
-
-            if cached:
-                data = cached
-            else:
-                query = mt.get_top_played_with(
-                    summoner_id,
-                    season_id=season_id,
-                    queue_id=queue_id,
-                    recent=recent,
-                    recent_days=recent_days,
-                    group_by=group_by,
-                )
-                query = query[start:end]
-                query = list(query.values(group_by, "wins", "count"))
-                data = {"data": query}
-                cache.set(cache_key, data, cache_seconds)
+            query = mt.get_top_played_with(
+                summoner_id,
+                season_id=season_id,
+                queue_id=queue_id,
+                recent=recent,
+                recent_days=recent_days,
+                group_by=group_by,
+            )
+            query = query[start:end]
+            query = list(query.values(group_by, "wins", "count"))
+            data = {"data": query}
 
     else:
         data = {"message": "Only post allowed.", "status": "INVALID_REQUEST"}
@@ -7,6 +7,7 @@ import {
   Frame,
   Ban,
   PaginatedResponse,
+  CursorPaginatedResponse,
 } from '../types'
 import * as t from 'io-ts'
 
@@ -51,30 +52,38 @@ async function getMatch(match_id: string) {
   return await axios.get(url)
 }
 
+// the cursor of the page after this one, from a response's `next` url
+function getNextCursor(next: string | null): string | undefined {
+  if (!next) {
+    return undefined
+  }
+  return new URL(next, window.location.origin).searchParams.get('cursor') || undefined
+}
+
 async function getMatchesBySummonerName({
   summoner_name,
   region,
   queue,
   sync_import,
-  start = 0,
   limit = 10,
+  cursor,
 }: {
   summoner_name: string
   region: string
   sync_import?: boolean,
-  start?: number
   limit?: number
   queue?: number | string,
+  cursor?: string,
 }) {
   const url = `/api/${version}/match/by-summoner/${region}/${summoner_name}/`
   const params = {
-    start,
     limit,
     queue,
     sync_import,
+    cursor,
   }
   const response = await axios.get(url, {params})
-  return unwrap(PaginatedResponse(BasicMatch).decode(response.data))
+  return unwrap(CursorPaginatedResponse(BasicMatch).decode(response.data))
 }
 
 async function setRole(data: any) {
@@ -103,6 +112,7 @@ const exports = {
   getLatestUnlabeled,
   bans,
   getMatchesBySummonerName,
+  getNextCursor,
 }
 
 export default exports
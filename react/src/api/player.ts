@@ -86,7 +86,7 @@ function isLoggedIn() {
 interface GetRankHistoryData extends AxiosRequestConfig {
   id: number
   queue: string
-  group_by?: 'day' | 'month' | 'week'
+  group_by?: 'day' | 'week'
   start?: string | null
   end?: string | null
 }
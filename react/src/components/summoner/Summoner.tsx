@@ -35,6 +35,8 @@ export function Summoner({route, region, store}: {route: any; region: string; st
   const [isSpectateModalOpen, setIsSpectateModalOpen] = useState(false)
   const [isInitialQuery, setIsInitialQuery] = useState(true)
   const [page, setPage] = useState(1)
+  // cursors[i] is the cursor of page i + 1, the first page has none
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined])
   const count = 10
 
   const match_card_height = 400
@@ -44,18 +46,18 @@ export function Summoner({route, region, store}: {route: any; region: string; st
 
   const filterParams = useMemo(() => {
     let params = route.match.params
-    const start = count * page - count
     const data = {
       summoner_name: params.summoner_name || null,
       id: params.id || null,
       region: region,
       queue: matchFilters?.queue || '',
-      start,
+      cursor: cursors[page - 1],
       limit: count,
       sync_import: false,
     }
     return data
-  }, [matchFilters, page, region, route.match.params])
+  }, [matchFilters, page, cursors, region, route.match.params])
+  const nextCursor = cursors[page]
 
   const summonerQuery = useQuery(
     ['summoner', 'name', filterParams.summoner_name, filterParams.region],
@@ -69,23 +71,20 @@ export function Summoner({route, region, store}: {route: any; region: string; st
 
   const matchQueryWithSync = useQueryWithPrefetch(
     ['matches-with-sync', 'by-summoner', {...filterParams, sync_import: true}],
+    () => api.match.getMatchesBySummonerName({...filterParams, sync_import: true}),
+    nextCursor === undefined
+      ? null
+      : [
+          'matches-with-sync',
+          'by-summoner',
+          {...filterParams, cursor: nextCursor, sync_import: true},
+        ],
     () =>
-      api.match
-        .getMatchesBySummonerName({...filterParams, sync_import: true})
-        .then((x) => x.results),
-    [
-      'matches-with-sync',
-      'by-summoner',
-      {...filterParams, start: filterParams.start + count, sync_import: true},
-    ],
-    () =>
-      api.match
-        .getMatchesBySummonerName({
-          ...filterParams,
-          start: filterParams.start + count,
-          sync_import: true,
-        })
-        .then((x) => x.results),
+      api.match.getMatchesBySummonerName({
+        ...filterParams,
+        cursor: nextCursor,
+        sync_import: true,
+      }),
     {
       retry: true,
       refetchOnWindowFocus: false,
@@ -106,7 +105,17 @@ export function Summoner({route, region, store}: {route: any; region: string; st
 
   const summoner = summonerQuery.data
   const icon = summoner?.profile_icon
-  const matches: BasicMatchType[] = matchQueryWithSync.data || []
+  const matches: BasicMatchType[] = matchQueryWithSync.data?.results || []
+  const next = matchQueryWithSync.data?.next
+  const isPreviousData = matchQueryWithSync.isPreviousData
+  // remember where the next page starts, pages are keyed on the cursor
+  useEffect(() => {
+    if (isPreviousData) {
+      return
+    }
+    const cursor = api.match.getNextCursor(next || null)
+    setCursors((x) => (x[page] === cursor ? x : [...x.slice(0, page), cursor]))
+  }, [next, page, isPreviousData])
   const positionQuery = useQuery(
     ['positions', summoner?._id, region],
     () =>
@@ -119,6 +128,7 @@ export function Summoner({route, region, store}: {route: any; region: string; st
 
   const refreshPage = useCallback(() => {
     setPage(1)
+    setCursors([undefined])
     matchQueryWithSyncRefetch()
     summonerQueryRefetch()
     positionQueryRefetch()
@@ -175,6 +185,7 @@ export function Summoner({route, region, store}: {route: any; region: string; st
   const matchFilterOnUpdate = useCallback((data: any) => {
     setMatchFilters(data)
     setPage(1)
+    setCursors([undefined])
   }, [])
 
   const pagination = () => {
@@ -191,8 +202,8 @@ export function Summoner({route, region, store}: {route: any; region: string; st
           <i className="material-icons">chevron_left</i>
         </button>
         <button
-          {...disabled}
           style={{marginLeft: 8}}
+          disabled={isMatchLoading || nextCursor === undefined}
           onClick={() => setPage((x) => x + 1)}
           className={'dark btn-small'}
         >
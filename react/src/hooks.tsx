@@ -83,16 +83,18 @@ export function useRunes(version: string) {
 export function useQueryWithPrefetch<T>(
   key: QueryKey,
   request: QueryFunction<T>,
-  prefetchKey: QueryKey,
+  prefetchKey: QueryKey | null,
   prefetchRequest: QueryFunction<T>,
   options: UseQueryOptions<T>,
 ): UseQueryResult<T, unknown> {
   const queryClient = useQueryClient()
   const matchQuery = useQuery(key, request, options)
-  // prefetch next page
-  queryClient.prefetchQuery(prefetchKey, prefetchRequest, {
-    retry: options.retry,
-    staleTime: options.staleTime,
-  })
+  // prefetch next page, once it is known
+  if (prefetchKey !== null) {
+    queryClient.prefetchQuery(prefetchKey, prefetchRequest, {
+      retry: options.retry,
+      staleTime: options.staleTime,
+    })
+  }
   return matchQuery
 }
@@ -16,6 +16,13 @@ export function PaginatedResponse<C extends t.Mixed>(codec: C) {
     results: t.array(codec),
   })
 }
+export function CursorPaginatedResponse<C extends t.Mixed>(codec: C) {
+  return t.type({
+    next: optional(t.string),
+    previous: optional(t.string),
+    results: t.array(codec),
+  })
+}
 export type PaginatedResponseType<T> = {
   count: number
   next: string | null
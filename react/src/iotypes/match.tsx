@@ -232,6 +232,7 @@ export const FullParticipant = t.type({
   individual_position: optional(t.string),
   team_position: optional(t.string),
   role_label: optional(t.number),
+  impact_score: optional(t.number),
   stats: Stats,
   summoner_1_image: t.string,
   summoner_2_image: t.string,
@@ -326,7 +327,6 @@ export const ParticipantFrame = t.type({
   jungle_minions_killed: t.number,
   level: t.number,
   minions_killed: t.number,
-  team_score: t.number,
   total_gold: t.number,
   time_enemy_spent_controlled: t.number,
   xp: t.number,
@@ -53,7 +53,8 @@ export type {
 } from './iotypes/player'
 
 export {
-  PaginatedResponse
+  PaginatedResponse,
+  CursorPaginatedResponse,
 } from './iotypes/base'
 
 export type {